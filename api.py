@@ -1,22 +1,53 @@
-from typing import List, Type
+from typing import Callable, Iterator, List, Optional, Sequence, Type
 
 import json
+import time
 
 from flask_restful import Api, Resource, abort, reqparse
 
-from flask import request
+from flask import Response, request, stream_with_context, url_for
 
 from flasgger import swag_from, Swagger
 
-from app import app
+from app import app, entity_cache
+from app import stats_background_refresh, stats_cache_backend
 
 from models.manage_school_db import CourseInterface
 from models.manage_school_db import StudentInterface
 from models.manage_school_db import GroupInterface
+from models.manage_school_db import StatsInterface
 from models.manage_school_db import Student, Group, Course
+from models.manage_school_db import RejectedRows
+from models.manage_school_db import StudentDetails, GroupRoster, GroupRow
+from models.manage_school_db import StudentsPage
+from models.manage_school_db import StudentNotExistsError
+from models.manage_school_db import StudentAlreadyExistsError
+from models.manage_school_db import GroupNotExistsError
+from models.manage_school_db import CourseNotExistsError
+from models.student_search import MAX_QUERY_LENGTH
+from models.school_stats import STATS_TABLES
 
 from schemas.json_schemas import StudentSchema, ValidationError
 
+from payloads import decode_lines, read_csv_rows, read_ndjson_rows
+from payloads import validate_student_rows
+from payloads import change_enrollments
+
+from fast_json import COURSE_KEYS, GROUP_KEYS, STUDENT_KEYS
+from fast_json import STUDENT_MATCH_KEYS
+from fast_json import COURSE_ENROLLMENTS_KEYS, COURSE_LOAD_KEYS
+from fast_json import GROUP_SIZE_KEYS
+from fast_json import dumps, json_response, rows_as_dicts
+
+from http_cache import conditional_get
+
+from stats_cache import StatsCache
+
+from sparse_fields import COURSE_FIELDS, GROUP_FIELDS, STUDENT_FIELDS
+from sparse_fields import GROUP_STUDENT_FIELDS, STUDENT_MATCH_FIELDS
+from sparse_fields import InvalidFieldsError, RequestedFields
+from sparse_fields import ResourceFields
+
 
 api = Api(app)
 swagger = Swagger(app)
@@ -25,10 +56,33 @@ parser = reqparse.RequestParser()
 parser.add_argument('students_count', type=int, location='args')
 parser.add_argument('course_name', type=str, location='args')
 parser.add_argument('show_courses', type=str, location='args')
+parser.add_argument('limit', type=int, location='args')
+parser.add_argument('after', type=int, location='args')
+parser.add_argument('count', type=str, location='args')
+parser.add_argument('q', type=str, location='args')
+
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 1000
+
+DEFAULT_SEARCH_LIMIT = 10
+MAX_SEARCH_LIMIT = 50
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+CSV_MIMETYPE = 'text/csv'
+
+MAX_REPORTED_IMPORT_ERRORS = 1000
+
+
+def get_requested_fields_or_abort(
+        resource_fields: ResourceFields) -> Optional[RequestedFields]:
+    try:
+        return resource_fields.parse(request.args)
+    except InvalidFieldsError as err:
+        abort(400, message=str(err))
 
 
 class IndGroup(Resource):
-    group_interface = GroupInterface()
+    group_interface = GroupInterface(cache=entity_cache)
 
     @classmethod
     def build_json_response(cls, group: Group) -> dict:
@@ -39,8 +93,11 @@ class IndGroup(Resource):
         return response
 
     @classmethod
-    def get_group_or_abort(cls, group_id: int) -> Group:
-        if not (group := cls.group_interface.get_group_by_id(group_id)):
+    def get_group_or_abort(
+            cls, group_id: int, requested: RequestedFields = None) -> Group:
+        if not (group := cls.group_interface.get_group_by_id(
+                group_id, requested and requested.selection
+        )):
             abort(404, message=f'Group with given {group_id} id'
                                ' does not exists!')
         return group
@@ -53,34 +110,33 @@ class IndGroup(Resource):
 
     @classmethod
     @swag_from('yaml_for_swagger/groupGet.yaml')
+    @conditional_get(group_interface, ('group',))
     def get(cls, group_id: int) -> dict:
-        group = cls.get_group_or_abort(group_id)
-        return cls.build_json_response(group)
+        requested = get_requested_fields_or_abort(GROUP_FIELDS)
 
+        group = cls.get_group_or_abort(group_id, requested)
 
-class Groups(Resource):
-    group_interface = GroupInterface()
+        if requested is not None:
+            return requested.serialize(group)
 
-    @classmethod
-    def build_json_response(cls, groups: List[Group]) -> dict:
-        response = {'groups': []}
+        return cls.build_json_response(group)
 
-        for group in groups:
-            response['groups'].append(
-                IndGroup.build_json_response(group.Group)
-            )
 
-        return response
+class Groups(Resource):
+    group_interface = GroupInterface(cache=entity_cache)
 
     @classmethod
-    def get_groups_or_abort(cls, students_count=None) -> List[Group]:
-        if students_count or students_count == 0:
-            groups = cls.group_interface.get_group_with_less_students_count(
-                    students_count
-                )
-
+    def get_group_rows_or_abort(
+            cls, students_count: int = None,
+            columns: Sequence[str] = None) -> List[GroupRow]:
+        if students_count is None:
+            groups = cls.group_interface.get_group_rows(columns)
         else:
-            groups = cls.group_interface.get_all_groups()
+            groups = (
+                cls.group_interface.get_group_rows_with_less_students_count(
+                    students_count, columns
+                )
+            )
 
         if not groups:
             abort(404, message='There is no information about any group!')
@@ -89,17 +145,79 @@ class Groups(Resource):
 
     @classmethod
     @swag_from('yaml_for_swagger/groupsGet.yaml')
-    def get(cls) -> dict:
+    @conditional_get(group_interface, ('group', 'student'))
+    def get(cls) -> Response:
         args = parser.parse_args()
-        students_count = args.students_count
 
-        groups = cls.get_groups_or_abort(students_count)
+        requested = get_requested_fields_or_abort(GROUP_FIELDS)
+        keys = GROUP_KEYS if requested is None else requested.keys
+
+        groups = cls.get_group_rows_or_abort(
+            args.students_count, requested and requested.columns
+        )
+
+        return json_response({'groups': rows_as_dicts(keys, groups)})
 
-        return cls.build_json_response(groups)
+
+class GroupStudents(Resource):
+    group_interface = GroupInterface(cache=entity_cache)
+
+    @classmethod
+    def get_group_roster_or_abort(
+            cls, group_id: int, limit: int, after=None,
+            columns: Sequence[str] = None) -> GroupRoster:
+        if not (roster := cls.group_interface.get_group_roster(
+                group_id, columns, limit, after
+        )):
+            abort(404, message=f'Group with given id ({group_id}) '
+                               'does not exists!')
+        return roster
+
+    @classmethod
+    @swag_from('yaml_for_swagger/groupStudentsGet.yaml')
+    @conditional_get(group_interface, ('group', 'student'))
+    def get(cls, group_id: int) -> Response:
+        args = parser.parse_args()
+
+        limit = Students.get_page_limit_or_abort(args.limit)
+
+        requested = get_requested_fields_or_abort(GROUP_STUDENT_FIELDS)
+        keys = STUDENT_KEYS if requested is None else requested.keys
+
+        # One extra row tells whether there is a next page.
+        roster = cls.get_group_roster_or_abort(
+            group_id, limit + 1, args.after, requested and requested.columns
+        )
+        students = roster.students
+
+        response = {
+            'group': IndGroup.build_json_response(roster.group),
+            'students': rows_as_dicts(keys, students[:limit]),
+            'next_after': None,
+            'next': None
+        }
+
+        if len(students) <= limit:
+            return json_response(response)
+
+        next_after = roster.student_ids[limit - 1]
+
+        # Pages after the first one keep the requested fields.
+        parameters = request.args.to_dict()
+        parameters.update(limit=limit, after=next_after)
+
+        response['next_after'] = next_after
+        response['next'] = url_for(
+            'groupstudents', group_id=group_id, **parameters
+        )
+
+        return json_response(response, headers={
+            'Link': f'<{response["next"]}>; rel="next"'
+        })
 
 
 class IndStudent(Resource):
-    student_interface = StudentInterface()
+    student_interface = StudentInterface(cache=entity_cache)
 
     @classmethod
     def build_json_response(cls, student: Student) -> dict:
@@ -113,19 +231,25 @@ class IndStudent(Resource):
         return response
 
     @classmethod
-    def get_student_or_abort(cls, student_id: int) -> Student:
-        if not (
-                student := cls.student_interface.get_student_by_id(student_id)
-        ):
+    def get_student_or_abort(
+            cls, student_id: int, requested: RequestedFields = None
+    ) -> Student:
+        if not (student := cls.student_interface.get_student_by_id(
+                student_id, requested and requested.selection
+        )):
             abort(404, message=f'Student with given id ({student_id}) '
                                'does not exists!')
         return student
 
     @classmethod
     def build_json_student_courses_response(cls, student_id: int):
-        cls.abort_if_student_not_exists(student_id)
+        if not (
+                student := cls.student_interface.get_student_with_full_info(
+                    student_id
+                )
+        ):
+            cls.abort_student_not_exists(student_id)
 
-        student = cls.student_interface.get_student_with_full_info(student_id)
         student_courses = student.courses
 
         json_response = {
@@ -141,10 +265,20 @@ class IndStudent(Resource):
 
     @classmethod
     @swag_from('yaml_for_swagger/studentGet.yaml')
+    @conditional_get(
+        student_interface, ('student', 'group', 'course_student', 'course')
+    )
     def get(cls, student_id: int) -> dict:
         args = parser.parse_args()
         show_courses = args.show_courses
 
+        requested = get_requested_fields_or_abort(STUDENT_FIELDS)
+
+        if requested is not None:
+            return requested.serialize(
+                cls.get_student_or_abort(student_id, requested)
+            )
+
         if show_courses == 'true':
             return cls.build_json_student_courses_response(student_id)
 
@@ -152,9 +286,17 @@ class IndStudent(Resource):
 
         return cls.build_json_response(student)
 
+    @classmethod
+    def abort_student_not_exists(cls, student_id: int) -> None:
+        abort(404, message=f'Student with given id ({student_id}) '
+                           'does not exists!')
+
     @classmethod
     def delete_student(cls, student_id: int) -> dict:
-        cls.student_interface.delete_student_by_id(student_id)
+        try:
+            cls.student_interface.delete_student_by_id(student_id)
+        except StudentNotExistsError:
+            cls.abort_student_not_exists(student_id)
 
         return {'message': f'Student (id: {student_id})'
                            ' was successfully deleted'}
@@ -166,6 +308,8 @@ class IndStudent(Resource):
             cls.student_interface.remove_student_from_course(
                 student_id, course_name
             )
+        except StudentNotExistsError:
+            cls.abort_student_not_exists(student_id)
         except ValueError:
             abort(404, message=f'Student (id: {student_id}) '
                                f'does not have given course ({course_name})!')
@@ -180,8 +324,6 @@ class IndStudent(Resource):
         args = parser.parse_args()
         course_name = args.course_name
 
-        cls.abort_if_student_not_exists(student_id)
-
         if course_name:
             return cls.delete_student_from_course(student_id, course_name)
 
@@ -196,47 +338,52 @@ class IndStudent(Resource):
     @classmethod
     def abort_if_student_not_exists(cls, student_id: int) -> None:
         if not cls.student_interface.check_if_student_exists(student_id):
-            abort(404, message=f'Student with given id ({student_id}) '
-                               'does not exists!')
+            cls.abort_student_not_exists(student_id)
 
     @classmethod
     def validate_json_or_abort(
             cls, user_json: dict,
-            schema: Type[StudentSchema]) -> StudentSchema:
+            schema: Type[StudentSchema], student_id: int) -> StudentSchema:
         student_to_save = None
 
         try:
             student_to_save = schema.parse_obj(user_json)
         except ValidationError as err:
+            # An existing id is reported before an invalid JSON.
+            cls.abort_if_student_already_exists(student_id)
+
             abort(400, message=json.loads(err.json()))
 
         return student_to_save
 
     @classmethod
     def save_user_or_abort(cls, student_id: int) -> None:
-        cls.abort_if_student_already_exists(student_id)
-
         new_student = cls.validate_json_or_abort(
-            request.json, StudentSchema
+            request.json, StudentSchema, student_id
         )
 
-        IndGroup.abort_if_group_not_exists(new_student.group_id)
-
-        cls.student_interface.add_new_student(
-            student_id, new_student.group_id,
-            new_student.first_name, new_student.last_name
-        )
+        try:
+            cls.student_interface.add_new_student(
+                student_id, new_student.group_id,
+                new_student.first_name, new_student.last_name
+            )
+        except StudentAlreadyExistsError:
+            abort(400, message=f'Student with given id ({student_id}) '
+                               'already exists!')
+        except GroupNotExistsError:
+            abort(404, message=f'Group with given id '
+                               f'({new_student.group_id}) does not exists!')
 
     @classmethod
     def add_student_to_course_or_abort(
             cls, student_id: int, course_name: str) -> None:
-        cls.abort_if_student_not_exists(student_id)
-
         try:
             cls.student_interface.add_student_to_course(
                 student_id, course_name
             )
-        except ValueError:
+        except StudentNotExistsError:
+            cls.abort_student_not_exists(student_id)
+        except CourseNotExistsError:
             abort(400, message=f'Course with given name ({course_name}) '
                                'does not exists!')
 
@@ -258,51 +405,338 @@ class IndStudent(Resource):
                            'was successfully added'}
 
 
-class Students(Resource):
-    student_interface = StudentInterface()
+class StudentProfile(Resource):
+    student_interface = StudentInterface(cache=entity_cache)
 
     @classmethod
-    def build_json_response(cls, students: List[Student]) -> dict:
-        response = {'students': []}
+    def build_json_response(cls, student: StudentDetails) -> dict:
+        response = IndStudent.build_json_response(student)
 
-        for student in students:
-            response['students'].append(
-                IndStudent.build_json_response(student.Student)
-            )
+        response['group'] = (
+            IndGroup.build_json_response(student.group)
+            if student.group is not None else None
+        )
+        response['courses'] = [
+            IndCourse.build_json_response(course)
+            for course in student.courses
+        ]
 
         return response
 
     @classmethod
-    def get_students_or_abort(cls, course_name=None) -> List[Student]:
-        if course_name:
-            students = cls.student_interface.get_students_related_to_course(
-                course_name
-            )
+    @swag_from('yaml_for_swagger/studentProfileGet.yaml')
+    @conditional_get(
+        student_interface, ('student', 'group', 'course_student', 'course')
+    )
+    def get(cls, student_id: int) -> dict:
+        if not (
+                student := cls.student_interface.get_student_profile(
+                    student_id
+                )
+        ):
+            IndStudent.abort_student_not_exists(student_id)
+
+        return cls.build_json_response(student)
+
+
+class Students(Resource):
+    student_interface = StudentInterface(cache=entity_cache)
+
+    @classmethod
+    def needs_orm(cls, requested: RequestedFields = None) -> bool:
+        """Only included relationships need ORM objects,
+        students are plain rows otherwise.
+
+        """
+
+        return requested is not None and bool(requested.includes)
+
+    @classmethod
+    def build_json_response(cls, students: list,
+                            requested: RequestedFields = None) -> dict:
+        if cls.needs_orm(requested):
+            return {'students': [
+                requested.serialize(student.Student) for student in students
+            ]}
+
+        keys = STUDENT_KEYS if requested is None else requested.keys
+
+        return {'students': rows_as_dicts(keys, students)}
+
+    @classmethod
+    def get_students_or_abort(
+            cls, course_name: str = None,
+            requested: RequestedFields = None) -> list:
+        if cls.needs_orm(requested):
+            fields = requested.selection
+
+            if course_name is None:
+                students = cls.student_interface.get_all_students(fields)
+            else:
+                students = (
+                    cls.student_interface.get_students_related_to_course(
+                        course_name, fields
+                    )
+                )
         else:
-            students = cls.student_interface.get_all_students()
+            columns = requested and requested.columns
+
+            if course_name is None:
+                students = cls.student_interface.get_student_rows(columns)
+            else:
+                students = (
+                    cls.student_interface
+                    .get_student_rows_related_to_course_name(
+                        course_name, columns
+                    )
+                )
 
         if not students:
             abort(404, message='There is no information about any student!')
 
         return students
 
+    @classmethod
+    def get_page_limit_or_abort(cls, limit=None) -> int:
+        if limit is None:
+            return DEFAULT_PAGE_LIMIT
+
+        if not 0 < limit <= MAX_PAGE_LIMIT:
+            abort(400, message=f'Limit must be between 1 and '
+                               f'{MAX_PAGE_LIMIT} ({limit} was given)!')
+        return limit
+
+    @classmethod
+    def get_students_page(cls, limit: int, after=None,
+                          requested: RequestedFields = None,
+                          course_name: str = None) -> StudentsPage:
+        if cls.needs_orm(requested):
+            if course_name is None:
+                students = cls.student_interface.get_students_page(
+                    limit, after, requested.selection
+                )
+            else:
+                students = (
+                    cls.student_interface.get_students_related_to_course(
+                        course_name, requested.selection, limit, after
+                    ) or []
+                )
+
+            return StudentsPage(
+                students, [student.Student.id for student in students]
+            )
+
+        columns = requested and requested.columns
+
+        if course_name is None:
+            return cls.student_interface.get_student_rows_page(
+                limit, after, columns
+            )
+
+        return (
+            cls.student_interface.get_student_rows_page_related_to_course_name(
+                course_name, limit, after, columns
+            )
+        )
+
+    @classmethod
+    def build_json_page_response(
+            cls, limit: int, after=None, requested: RequestedFields = None,
+            course_name: str = None) -> dict:
+        # One extra row tells whether there is a next page.
+        page = cls.get_students_page(limit + 1, after, requested, course_name)
+        students = page.students
+
+        if not students and after is None:
+            abort(404, message='There is no information about any student!')
+
+        response = cls.build_json_response(students[:limit], requested)
+        response['next_after'] = None
+        response['next'] = None
+
+        if len(students) > limit:
+            next_after = page.student_ids[limit - 1]
+
+            response['next_after'] = next_after
+            # Pages after the first one keep the requested fields
+            # and course.
+            parameters = (
+                request.args.to_dict()
+                if requested is not None or course_name is not None
+                else {}
+            )
+            parameters.update(limit=limit, after=next_after)
+
+            response['next'] = url_for('students', **parameters)
+
+        return response
+
+    @classmethod
+    def build_ndjson_response(
+            cls, after=None, requested: RequestedFields = None) -> Response:
+        if requested is None:
+            requested = RequestedFields(
+                STUDENT_FIELDS, STUDENT_FIELDS.parse_keys()
+            )
+        elif requested.includes:
+            abort(400, message='Includes are not supported '
+                               'by NDJSON responses!')
+
+        keys = requested.keys
+
+        rows = cls.student_interface.iter_students(
+            after, columns=requested.columns
+        )
+
+        def generate_lines():
+            for row in rows:
+                yield dumps(dict(zip(keys, row))) + b'\n'
+
+        return Response(
+            stream_with_context(generate_lines()), mimetype=NDJSON_MIMETYPE
+        )
+
+    @classmethod
+    def wants_ndjson(cls) -> bool:
+        return request.accept_mimetypes.best_match(
+            ['application/json', NDJSON_MIMETYPE]
+        ) == NDJSON_MIMETYPE
+
     @classmethod
     @swag_from('yaml_for_swagger/studentsGet.yaml')
-    def get(cls) -> dict:
+    @conditional_get(
+        student_interface, ('student', 'group', 'course_student', 'course')
+    )
+    def get(cls) -> Response:
         args = parser.parse_args()
-        course_name = args.course_name
+        course_name = args.course_name or None
+
+        requested = get_requested_fields_or_abort(STUDENT_FIELDS)
+
+        if course_name is None and cls.wants_ndjson():
+            return cls.build_ndjson_response(args.after, requested)
+
+        if args.limit is not None or args.after is not None:
+            limit = cls.get_page_limit_or_abort(args.limit)
+
+            response = cls.build_json_page_response(
+                limit, args.after, requested, course_name
+            )
+        else:
+            students = cls.get_students_or_abort(course_name, requested)
+
+            response = cls.build_json_response(students, requested)
+
+        # The size of the whole roster, counted only on request.
+        if course_name is not None and args.count == 'true':
+            response['count'] = (
+                cls.student_interface.count_students_related_to_course_name(
+                    course_name
+                )
+            )
+
+        if response.get('next'):
+            return json_response(response, headers={
+                'Link': f'<{response["next"]}>; rel="next"'
+            })
+        return json_response(response)
+
+
+class StudentsSearch(Resource):
+    student_interface = StudentInterface(cache=entity_cache)
+
+    @classmethod
+    def get_query_or_abort(cls, query=None) -> str:
+        if not query or not query.strip():
+            abort(400, message='Search query (q) must not be empty!')
+
+        if len(query) > MAX_QUERY_LENGTH:
+            abort(400, message=f'Search query must be at most '
+                               f'{MAX_QUERY_LENGTH} characters long!')
+        return query
+
+    @classmethod
+    def get_limit_or_abort(cls, limit=None) -> int:
+        if limit is None:
+            return DEFAULT_SEARCH_LIMIT
+
+        if not 0 < limit <= MAX_SEARCH_LIMIT:
+            abort(400, message=f'Limit must be between 1 and '
+                               f'{MAX_SEARCH_LIMIT} ({limit} was given)!')
+        return limit
+
+    @classmethod
+    @swag_from('yaml_for_swagger/studentsSearchGet.yaml')
+    @conditional_get(student_interface, ('student',))
+    def get(cls) -> Response:
+        args = parser.parse_args()
+
+        query = cls.get_query_or_abort(args.q)
+        limit = cls.get_limit_or_abort(args.limit)
+
+        requested = get_requested_fields_or_abort(STUDENT_MATCH_FIELDS)
+
+        students = cls.student_interface.search_students(query, limit)
+
+        if requested is not None:
+            return json_response({'students': [
+                requested.serialize(student) for student in students
+            ]})
+
+        return json_response(
+            {'students': rows_as_dicts(STUDENT_MATCH_KEYS, students)}
+        )
+
+
+class StudentsImport(Resource):
+    student_interface = StudentInterface(cache=entity_cache)
 
-        students = cls.get_students_or_abort(course_name)
+    @classmethod
+    def read_body_lines(cls) -> Iterator[str]:
+        return decode_lines(request.stream)
+
+    @classmethod
+    @swag_from('yaml_for_swagger/studentsImportPost.yaml')
+    def post(cls) -> dict:
+        if request.mimetype == CSV_MIMETYPE:
+            rows = read_csv_rows(cls.read_body_lines())
+        elif request.mimetype == NDJSON_MIMETYPE:
+            rows = read_ndjson_rows(cls.read_body_lines())
+        else:
+            abort(415, message=f'Expected {CSV_MIMETYPE} or '
+                               f'{NDJSON_MIMETYPE} body!')
+
+        rejected = RejectedRows(MAX_REPORTED_IMPORT_ERRORS)
+        started = time.perf_counter()
+
+        report = cls.student_interface.import_students(
+            validate_student_rows(rows, rejected), rejected
+        )
 
-        return cls.build_json_response(students)
+        seconds = time.perf_counter() - started
+        imported = report.total_rows
+
+        return {
+            'imported': imported,
+            'rejected': rejected.count,
+            'errors': rejected.details,
+            'errors_truncated': rejected.truncated,
+            'seconds': round(seconds, 6),
+            'rows_per_second': round(
+                (imported + rejected.count) / seconds, 2
+            ) if seconds else None
+        }
 
 
 class IndCourse(Resource):
-    course_interface = CourseInterface()
+    course_interface = CourseInterface(cache=entity_cache)
 
     @classmethod
-    def get_course_or_abort(cls, course_id: int) -> Course:
-        if not (course := cls.course_interface.get_course_by_id(course_id)):
+    def get_course_or_abort(
+            cls, course_id: int, requested: RequestedFields = None) -> Course:
+        if not (course := cls.course_interface.get_course_by_id(
+                course_id, requested and requested.selection
+        )):
             abort(404, message=f'Course with given id ({course_id}) '
                                ' does not exists!')
         return course
@@ -319,47 +753,184 @@ class IndCourse(Resource):
 
     @classmethod
     @swag_from('yaml_for_swagger/courseGet.yaml')
+    @conditional_get(course_interface, ('course',))
     def get(cls, course_id) -> dict:
-        course = cls.get_course_or_abort(course_id)
+        requested = get_requested_fields_or_abort(COURSE_FIELDS)
+
+        course = cls.get_course_or_abort(course_id, requested)
+
+        if requested is not None:
+            return requested.serialize(course)
 
         return cls.build_json_response(course)
 
 
 class Courses(Resource):
-    course_interface = CourseInterface()
+    course_interface = CourseInterface(cache=entity_cache)
 
     @classmethod
-    def get_courses_or_abort(cls) -> List[Course]:
-        if not (courses := cls.course_interface.get_all_courses()):
+    @swag_from('yaml_for_swagger/coursesGet.yaml')
+    @conditional_get(course_interface, ('course',))
+    def get(cls) -> Response:
+        requested = get_requested_fields_or_abort(COURSE_FIELDS)
+        keys = COURSE_KEYS if requested is None else requested.keys
+
+        if not (courses := cls.course_interface.get_course_rows(
+                requested and requested.columns
+        )):
             abort(404, message='There is no information about any course!')
-        return courses
+
+        return json_response({'courses': rows_as_dicts(keys, courses)})
+
+
+class BatchEnrollments(Resource):
+    student_interface = StudentInterface(cache=entity_cache)
 
     @classmethod
-    def build_json_response(cls, courses: List[Course]) -> dict:
-        response = {'courses': []}
+    def read_items_or_abort(cls) -> Iterator:
+        """Yields items of a JSON list or of NDJSON body, line by line."""
 
-        for course in courses:
-            course = course.Course
+        if request.mimetype == NDJSON_MIMETYPE:
+            for line_number, line in enumerate(request.stream, start=1):
+                if not line.strip():
+                    continue
 
-            response['courses'].append(
-                IndCourse.build_json_response(course)
-            )
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    abort(400, message=f'Line {line_number} '
+                                       'is not a valid JSON!')
+            return
 
-        return response
+        items = request.get_json(silent=True)
+
+        if not isinstance(items, list):
+            abort(400, message='Expected a JSON list of enrollments '
+                               '(or NDJSON body)!')
+
+        yield from items
 
     @classmethod
-    @swag_from('yaml_for_swagger/coursesGet.yaml')
-    def get(cls) -> dict:
-        courses = cls.get_courses_or_abort()
+    @swag_from('yaml_for_swagger/enrollmentsBatchPost.yaml')
+    def post(cls) -> dict:
+        return change_enrollments(
+            cls.read_items_or_abort(),
+            cls.student_interface.add_students_to_courses
+        )
+
+    @classmethod
+    @swag_from('yaml_for_swagger/enrollmentsBatchDelete.yaml')
+    def delete(cls) -> dict:
+        return change_enrollments(
+            cls.read_items_or_abort(),
+            cls.student_interface.remove_students_from_courses
+        )
+
+
+class SchoolStats(Resource):
+    """Base of the ``/api/v1/stats/`` resources. Aggregates are
+    computed in SQL and cached until a write changes their tables.
+
+    """
 
-        return cls.build_json_response(courses)
+    stats_interface = StatsInterface()
+    stats_cache = StatsCache(
+        stats_interface, stats_cache_backend,
+        background_refresh=stats_background_refresh
+    )
+
+    @classmethod
+    def build_json_response(cls, name: str, keys: Sequence[str],
+                            read_rows: Callable,
+                            parameters: dict = None) -> Response:
+        result = cls.stats_cache.get_or_compute(
+            name, parameters, STATS_TABLES[name],
+            lambda: rows_as_dicts(keys, read_rows())
+        )
+
+        return json_response({
+            name: result.value,
+            'computed_at': result.computed_at,
+            'stale': result.stale
+        })
+
+
+class CourseEnrollmentStats(SchoolStats):
+    @classmethod
+    @swag_from('yaml_for_swagger/statsCourseEnrollmentsGet.yaml')
+    def get(cls) -> Response:
+        return cls.build_json_response(
+            'course_enrollments', COURSE_ENROLLMENTS_KEYS,
+            cls.stats_interface.get_course_enrollments
+        )
+
+
+class GroupSizeStats(SchoolStats):
+    @classmethod
+    @swag_from('yaml_for_swagger/statsGroupSizesGet.yaml')
+    def get(cls) -> Response:
+        return cls.build_json_response(
+            'group_sizes', GROUP_SIZE_KEYS,
+            cls.stats_interface.get_group_sizes
+        )
+
+
+class CourseLoadStats(SchoolStats):
+    @classmethod
+    @swag_from('yaml_for_swagger/statsCourseLoadsGet.yaml')
+    def get(cls) -> Response:
+        return cls.build_json_response(
+            'course_loads', COURSE_LOAD_KEYS,
+            cls.stats_interface.get_course_loads
+        )
+
+
+class SmallGroupStats(SchoolStats):
+    @classmethod
+    def get_students_count_or_abort(cls, students_count=None) -> int:
+        if students_count is None:
+            abort(400, message='Students count (students_count) '
+                               'must be passed!')
+
+        if students_count < 0:
+            abort(400, message=f'Students count must not be negative '
+                               f'({students_count} was given)!')
+        return students_count
+
+    @classmethod
+    @swag_from('yaml_for_swagger/statsSmallGroupsGet.yaml')
+    def get(cls) -> Response:
+        args = parser.parse_args()
+
+        students_count = cls.get_students_count_or_abort(
+            args.students_count
+        )
+
+        return cls.build_json_response(
+            'small_groups', GROUP_SIZE_KEYS,
+            lambda: cls.stats_interface.get_small_groups(students_count),
+            {'students_count': students_count}
+        )
 
 
 api.add_resource(Groups, '/api/v1/groups/')
 api.add_resource(IndGroup, '/api/v1/groups/<int:group_id>/')
+api.add_resource(GroupStudents, '/api/v1/groups/<int:group_id>/students/')
 
 api.add_resource(Courses, '/api/v1/courses/')
 api.add_resource(IndCourse, '/api/v1/courses/<int:course_id>/')
 
 api.add_resource(Students, '/api/v1/students/')
 api.add_resource(IndStudent, '/api/v1/students/<int:student_id>/')
+api.add_resource(
+    StudentProfile, '/api/v1/students/<int:student_id>/profile/'
+)
+api.add_resource(StudentsSearch, '/api/v1/students/search/')
+api.add_resource(StudentsImport, '/api/v1/students/import/')
+
+api.add_resource(BatchEnrollments, '/api/v1/enrollments/batch/')
+
+api.add_resource(CourseEnrollmentStats, '/api/v1/stats/course-enrollments/')
+api.add_resource(GroupSizeStats, '/api/v1/stats/group-sizes/')
+api.add_resource(CourseLoadStats, '/api/v1/stats/course-loads/')
+api.add_resource(SmallGroupStats, '/api/v1/stats/small-groups/')
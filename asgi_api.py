@@ -0,0 +1,567 @@
+"""Part of the REST API of ``api`` served by an ASGI server,
+on SQLAlchemy asyncio::
+
+    uvicorn asgi_api:app --workers 4
+
+Routes, JSON shapes and status codes are those of the Flask API for:
+groups and courses (lists and by id), students (list, pages, course
+rosters, NDJSON stream, by id, writes and enrollments), the student
+import and batch enrollments. Conditional GETs, sparse fields and
+includes, the student search and profile, group rosters and stats
+are served by the Flask API only.
+
+Bulk endpoints (import and batch enrollments) are bound
+by the database rather than by waiting, so they run the sync
+COPY / chunked code of ``StudentInterface`` in a worker thread.
+
+"""
+
+import json
+import time
+from typing import AsyncIterator, Iterator, List
+from urllib.parse import urlencode
+
+from anyio import from_thread
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.endpoints import HTTPEndpoint
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+
+from app import entity_cache
+
+from models.async_school_db import AsyncCourseInterface
+from models.async_school_db import AsyncGroupInterface
+from models.async_school_db import AsyncStudentInterface
+from models.dto import CourseRow, GroupRow, StudentRow
+from models.manage_school_db import StudentInterface, RejectedRows
+from models.manage_school_db import StudentNotExistsError
+from models.manage_school_db import StudentAlreadyExistsError
+from models.manage_school_db import GroupNotExistsError
+from models.manage_school_db import CourseNotExistsError
+
+from schemas.json_schemas import StudentSchema, ValidationError
+
+from payloads import read_csv_rows, read_ndjson_rows, validate_student_rows
+from payloads import change_enrollments
+
+
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 1000
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+CSV_MIMETYPE = 'text/csv'
+
+MAX_REPORTED_IMPORT_ERRORS = 1000
+
+
+class ApiError(Exception):
+    def __init__(self, status_code: int, message):
+        super().__init__(message)
+
+        self.status_code = status_code
+        self.message = message
+
+
+def abort(status_code: int, message) -> None:
+    raise ApiError(status_code, message)
+
+
+async def handle_api_error(request: Request, err: ApiError) -> JSONResponse:
+    return JSONResponse({'message': err.message}, err.status_code)
+
+
+def get_arg(request: Request, name: str, type_=str):
+    """Query argument like ``reqparse`` parses it (None if missing)."""
+
+    if (value := request.query_params.get(name)) is None:
+        return None
+
+    try:
+        return type_(value)
+    except ValueError as err:
+        abort(400, {name: str(err)})
+
+
+def get_mimetype(request: Request) -> str:
+    return request.headers.get('content-type', '').split(';')[0].strip()
+
+
+class IndGroup(HTTPEndpoint):
+    group_interface = AsyncGroupInterface()
+
+    @classmethod
+    def build_json_response(cls, group: GroupRow) -> dict:
+        return {'group_id': group.id, 'group_name': group.name}
+
+    async def get(self, request: Request) -> JSONResponse:
+        group_id = request.path_params['group_id']
+
+        if not (group := await self.group_interface.get_group_by_id(
+                group_id
+        )):
+            abort(404, f'Group with given {group_id} id does not exists!')
+
+        return JSONResponse(self.build_json_response(group))
+
+
+class Groups(HTTPEndpoint):
+    group_interface = AsyncGroupInterface()
+
+    async def get(self, request: Request) -> JSONResponse:
+        students_count = get_arg(request, 'students_count', int)
+
+        if students_count or students_count == 0:
+            groups = await (
+                self.group_interface.get_group_rows_with_less_students_count(
+                    students_count
+                )
+            )
+        else:
+            groups = await self.group_interface.get_group_rows()
+
+        if not groups:
+            abort(404, 'There is no information about any group!')
+
+        return JSONResponse({'groups': [
+            IndGroup.build_json_response(group) for group in groups
+        ]})
+
+
+class IndStudent(HTTPEndpoint):
+    student_interface = AsyncStudentInterface(cache=entity_cache)
+
+    @classmethod
+    def build_json_response(cls, student: StudentRow) -> dict:
+        return {
+            'student_id': student.id,
+            'first_name': student.first_name,
+            'last_name': student.last_name,
+            'group_id': student.group_id
+        }
+
+    @classmethod
+    def abort_student_not_exists(cls, student_id: int) -> None:
+        abort(404, f'Student with given id ({student_id}) does not exists!')
+
+    async def build_json_student_courses_response(
+            self, student_id: int) -> dict:
+        if not (student := await self.student_interface.get_student_details(
+                student_id
+        )):
+            self.abort_student_not_exists(student_id)
+
+        return {student_id: {'courses': [
+            IndCourse.build_json_response(course)
+            for course in student.courses
+        ]}}
+
+    async def get(self, request: Request) -> JSONResponse:
+        student_id = request.path_params['student_id']
+
+        if get_arg(request, 'show_courses') == 'true':
+            return JSONResponse(
+                await self.build_json_student_courses_response(student_id)
+            )
+
+        if not (student := await self.student_interface.get_student_by_id(
+                student_id
+        )):
+            self.abort_student_not_exists(student_id)
+
+        return JSONResponse(self.build_json_response(student))
+
+    async def delete_student(self, student_id: int) -> dict:
+        try:
+            await self.student_interface.delete_student_by_id(student_id)
+        except StudentNotExistsError:
+            self.abort_student_not_exists(student_id)
+
+        return {'message': f'Student (id: {student_id})'
+                           ' was successfully deleted'}
+
+    async def delete_student_from_course(
+            self, student_id: int, course_name: str) -> dict:
+        try:
+            await self.student_interface.remove_student_from_course(
+                student_id, course_name
+            )
+        except StudentNotExistsError:
+            self.abort_student_not_exists(student_id)
+        except ValueError:
+            abort(404, f'Student (id: {student_id}) '
+                       f'does not have given course ({course_name})!')
+
+        return {'message': f'Student (id: {student_id}) '
+                           'was successfully removed '
+                           f'from course ({course_name})'}
+
+    async def delete(self, request: Request) -> JSONResponse:
+        student_id = request.path_params['student_id']
+
+        if course_name := get_arg(request, 'course_name'):
+            return JSONResponse(
+                await self.delete_student_from_course(student_id, course_name)
+            )
+
+        return JSONResponse(await self.delete_student(student_id))
+
+    async def validate_json_or_abort(
+            self, request: Request, student_id: int) -> StudentSchema:
+        try:
+            user_json = await request.json()
+        except ValueError:
+            user_json = None
+
+        try:
+            return StudentSchema.parse_obj(user_json)
+        except ValidationError as err:
+            # An existing id is reported before an invalid JSON.
+            if await self.student_interface.check_if_student_exists(
+                    student_id
+            ):
+                abort(400, f'Student with given id ({student_id}) '
+                           'already exists!')
+
+            abort(400, json.loads(err.json()))
+
+    async def save_user_or_abort(
+            self, request: Request, student_id: int) -> None:
+        new_student = await self.validate_json_or_abort(request, student_id)
+
+        try:
+            await self.student_interface.add_new_student(
+                student_id, new_student.group_id,
+                new_student.first_name, new_student.last_name
+            )
+        except StudentAlreadyExistsError:
+            abort(400, f'Student with given id ({student_id}) '
+                       'already exists!')
+        except GroupNotExistsError:
+            abort(404, f'Group with given id '
+                       f'({new_student.group_id}) does not exists!')
+
+    async def add_student_to_course_or_abort(
+            self, student_id: int, course_name: str) -> None:
+        try:
+            await self.student_interface.add_student_to_course(
+                student_id, course_name
+            )
+        except StudentNotExistsError:
+            self.abort_student_not_exists(student_id)
+        except CourseNotExistsError:
+            abort(400, f'Course with given name ({course_name}) '
+                       'does not exists!')
+
+    async def post(self, request: Request) -> JSONResponse:
+        student_id = request.path_params['student_id']
+
+        if course_name := get_arg(request, 'course_name'):
+            await self.add_student_to_course_or_abort(student_id, course_name)
+
+            return JSONResponse({
+                'message': f'Student (id: {student_id}) successfully'
+                           f' added to the course ({course_name})'
+            })
+
+        await self.save_user_or_abort(request, student_id)
+
+        return JSONResponse({'message': f'Student with given id '
+                                        f'({student_id}) was successfully '
+                                        'added'})
+
+
+class Students(HTTPEndpoint):
+    student_interface = AsyncStudentInterface(cache=entity_cache)
+
+    @classmethod
+    def build_json_response(cls, students: List[StudentRow]) -> dict:
+        return {'students': [
+            IndStudent.build_json_response(student) for student in students
+        ]}
+
+    @classmethod
+    def get_page_limit_or_abort(cls, limit=None) -> int:
+        if limit is None:
+            return DEFAULT_PAGE_LIMIT
+
+        if not 0 < limit <= MAX_PAGE_LIMIT:
+            abort(400, f'Limit must be between 1 and '
+                       f'{MAX_PAGE_LIMIT} ({limit} was given)!')
+        return limit
+
+    async def get_students_page(self, limit: int, after=None,
+                                course_name: str = None) -> list:
+        if course_name is None:
+            return await self.student_interface.get_students_page(
+                limit, after
+            )
+
+        return await (
+            self.student_interface.get_student_rows_related_to_course_name(
+                course_name, limit, after
+            )
+        )
+
+    async def build_json_page_response(
+            self, request: Request, limit: int, after=None,
+            course_name: str = None) -> dict:
+        # One extra row tells whether there is a next page.
+        students = await self.get_students_page(
+            limit + 1, after, course_name
+        )
+
+        if not students and after is None:
+            abort(404, 'There is no information about any student!')
+
+        response = self.build_json_response(students[:limit])
+        response['next_after'] = None
+        response['next'] = None
+
+        if len(students) > limit:
+            next_after = students[limit - 1].id
+
+            response['next_after'] = next_after
+            # Pages of a course keep it (and the count).
+            parameters = (
+                dict(request.query_params) if course_name is not None else {}
+            )
+            parameters.update(limit=limit, after=next_after)
+
+            response['next'] = f'{request.url.path}?' + urlencode(parameters)
+
+        return response
+
+    def build_ndjson_response(self, after=None) -> StreamingResponse:
+        async def generate_lines() -> AsyncIterator[str]:
+            async for student in self.student_interface.iter_students(after):
+                yield json.dumps(
+                    IndStudent.build_json_response(student)
+                ) + '\n'
+
+        return StreamingResponse(
+            generate_lines(), media_type=NDJSON_MIMETYPE
+        )
+
+    @classmethod
+    def wants_ndjson(cls, request: Request) -> bool:
+        # The negotiation of the Flask API, q-values included.
+        accept = parse_accept_header(request.headers.get('accept'), MIMEAccept)
+
+        return accept.best_match(
+            ['application/json', NDJSON_MIMETYPE]
+        ) == NDJSON_MIMETYPE
+
+    async def get(self, request: Request):
+        course_name = get_arg(request, 'course_name') or None
+        limit = get_arg(request, 'limit', int)
+        after = get_arg(request, 'after', int)
+
+        if course_name is None and self.wants_ndjson(request):
+            return self.build_ndjson_response(after)
+
+        if limit is not None or after is not None:
+            limit = self.get_page_limit_or_abort(limit)
+
+            response = await self.build_json_page_response(
+                request, limit, after, course_name
+            )
+        else:
+            if course_name is None:
+                students = await self.student_interface.get_student_rows()
+            else:
+                students = await (
+                    self.student_interface
+                    .get_student_rows_related_to_course_name(course_name)
+                )
+
+            if not students:
+                abort(404, 'There is no information about any student!')
+
+            response = self.build_json_response(students)
+
+        # The size of the whole roster, counted only on request.
+        if course_name is not None and get_arg(request, 'count') == 'true':
+            response['count'] = await (
+                self.student_interface.count_students_related_to_course_name(
+                    course_name
+                )
+            )
+
+        headers = None
+        if response.get('next'):
+            headers = {'Link': f'<{response["next"]}>; rel="next"'}
+
+        return JSONResponse(response, headers=headers)
+
+
+def iter_body_lines(request: Request) -> Iterator[str]:
+    """Lines of the request body, for sync code in a worker thread.
+
+    Chunks are awaited on the event loop one at a time,
+    so the body is never held in memory as a whole.
+
+    """
+
+    chunks = request.stream().__aiter__()
+
+    async def next_chunk():
+        try:
+            return await chunks.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    buffer = b''
+    while (chunk := from_thread.run(next_chunk)) is not None:
+        *lines, buffer = (buffer + chunk).split(b'\n')
+
+        for line in lines:
+            yield line.decode('utf-8', errors='replace') + '\n'
+
+    if buffer:
+        yield buffer.decode('utf-8', errors='replace')
+
+
+class StudentsImport(HTTPEndpoint):
+    student_interface = StudentInterface(cache=entity_cache)
+
+    def import_students(self, request: Request, mimetype: str) -> dict:
+        if mimetype == CSV_MIMETYPE:
+            rows = read_csv_rows(iter_body_lines(request))
+        else:
+            rows = read_ndjson_rows(iter_body_lines(request))
+
+        rejected = RejectedRows(MAX_REPORTED_IMPORT_ERRORS)
+        started = time.perf_counter()
+
+        report = self.student_interface.import_students(
+            validate_student_rows(rows, rejected), rejected
+        )
+
+        seconds = time.perf_counter() - started
+        imported = report.total_rows
+
+        return {
+            'imported': imported,
+            'rejected': rejected.count,
+            'errors': rejected.details,
+            'errors_truncated': rejected.truncated,
+            'seconds': round(seconds, 6),
+            'rows_per_second': round(
+                (imported + rejected.count) / seconds, 2
+            ) if seconds else None
+        }
+
+    async def post(self, request: Request) -> JSONResponse:
+        if (mimetype := get_mimetype(request)) not in (
+                CSV_MIMETYPE, NDJSON_MIMETYPE
+        ):
+            abort(415, f'Expected {CSV_MIMETYPE} or {NDJSON_MIMETYPE} body!')
+
+        return JSONResponse(
+            await run_in_threadpool(self.import_students, request, mimetype)
+        )
+
+
+class BatchEnrollments(HTTPEndpoint):
+    student_interface = StudentInterface(cache=entity_cache)
+
+    @classmethod
+    async def read_items_or_abort(cls, request: Request) -> list:
+        body = await request.body()
+
+        if get_mimetype(request) == NDJSON_MIMETYPE:
+            items = []
+
+            for line_number, line in enumerate(
+                    body.splitlines(), start=1
+            ):
+                if not line.strip():
+                    continue
+
+                try:
+                    items.append(json.loads(line))
+                except ValueError:
+                    abort(400, f'Line {line_number} is not a valid JSON!')
+
+            return items
+
+        try:
+            items = json.loads(body)
+        except ValueError:
+            items = None
+
+        if not isinstance(items, list):
+            abort(400, 'Expected a JSON list of enrollments '
+                       '(or NDJSON body)!')
+
+        return items
+
+    async def post(self, request: Request) -> JSONResponse:
+        return JSONResponse(await run_in_threadpool(
+            change_enrollments, await self.read_items_or_abort(request),
+            self.student_interface.add_students_to_courses
+        ))
+
+    async def delete(self, request: Request) -> JSONResponse:
+        return JSONResponse(await run_in_threadpool(
+            change_enrollments, await self.read_items_or_abort(request),
+            self.student_interface.remove_students_from_courses
+        ))
+
+
+class IndCourse(HTTPEndpoint):
+    course_interface = AsyncCourseInterface()
+
+    @classmethod
+    def build_json_response(cls, course: CourseRow) -> dict:
+        return {
+            'course_id': course.id,
+            'course_name': course.name,
+            'course_description': course.description
+        }
+
+    async def get(self, request: Request) -> JSONResponse:
+        course_id = request.path_params['course_id']
+
+        if not (course := await self.course_interface.get_course_by_id(
+                course_id
+        )):
+            abort(404, f'Course with given id ({course_id}) '
+                       ' does not exists!')
+
+        return JSONResponse(self.build_json_response(course))
+
+
+class Courses(HTTPEndpoint):
+    course_interface = AsyncCourseInterface()
+
+    async def get(self, request: Request) -> JSONResponse:
+        if not (courses := await self.course_interface.get_course_rows()):
+            abort(404, 'There is no information about any course!')
+
+        return JSONResponse({'courses': [
+            IndCourse.build_json_response(course) for course in courses
+        ]})
+
+
+routes = [
+    Route('/api/v1/groups/', Groups),
+    Route('/api/v1/groups/{group_id:int}/', IndGroup),
+
+    Route('/api/v1/courses/', Courses),
+    Route('/api/v1/courses/{course_id:int}/', IndCourse),
+
+    Route('/api/v1/students/', Students),
+    Route('/api/v1/students/{student_id:int}/', IndStudent),
+    Route('/api/v1/students/import/', StudentsImport),
+
+    Route('/api/v1/enrollments/batch/', BatchEnrollments)
+]
+
+app = Starlette(routes=routes, exception_handlers={ApiError: handle_api_error})
@@ -0,0 +1,100 @@
+"""Requests per second of the WSGI and the ASGI API at high concurrency.
+
+Start both servers against the same database, e.g.::
+
+    gunicorn -w 4 --threads 8 -b :8000 api:app
+    uvicorn asgi_api:app --workers 4 --port 8001
+
+and run::
+
+    python -m benchmarks.api_concurrency \\
+        --target wsgi=http://localhost:8000 \\
+        --target asgi=http://localhost:8001 --concurrency 256
+
+"""
+
+import argparse
+import asyncio
+import time
+from typing import List
+
+import httpx
+
+
+DEFAULT_PATHS = [
+    '/api/v1/students/1/',
+    '/api/v1/students/?limit=100',
+    '/api/v1/groups/',
+    '/api/v1/courses/1/',
+    '/api/v1/students/1/?show_courses=true'
+]
+
+
+async def run_load(base_url: str, paths: List[str], requests: int,
+                   concurrency: int) -> dict:
+    latencies = []
+    errors = 0
+    next_request = iter(range(requests))
+
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits,
+                                 timeout=60) as client:
+        async def worker():
+            nonlocal errors
+
+            for number in next_request:
+                started = time.perf_counter()
+
+                try:
+                    response = await client.get(paths[number % len(paths)])
+                    if response.status_code >= 500:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        seconds = time.perf_counter() - started
+
+    latencies.sort()
+
+    return {
+        'requests': requests,
+        'errors': errors,
+        'seconds': round(seconds, 3),
+        'requests_per_second': round(requests / seconds, 1),
+        'p50_ms': round(latencies[len(latencies) // 2] * 1000, 2),
+        'p99_ms': round(latencies[int(len(latencies) * 0.99)] * 1000, 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument(
+        '--target', action='append', required=True,
+        help='name=base_url, can be repeated'
+    )
+    parser.add_argument('--requests', type=int, default=20_000)
+    parser.add_argument('--concurrency', type=int, default=256)
+    parser.add_argument('--path', action='append', dest='paths')
+
+    args = parser.parse_args()
+
+    for target in args.target:
+        name, base_url = target.split('=', 1)
+
+        result = asyncio.run(run_load(
+            base_url, args.paths or DEFAULT_PATHS,
+            args.requests, args.concurrency
+        ))
+
+        print(name, result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""JSON responses built from plain rows and encoded with orjson.
+
+Listings skip the ORM and Flask-RESTful's stdlib encoder:
+rows are selected as tuples, zipped with the response keys and
+encoded at once. Without orjson installed the stdlib ``json`` is used.
+
+"""
+
+import json
+from typing import Iterable, List, Sequence
+
+from flask import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+GROUP_KEYS = ('group_id', 'group_name')
+COURSE_KEYS = ('course_id', 'course_name', 'course_description')
+STUDENT_KEYS = ('student_id', 'first_name', 'last_name', 'group_id')
+STUDENT_MATCH_KEYS = STUDENT_KEYS + ('matched_name',)
+
+COURSE_ENROLLMENTS_KEYS = ('course_id', 'course_name', 'students_count')
+GROUP_SIZE_KEYS = ('group_id', 'group_name', 'students_count')
+COURSE_LOAD_KEYS = (
+    'courses_count', 'students_count', 'share', 'cumulative_share'
+)
+
+
+def dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+
+    return json.dumps(
+        obj, separators=(',', ':'), ensure_ascii=False
+    ).encode('utf-8')
+
+
+def rows_as_dicts(keys: Sequence[str],
+                  rows: Iterable[Sequence]) -> List[dict]:
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def json_response(payload, status: int = 200, headers: dict = None
+                  ) -> Response:
+    return Response(
+        dumps(payload), status=status, headers=headers,
+        mimetype='application/json'
+    )
@@ -0,0 +1,137 @@
+import functools
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional, Sequence
+
+from flask import Response, current_app, request
+
+from werkzeug.http import http_date
+
+from models.db_routing import single_source_reads
+from models.table_versions import TableState
+
+
+DEFAULT_CACHE_CONTROL = 'no-cache'
+
+
+def build_etag(states: Dict[str, TableState],
+               table_names: Sequence[str]) -> str:
+    """Strong ETag of the current request for the given table versions."""
+
+    digest = hashlib.sha1()
+    digest.update(request.full_path.encode('utf-8'))
+    digest.update(request.headers.get('Accept', '').encode('utf-8'))
+
+    for table_name in sorted(table_names):
+        if (state := states.get(table_name)) is not None:
+            digest.update(
+                f'{table_name}:{state.version}:'
+                f'{state.updated_at.isoformat()}'.encode('utf-8')
+            )
+
+    return digest.hexdigest()
+
+
+def get_cache_control(default: str = None) -> str:
+    """Per endpoint ``CACHE_CONTROLS`` config wins over the default
+    of the resource, which wins over ``CACHE_CONTROL``.
+
+    """
+
+    return current_app.config.get('CACHE_CONTROLS', {}).get(
+        request.endpoint,
+        default or current_app.config.get(
+            'CACHE_CONTROL', DEFAULT_CACHE_CONTROL
+        )
+    )
+
+
+def http_last_modified(updated_at: datetime,
+                       now: datetime = None) -> Optional[datetime]:
+    """``updated_at`` rounded up to the whole second HTTP dates have.
+
+    None while that second is not over: a write later in the same
+    second would get the same Last-Modified, so a client holding it
+    would get 304 for stale data.
+
+    """
+
+    last_modified = updated_at.replace(microsecond=0)
+    if last_modified != updated_at:
+        last_modified += timedelta(seconds=1)
+
+    if last_modified > (now or datetime.now(timezone.utc)):
+        return None
+
+    return last_modified
+
+
+def is_not_modified(etag: str, last_modified: datetime = None) -> bool:
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+
+    if last_modified is not None and request.if_modified_since:
+        return last_modified <= request.if_modified_since
+
+    return False
+
+
+def add_headers(rv, headers: dict):
+    """Adds headers to whatever a view or a resource returned."""
+
+    if isinstance(rv, Response):
+        rv.headers.update(headers)
+        return rv
+
+    if isinstance(rv, tuple):
+        data, status, *rv_headers = rv
+        return data, status, {**(rv_headers[0] if rv_headers else {}),
+                              **headers}
+
+    return rv, 200, headers
+
+
+def conditional_get(interface, table_names: Sequence[str],
+                    cache_control: str = None) -> Callable:
+    """Answers GETs with ETag / Last-Modified built from
+    versions of the tables the response is made of.
+
+    A matching ``If-None-Match`` (or ``If-Modified-Since`` without it)
+    gets 304 after a single query for the versions. Last-Modified is
+    only sent once the second of the last write is over. ``interface``
+    (a ``SchoolDb``) is the one the view reads through, the versions
+    and the response are read from one database (``single_source_reads``).
+
+    """
+
+    def decorator(function: Callable) -> Callable:
+        @functools.wraps(function)
+        @single_source_reads()
+        def wrapper(*args, **kwargs):
+            # The versions are read first, from the database
+            # the response is then read from.
+            states = interface.get_table_states(table_names)
+
+            etag = build_etag(states, table_names)
+            updated_at = max(
+                (state.updated_at for state in states.values()),
+                default=None
+            )
+            last_modified = updated_at and http_last_modified(updated_at)
+
+            headers = {
+                'ETag': f'"{etag}"',
+                'Cache-Control': get_cache_control(cache_control)
+            }
+
+            if last_modified is not None:
+                headers['Last-Modified'] = http_date(last_modified)
+
+            if is_not_modified(etag, last_modified):
+                return Response(status=304, headers=headers)
+
+            return add_headers(function(*args, **kwargs), headers)
+
+        return wrapper
+
+    return decorator
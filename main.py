@@ -7,12 +7,26 @@ import api
 import views
 
 
-from models.manage_school_db import InitSchoolDb
+from models.manage_school_db import InitSchoolDb, GroupInterface
 
 
-def db_initialization():
+def db_initialization(bulk: bool = False, chunk_size: int = 10_000):
     db_manager = InitSchoolDb()
-    db_manager.init_db()
+
+    if bulk:
+        print(db_manager.bulk_init_db(chunk_size=chunk_size))
+    else:
+        db_manager.init_db()
+
+
+def check_group_students_counts(rebuild: bool = False):
+    group_interface = GroupInterface()
+
+    for group_id, stored, real in group_interface.check_students_counts():
+        print(f'Group {group_id}: {stored} students stored, {real} real')
+
+    if rebuild:
+        print(f'{group_interface.rebuild_students_counts()} groups fixed')
 
 
 if __name__ == '__main__':
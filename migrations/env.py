@@ -0,0 +1,64 @@
+from logging.config import fileConfig
+
+from alembic import context
+
+from engine_factory import EngineSettings, create_db_engine
+
+from models.models import SchoolBase
+
+
+config = context.config
+
+if config.config_file_name is not None:
+    # Loggers of the application (e.g. query_metrics) stay enabled.
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = SchoolBase.metadata
+
+
+def get_settings() -> EngineSettings:
+    settings = EngineSettings.from_env()
+
+    if url := config.get_main_option('sqlalchemy.url'):
+        settings.url = url
+
+    return settings
+
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=get_settings().url, target_metadata=target_metadata,
+        literal_binds=True, dialect_opts={'paramstyle': 'named'}
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_on(connection) -> None:
+    context.configure(
+        connection=connection, target_metadata=target_metadata,
+        # SQLite can not alter constraints, tables are recreated instead.
+        render_as_batch=connection.dialect.name == 'sqlite'
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    # Tests (or callers of alembic.command) may pass their own connection.
+    if (connection := config.attributes.get('connection')) is not None:
+        run_migrations_on(connection)
+        return
+
+    engine = create_db_engine(get_settings())
+
+    with engine.connect() as connection:
+        run_migrations_on(connection)
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,59 @@
+"""Initial schema, as created by InitSchoolDb.init_db before migrations
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'group',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=20), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name')
+    )
+
+    op.create_table(
+        'course',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=40), nullable=True),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name')
+    )
+
+    op.create_table(
+        'student',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('group_id', sa.Integer(), nullable=True),
+        sa.Column('first_name', sa.String(length=30), nullable=False),
+        sa.Column('last_name', sa.String(length=40), nullable=False),
+        sa.ForeignKeyConstraint(['group_id'], ['group.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    op.create_table(
+        'course_student',
+        sa.Column('course_id', sa.Integer(), nullable=True),
+        sa.Column('student_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['course_id'], ['course.id']),
+        sa.ForeignKeyConstraint(['student_id'], ['student.id'])
+    )
+
+
+def downgrade():
+    op.drop_table('course_student')
+    op.drop_table('student')
+    op.drop_table('course')
+    op.drop_table('group')
@@ -0,0 +1,48 @@
+"""Table versions for HTTP caching and maintained group students counts
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 10:05:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'table_version',
+        sa.Column('table_name', sa.String(length=63), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('table_name')
+    )
+
+    with op.batch_alter_table('group') as batch_op:
+        batch_op.add_column(sa.Column(
+            'students_count', sa.Integer(), nullable=False,
+            server_default='0'
+        ))
+        batch_op.create_index(
+            'ix_group_students_count', ['students_count']
+        )
+
+    op.execute(
+        'UPDATE "group" SET students_count = ('
+        'SELECT count(student.id) FROM student '
+        'WHERE student.group_id = "group".id)'
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('group') as batch_op:
+        batch_op.drop_index('ix_group_students_count')
+        batch_op.drop_column('students_count')
+
+    op.drop_table('table_version')
@@ -0,0 +1,66 @@
+"""Composite primary key on course_student and lookup indexes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 10:10:00
+
+"""
+from alembic import op
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def delete_duplicated_enrollments():
+    op.execute(
+        'DELETE FROM course_student '
+        'WHERE course_id IS NULL OR student_id IS NULL'
+    )
+
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            'DELETE FROM course_student AS a USING course_student AS b '
+            'WHERE a.ctid < b.ctid AND a.course_id = b.course_id '
+            'AND a.student_id = b.student_id'
+        )
+    else:
+        op.execute(
+            'DELETE FROM course_student WHERE rowid NOT IN ('
+            'SELECT min(rowid) FROM course_student '
+            'GROUP BY course_id, student_id)'
+        )
+
+
+def upgrade():
+    delete_duplicated_enrollments()
+
+    with op.batch_alter_table('course_student') as batch_op:
+        batch_op.alter_column('course_id', nullable=False)
+        batch_op.alter_column('student_id', nullable=False)
+        batch_op.create_primary_key(
+            'course_student_pkey', ['course_id', 'student_id']
+        )
+        batch_op.create_index(
+            'ix_course_student_student_id_course_id',
+            ['student_id', 'course_id']
+        )
+
+    op.create_index('ix_student_group_id', 'student', ['group_id'])
+    op.create_index(
+        'ix_student_last_name_first_name', 'student',
+        ['last_name', 'first_name']
+    )
+
+
+def downgrade():
+    op.drop_index('ix_student_last_name_first_name', 'student')
+    op.drop_index('ix_student_group_id', 'student')
+
+    with op.batch_alter_table('course_student') as batch_op:
+        batch_op.drop_index('ix_course_student_student_id_course_id')
+        batch_op.drop_constraint('course_student_pkey', type_='primary')
+        batch_op.alter_column('course_id', nullable=True)
+        batch_op.alter_column('student_id', nullable=True)
@@ -0,0 +1,41 @@
+"""Indexes of the student name search
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 18:00:00
+
+"""
+from alembic import op
+
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+SEARCH_KEYS = (
+    ('ix_student_search_first_last', 'first_name', 'last_name'),
+    ('ix_student_search_last_first', 'last_name', 'first_name')
+)
+
+
+def upgrade():
+    # SQLite searches an in-process index.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for index_name, first_column, second_column in SEARCH_KEYS:
+        op.execute(
+            f'CREATE INDEX {index_name} ON student ('
+            f"(lower({first_column} || ' ' || {second_column}) "
+            'COLLATE "C"), id)'
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for index_name, _, _ in SEARCH_KEYS:
+        op.drop_index(index_name, table_name='student')
@@ -0,0 +1,421 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from engine_factory import create_async_db_engine
+
+from models.models import Course, Group, Student, course_student
+from models import statements
+from models.bulk_operations import is_foreign_key_violation
+from models.entity_cache import EntityCache
+from models.dto import CourseRow, GroupRow, StudentRow, StudentDetails
+from models.table_versions import bump_versions_statement
+from models.table_versions import pop_changed_rows, record_changed_rows
+from models.group_stats import update_students_counts, students_count_deltas
+from models.manage_school_db import StudentNotExistsError
+from models.manage_school_db import StudentAlreadyExistsError
+from models.manage_school_db import StudentNotInCourseError
+from models.manage_school_db import GroupNotExistsError
+from models.manage_school_db import CourseNotExistsError
+
+
+async_db_engine = create_async_db_engine()
+
+
+class AsyncSchoolDb:
+    """Base class of the asyncio interfaces (see ``asgi_api``).
+
+    They issue the same statements as the interfaces
+    of ``models.manage_school_db`` (writes are built by
+    ``models.statements``) but return plain rows (``models.dto``),
+    as ORM objects can not lazy load outside of a greenlet.
+    Writes evict what they changed from ``cache``, the entity cache
+    the sync interfaces read through.
+
+    """
+
+    def __init__(self, course_model=Course, group_model=Group,
+                 student_model=Student,
+                 engine: AsyncEngine = async_db_engine,
+                 cache: EntityCache = None):
+        self._course_model = course_model
+        self._group_model = group_model
+        self._student_model = student_model
+        self._engine = engine
+        self._cache = cache
+
+    @asynccontextmanager
+    async def _begin_write(
+            self, *table_names: str) -> AsyncIterator[AsyncConnection]:
+        async with self._engine.begin() as connection:
+            pop_changed_rows(connection)
+
+            try:
+                yield connection
+            finally:
+                changed_rows = pop_changed_rows(connection)
+
+            if changed_rows:
+                await connection.execute(bump_versions_statement(
+                    connection.dialect.name, table_names
+                ))
+
+    def _evict(self, model, *ids: int) -> None:
+        if self._cache is not None:
+            self._cache.invalidate(model, *ids)
+
+    async def _fetch_all(self, query) -> list:
+        async with self._engine.connect() as connection:
+            return (await connection.execute(query)).all()
+
+    async def _fetch_first(self, query):
+        async with self._engine.connect() as connection:
+            return (await connection.execute(query)).first()
+
+
+class AsyncStudentInterface(AsyncSchoolDb):
+    """Asyncio interface for working with a Student table in db."""
+
+    def _select_student_rows(self):
+        student = self._student_model
+
+        return select(
+            student.id, student.first_name,
+            student.last_name, student.group_id
+        ).order_by(student.id)
+
+    async def get_student_by_id(self, student_id: int) -> StudentRow:
+        row = await self._fetch_first(
+            self._select_student_rows().where(
+                self._student_model.id == student_id
+            )
+        )
+
+        return StudentRow(*row) if row else None
+
+    async def get_student_rows(self) -> List[StudentRow]:
+        return [
+            StudentRow(*row)
+            for row in await self._fetch_all(self._select_student_rows())
+        ]
+
+    async def get_students_page(
+            self, limit: int, after: int = None) -> List[StudentRow]:
+        query = self._select_student_rows().limit(limit)
+
+        if after is not None:
+            query = query.where(self._student_model.id > after)
+
+        return [StudentRow(*row) for row in await self._fetch_all(query)]
+
+    async def iter_students(
+            self, after: int = None,
+            batch_size: int = 1000) -> AsyncIterator[StudentRow]:
+        """Streams students through a server-side cursor."""
+
+        query = self._select_student_rows()
+
+        if after is not None:
+            query = query.where(self._student_model.id > after)
+
+        async with self._engine.connect() as connection:
+            result = await connection.stream(query)
+
+            async for partition in result.partitions(batch_size):
+                for row in partition:
+                    yield StudentRow(*row)
+
+    async def get_student_rows_related_to_course_name(
+            self, course_name: str, limit: int = None,
+            after: int = None) -> List[StudentRow]:
+        """Roster of the course, a keyset page of it if ``limit``
+        or ``after`` is given. An unknown course has no students.
+
+        """
+
+        query = statements.select_course_roster(
+            self._student_model, self._course_model, StudentRow._fields,
+            True, after is not None, limit is not None
+        )
+
+        async with self._engine.connect() as connection:
+            rows = await connection.execute(query, {
+                'course_name': course_name, 'after': after, 'limit': limit
+            })
+
+            return [StudentRow(*row) for row in rows]
+
+    async def count_students_related_to_course_name(
+            self, course_name: str) -> int:
+        async with self._engine.connect() as connection:
+            return await connection.scalar(
+                statements.select_course_students_count(
+                    self._course_model, True
+                ),
+                {'course_name': course_name}
+            )
+
+    async def get_student_details(self, student_id: int) -> StudentDetails:
+        student = self._student_model
+        group = self._group_model
+        course = self._course_model
+
+        async with self._engine.connect() as connection:
+            row = (await connection.execute(
+                select(
+                    student.id, student.first_name, student.last_name,
+                    student.group_id, group.id, group.name
+                ).outerjoin(
+                    group, group.id == student.group_id
+                ).where(student.id == student_id)
+            )).first()
+
+            if not row:
+                return None
+
+            courses = (await connection.execute(
+                select(
+                    course.id, course.name, course.description
+                ).join(
+                    course_student, course_student.c.course_id == course.id
+                ).where(
+                    course_student.c.student_id == student_id
+                ).order_by(course.id)
+            )).all()
+
+        group_row = GroupRow(row[4], row[5]) if row[4] is not None else None
+
+        return StudentDetails(
+            *row[:4], group_row,
+            tuple(CourseRow(*course_) for course_ in courses)
+        )
+
+    async def check_if_student_exists(self, student_id: int) -> bool:
+        return bool(await self._fetch_first(
+            select(self._student_model.id).where(
+                self._student_model.id == student_id
+            )
+        ))
+
+    async def _check_if_course_exists(self, course_name: str) -> bool:
+        return bool(await self._fetch_first(
+            select(self._course_model.id).where(
+                self._course_model.name == course_name
+            )
+        ))
+
+    async def _raise_student_or_course_not_exists(
+            self, student_id: int, course_name: str) -> None:
+        if not await self.check_if_student_exists(student_id):
+            raise StudentNotExistsError(
+                f'Passed invalid student ID ({student_id})!'
+            )
+
+        if not await self._check_if_course_exists(course_name):
+            raise CourseNotExistsError(
+                f'Passed invalid course name ({course_name})!'
+            )
+
+    async def add_new_student(self, id_: int, group_id: int,
+                              first_name: str, last_name: str) -> None:
+        student_table = self._student_model.__table__
+        group_table = self._group_model.__table__
+
+        try:
+            async with self._begin_write(
+                    student_table.name, group_table.name
+            ) as connection:
+                inserted = record_changed_rows(connection, (
+                    await connection.execute(statements.insert_student(
+                        self._student_model, connection.dialect.name
+                    ), {
+                        'id': id_, 'group_id': group_id,
+                        'first_name': first_name, 'last_name': last_name
+                    })
+                ).rowcount)
+
+                if inserted:
+                    await connection.execute(
+                        update_students_counts(group_table),
+                        students_count_deltas({group_id: 1})
+                    )
+        except IntegrityError as err:
+            if is_foreign_key_violation(err):
+                raise GroupNotExistsError(
+                    f'Passed invalid group ID ({group_id})!'
+                ) from err
+            raise
+
+        if not inserted:
+            raise StudentAlreadyExistsError(
+                f'Student with given ID ({id_}) already exists!'
+            )
+
+        self._evict(self._student_model, id_)
+        self._evict(self._group_model, group_id)
+
+    async def add_student_to_course(
+            self, student_id: int, course_name: str) -> None:
+        async with self._begin_write(course_student.name) as connection:
+            inserted = record_changed_rows(connection, (
+                await connection.execute(statements.enroll_student(
+                    self._student_model, self._course_model,
+                    connection.dialect.name
+                ), {'student_id': student_id, 'course_name': course_name})
+            ).rowcount)
+
+        if not inserted:
+            await self._raise_student_or_course_not_exists(
+                student_id, course_name
+            )
+
+        self._evict(self._student_model, student_id)
+
+    async def _delete_student(
+            self, connection: AsyncConnection,
+            student_id: int) -> Tuple[bool, Optional[int]]:
+        """Async counterpart of ``StudentInterface._delete_student``."""
+
+        parameters = {'student_id': student_id}
+
+        if connection.dialect.name == 'postgresql':
+            row = (await connection.execute(
+                statements.delete_student_returning_group(
+                    self._student_model, self._group_model
+                ), parameters
+            )).first()
+
+            if row is None:
+                return False, None
+
+            return True, row[0]
+
+        group_id = await connection.scalar(
+            statements.select_student_group_for_update(self._student_model),
+            parameters
+        )
+
+        await connection.execute(
+            statements.delete_student_enrollments(), parameters
+        )
+
+        if not (await connection.execute(
+                statements.delete_student(self._student_model), parameters
+        )).rowcount:
+            return False, None
+
+        if group_id is not None:
+            await connection.execute(
+                update_students_counts(self._group_model.__table__),
+                students_count_deltas({group_id: -1})
+            )
+
+        return True, group_id
+
+    async def delete_student_by_id(self, student_id: int) -> None:
+        student = self._student_model.__table__
+        group = self._group_model.__table__
+
+        async with self._begin_write(
+                student.name, course_student.name, group.name
+        ) as connection:
+            deleted, group_id = await self._delete_student(
+                connection, student_id
+            )
+
+            if not deleted:
+                raise StudentNotExistsError(
+                    f'Passed invalid student ID ({student_id})!'
+                )
+
+            record_changed_rows(connection, 1)
+
+        self._evict(self._student_model, student_id)
+        self._evict(self._group_model, group_id)
+
+    async def remove_student_from_course(
+            self, student_id: int, course_name: str) -> None:
+        async with self._begin_write(course_student.name) as connection:
+            deleted = record_changed_rows(connection, (
+                await connection.execute(
+                    statements.unenroll_student(self._course_model),
+                    {'student_id': student_id, 'course_name': course_name}
+                )
+            ).rowcount)
+
+        if not deleted:
+            await self._raise_student_or_course_not_exists(
+                student_id, course_name
+            )
+
+            raise StudentNotInCourseError(
+                f'Student ({student_id}) does not have '
+                f'given course ({course_name})!'
+            )
+
+        self._evict(self._student_model, student_id)
+
+
+class AsyncGroupInterface(AsyncSchoolDb):
+    """Asyncio interface for working with a Group table in db."""
+
+    async def get_group_by_id(self, group_id: int) -> GroupRow:
+        group = self._group_model
+
+        row = await self._fetch_first(
+            select(group.id, group.name).where(group.id == group_id)
+        )
+
+        return GroupRow(*row) if row else None
+
+    async def get_group_rows(self) -> List[GroupRow]:
+        group = self._group_model
+
+        return [
+            GroupRow(*row) for row in await self._fetch_all(
+                select(group.id, group.name).order_by(group.id)
+            )
+        ]
+
+    async def get_group_rows_with_less_students_count(
+            self, student_count: int) -> List[GroupRow]:
+        group = self._group_model
+
+        return [
+            GroupRow(*row) for row in await self._fetch_all(
+                select(
+                    group.id, group.name
+                ).where(
+                    group.students_count <= student_count
+                ).order_by(group.id)
+            )
+        ]
+
+
+class AsyncCourseInterface(AsyncSchoolDb):
+    """Asyncio interface for working with a Course table in db."""
+
+    def _select_course_rows(self):
+        course = self._course_model
+
+        return select(
+            course.id, course.name, course.description
+        ).order_by(course.id)
+
+    async def get_course_by_id(self, course_id: int) -> CourseRow:
+        row = await self._fetch_first(
+            self._select_course_rows().where(
+                self._course_model.id == course_id
+            )
+        )
+
+        return CourseRow(*row) if row else None
+
+    async def get_course_rows(self) -> List[CourseRow]:
+        return [
+            CourseRow(*row)
+            for row in await self._fetch_all(self._select_course_rows())
+        ]
@@ -0,0 +1,214 @@
+import csv
+import io
+import time
+from itertools import islice
+from typing import Iterable, Iterator, List, Sequence
+
+from sqlalchemy import Table, func, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
+
+
+FOREIGN_KEY_VIOLATION = '23503'
+
+
+class TableWriteStats:
+    """Rows written into one table and the time it took."""
+
+    def __init__(self, table_name: str, rows: int = 0, seconds: float = 0.0):
+        self.table_name = table_name
+        self.rows = rows
+        self.seconds = seconds
+
+    @property
+    def rows_per_second(self) -> float:
+        if not self.seconds:
+            return float(self.rows)
+
+        return self.rows / self.seconds
+
+    def __repr__(self):
+        return (f'{self.table_name}: {self.rows} rows in '
+                f'{self.seconds:.3f}s ({self.rows_per_second:.0f} rows/s)')
+
+
+class BulkWriteReport:
+    """Collects write statistics for every table touched by a bulk job."""
+
+    def __init__(self):
+        self.tables = {}
+
+    def add(self, table_name: str, rows: int, seconds: float) -> None:
+        stats = self.tables.setdefault(
+            table_name, TableWriteStats(table_name)
+        )
+
+        stats.rows += rows
+        stats.seconds += seconds
+
+    def merge(self, other: 'BulkWriteReport') -> None:
+        for stats in other.tables.values():
+            self.add(stats.table_name, stats.rows, stats.seconds)
+
+    @property
+    def total_rows(self) -> int:
+        return sum(stats.rows for stats in self.tables.values())
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(stats.seconds for stats in self.tables.values())
+
+    @property
+    def rows_per_second(self) -> float:
+        if not self.total_seconds:
+            return float(self.total_rows)
+
+        return self.total_rows / self.total_seconds
+
+    def as_dict(self) -> dict:
+        return {
+            stats.table_name: {
+                'rows': stats.rows,
+                'seconds': round(stats.seconds, 6),
+                'rows_per_second': round(stats.rows_per_second, 2)
+            } for stats in self.tables.values()
+        }
+
+    def __repr__(self):
+        return '\n'.join(repr(stats) for stats in self.tables.values())
+
+
+def chunked(rows: Iterable, chunk_size: int) -> Iterator[List]:
+    if chunk_size <= 0:
+        raise ValueError(f'Chunk size must be positive ({chunk_size})!')
+
+    iterator = iter(rows)
+
+    while chunk := list(islice(iterator, chunk_size)):
+        yield chunk
+
+
+def _copy_chunk(connection: Connection, table: Table,
+                columns: Sequence[str], chunk: List[Sequence]) -> None:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(chunk)
+    buffer.seek(0)
+
+    quoted_columns = ', '.join(f'"{column}"' for column in columns)
+
+    # The csv writer leaves both None and '' unquoted, which COPY reads
+    # as NULL. An empty string stays one in NOT NULL columns.
+    not_null_columns = ', '.join(
+        f'"{column}"' for column in columns if not table.c[column].nullable
+    )
+    options = 'FORMAT csv'
+    if not_null_columns:
+        options += f', FORCE_NOT_NULL ({not_null_columns})'
+
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f'COPY "{table.name}" ({quoted_columns}) '
+            f'FROM STDIN WITH ({options})', buffer
+        )
+    finally:
+        cursor.close()
+
+
+def _insert_chunk(connection: Connection, table: Table,
+                  columns: Sequence[str], chunk: List[Sequence]) -> None:
+    connection.execute(
+        table.insert().values([dict(zip(columns, row)) for row in chunk])
+    )
+
+
+def bulk_write_rows(
+        connection: Connection, table: Table, columns: Sequence[str],
+        rows: Iterable[Sequence], chunk_size: int = 10_000,
+        use_copy: bool = True, report: BulkWriteReport = None) -> int:
+    """Writes rows into the table chunk by chunk.
+
+    On PostgreSQL every chunk is sent with ``COPY ... FROM STDIN``,
+    other dialects (or ``use_copy=False``) get one multi-row INSERT per chunk.
+
+    """
+
+    write_chunk = _insert_chunk
+    if use_copy and connection.dialect.name == 'postgresql':
+        write_chunk = _copy_chunk
+
+    written = 0
+    for chunk in chunked(rows, chunk_size):
+        started = time.perf_counter()
+        write_chunk(connection, table, columns, chunk)
+
+        if report is not None:
+            report.add(table.name, len(chunk), time.perf_counter() - started)
+
+        written += len(chunk)
+
+    return written
+
+
+def next_free_id(connection: Connection, table: Table) -> int:
+    return connection.execute(
+        select(func.coalesce(func.max(table.c.id), 0) + 1)
+    ).scalar()
+
+
+def sync_id_sequence(connection: Connection, table: Table) -> None:
+    """Moves the id sequence past explicitly inserted ids (PostgreSQL)."""
+
+    if connection.dialect.name != 'postgresql':
+        return
+
+    connection.execute(
+        text(
+            "SELECT setval(pg_get_serial_sequence(:table_name, 'id'), "
+            f'(SELECT coalesce(max(id), 0) + 1 FROM "{table.name}"), false)'
+        ), {'table_name': f'"{table.name}"'}
+    )
+
+
+def insert_ignoring_conflicts(dialect_name: str, table: Table):
+    """INSERT ... ON CONFLICT DO NOTHING for the dialect."""
+
+    dialect_inserts = {
+        'postgresql': postgresql.insert,
+        'sqlite': sqlite.insert
+    }
+
+    if (dialect_insert := dialect_inserts.get(dialect_name)):
+        return dialect_insert(table).on_conflict_do_nothing()
+
+    # Other dialects report conflicts with IntegrityError.
+    return table.insert()
+
+
+def is_foreign_key_violation(err: IntegrityError) -> bool:
+    return getattr(err.orig, 'pgcode', None) == FOREIGN_KEY_VIOLATION
+
+
+class RejectedRows:
+    """Counts rejected rows, keeping details only of the first ones.
+
+    So a huge upload full of bad rows cannot blow up the memory.
+
+    """
+
+    def __init__(self, max_details: int = 1000):
+        self._max_details = max_details
+
+        self.count = 0
+        self.details = []
+
+    def add(self, row_reference, errors) -> None:
+        self.count += 1
+
+        if len(self.details) < self._max_details:
+            self.details.append({'row': row_reference, 'errors': errors})
+
+    @property
+    def truncated(self) -> bool:
+        return self.count > len(self.details)
@@ -0,0 +1,196 @@
+import itertools
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class RoundRobinSelector:
+    def __init__(self, engines: Sequence[Engine]):
+        self.engines = tuple(engines)
+        self._engines = itertools.cycle(engines)
+        self._lock = threading.Lock()
+
+    def select(self) -> Engine:
+        with self._lock:
+            return next(self._engines)
+
+
+class LeastConnectionsSelector:
+    """Picks the engine with the fewest connections in use.
+
+    Connections are counted with pool events, so it works
+    with any pool class (NullPool included).
+
+    """
+
+    def __init__(self, engines: Sequence[Engine]):
+        self.engines = tuple(engines)
+        self._engines = list(engines)
+        self._in_use = {id(engine): 0 for engine in self._engines}
+        self._lock = threading.Lock()
+
+        for engine in self._engines:
+            event.listen(engine, 'checkout', self._make_counter(engine, 1))
+            event.listen(engine, 'checkin', self._make_counter(engine, -1))
+
+    def _make_counter(self, engine: Engine, delta: int):
+        key = id(engine)
+
+        def count(*args):
+            with self._lock:
+                self._in_use[key] += delta
+
+        return count
+
+    def connections_in_use(self, engine: Engine) -> int:
+        return self._in_use[id(engine)]
+
+    def select(self) -> Engine:
+        with self._lock:
+            return min(
+                self._engines, key=lambda engine: self._in_use[id(engine)]
+            )
+
+
+REPLICA_SELECTORS = {
+    'round_robin': RoundRobinSelector,
+    'least_connections': LeastConnectionsSelector
+}
+
+
+class _ReadConsistency:
+    def __init__(self, primary_only: bool = False):
+        self.primary_only = primary_only
+        self.wrote = False
+
+        # Set inside ``single_source_reads``.
+        self.single_source = False
+        self.replicas = {}
+        self.table_versions = {}
+
+
+_read_consistency: ContextVar = ContextVar('read_consistency', default=None)
+
+
+def begin_read_consistency(primary_only: bool = False):
+    """Starts a read consistency scope (e.g. one request).
+
+    Inside it reads go to the primary once anything was written,
+    or from the start when ``primary_only`` is set.
+    Returns a token for ``end_read_consistency``.
+
+    """
+
+    return _read_consistency.set(_ReadConsistency(primary_only))
+
+
+def end_read_consistency(token) -> None:
+    _read_consistency.reset(token)
+
+
+@contextmanager
+def read_your_writes():
+    token = begin_read_consistency()
+
+    try:
+        yield
+    finally:
+        end_read_consistency(token)
+
+
+@contextmanager
+def primary_reads():
+    """All reads inside go to the primary."""
+
+    token = begin_read_consistency(primary_only=True)
+
+    try:
+        yield
+    finally:
+        end_read_consistency(token)
+
+
+@contextmanager
+def single_source_reads():
+    """Reads inside go to a single database: the replica picked first
+    serves the rest of them (the primary once something is written).
+
+    So table versions (``remember_table_versions``) describe the data
+    read after them, they never lag behind it.
+
+    """
+
+    token = None
+    if (consistency := _read_consistency.get()) is None:
+        token = begin_read_consistency()
+        consistency = _read_consistency.get()
+
+    if consistency.single_source:
+        yield
+        return
+
+    consistency.single_source = True
+
+    try:
+        yield
+    finally:
+        consistency.single_source = False
+        consistency.replicas.clear()
+        consistency.table_versions.clear()
+
+        if token is not None:
+            end_read_consistency(token)
+
+
+def select_replica(selector) -> Engine:
+    """Engine of ``selector``, the one picked before inside
+    ``single_source_reads``.
+
+    """
+
+    if (consistency := _read_consistency.get()) is None or (
+            not consistency.single_source):
+        return selector.select()
+
+    key = tuple(id(engine) for engine in selector.engines)
+
+    if (engine := consistency.replicas.get(key)) is None:
+        engine = consistency.replicas[key] = selector.select()
+
+    return engine
+
+
+def remember_table_versions(versions: Dict[str, int]) -> None:
+    """Keeps versions read inside ``single_source_reads``
+    for ``get_table_version``.
+
+    """
+
+    if (consistency := _read_consistency.get()) is not None and (
+            consistency.single_source):
+        consistency.table_versions.update(versions)
+
+
+def get_table_version(table_name: str) -> Optional[int]:
+    if (consistency := _read_consistency.get()) is None:
+        return None
+
+    return consistency.table_versions.get(table_name)
+
+
+def mark_write() -> None:
+    if (consistency := _read_consistency.get()) is not None:
+        consistency.wrote = True
+        # Versions read before the write are outdated by it.
+        consistency.table_versions.clear()
+
+
+def reads_from_primary() -> bool:
+    if (consistency := _read_consistency.get()) is None:
+        return False
+
+    return consistency.primary_only or consistency.wrote
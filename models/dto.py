@@ -0,0 +1,91 @@
+from typing import NamedTuple, Optional, Sequence, Tuple
+
+
+class GroupRow(NamedTuple):
+    id: int
+    name: str
+
+    def __str__(self):
+        return f'Group id: {self.id}, name: {self.name!r}'
+
+
+class CourseRow(NamedTuple):
+    id: int
+    name: str
+    description: str
+
+    def __str__(self):
+        return (f'Subject id: {self.id}, name: {self.name!r}, '
+                f'description: {self.description!r}')
+
+
+class StudentRow(NamedTuple):
+    id: int
+    first_name: str
+    last_name: str
+    group_id: int
+
+    def __str__(self):
+        return (
+            f'Student id: {self.id} - {self.first_name} {self.last_name}, '
+            f'Group id: {self.group_id}'
+        )
+
+
+class StudentDetails(NamedTuple):
+    id: int
+    first_name: str
+    last_name: str
+    group_id: int
+    group: Optional[GroupRow]
+    courses: Tuple[CourseRow, ...]
+
+    def __str__(self):
+        return (
+            f'Student id: {self.id} - {self.first_name} {self.last_name}, '
+            f'Group id: {self.group_id}'
+        )
+
+
+class GroupRoster(NamedTuple):
+    group: GroupRow
+    # StudentRow, or tuples of the selected columns.
+    students: Sequence[tuple]
+    # Ids of the students, in their order: keyset cursors of the pages.
+    student_ids: Sequence[int]
+
+
+class StudentsPage(NamedTuple):
+    # StudentRow, or tuples of the selected columns.
+    students: Sequence[tuple]
+    # Ids of the students, in their order: keyset cursors of the pages.
+    student_ids: Sequence[int]
+
+
+class CourseEnrollments(NamedTuple):
+    id: int
+    name: str
+    students_count: int
+
+
+class GroupSize(NamedTuple):
+    id: int
+    name: str
+    students_count: int
+
+
+class CourseLoad(NamedTuple):
+    courses_count: int
+    students_count: int
+    # Of all students, and of the ones taking at most ``courses_count``.
+    share: float
+    cumulative_share: float
+
+
+class StudentMatch(NamedTuple):
+    id: int
+    first_name: str
+    last_name: str
+    group_id: int
+    # Search key that matched, "first last" or "last first" in lower case.
+    matched_name: str
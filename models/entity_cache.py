@@ -0,0 +1,187 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+
+class LRUTTLCacheBackend:
+    """In-process cache with a size limit (LRU) and time to live.
+
+    It is local to a worker process, so writes made by other processes
+    become visible only when entries expire.
+
+    """
+
+    def __init__(self, max_size: int = 10_000, ttl: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        if max_size <= 0:
+            raise ValueError(f'Max size must be positive ({max_size})!')
+
+        self._max_size = max_size
+        self._ttl = ttl
+        self._clock = clock
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            if (entry := self._entries.get(key)) is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.evictions += 1
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: dict) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + self._ttl, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisCacheBackend:
+    """Cache shared between processes, stored in Redis.
+
+    Needs the optional ``redis`` package. Redis itself expires
+    and evicts entries, so ``evictions`` is always 0 here.
+
+    """
+
+    def __init__(self, client=None, url: str = 'redis://localhost:6379/0',
+                 ttl: float = 30.0, prefix: str = 'school:'):
+        if client is None:
+            try:
+                import redis
+            except ImportError as err:
+                raise RuntimeError(
+                    'RedisCacheBackend requires the redis package!'
+                ) from err
+
+            client = redis.Redis.from_url(url)
+
+        self._client = client
+        self._ttl = ttl
+        self._prefix = prefix
+
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[dict]:
+        if (value := self._client.get(self._prefix + key)) is None:
+            return None
+
+        return json.loads(value)
+
+    def set(self, key: str, value: dict) -> None:
+        self._client.set(
+            self._prefix + key, json.dumps(value),
+            px=int(self._ttl * 1000)
+        )
+
+    def delete(self, *keys: str) -> None:
+        if keys:
+            self._client.delete(*(self._prefix + key for key in keys))
+
+    def clear(self) -> None:
+        keys = list(self._client.scan_iter(match=self._prefix + '*'))
+
+        if keys:
+            self._client.delete(*keys)
+
+
+class EntityCache:
+    """Read-through cache of detached entity snapshots.
+
+    Only plain column values are cached, every hit builds a new
+    transient instance, so callers never share (or mutate) cached state.
+    A snapshot keeps the version (``table_version``) of its table it
+    was read at and is only served for that version, so writes made
+    through other processes outdate it too.
+
+    """
+
+    def __init__(self, backend=None):
+        self._backend = backend if backend is not None else (
+            LRUTTLCacheBackend()
+        )
+
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(model, id_: int) -> str:
+        return f'{model.__tablename__}:{id_}'
+
+    @staticmethod
+    def _snapshot(instance) -> dict:
+        return {
+            column.key: getattr(instance, column.key)
+            for column in instance.__mapper__.column_attrs
+        }
+
+    def get_or_load(self, model, id_: int, version: int, loader: Callable):
+        """``version`` is the current one of the table of ``model``,
+        read before calling the ``loader``.
+
+        """
+
+        key = self.make_key(model, id_)
+
+        if (entry := self._backend.get(key)) is not None and (
+                entry['version'] == version):
+            with self._lock:
+                self.hits += 1
+            return model(**entry['columns'])
+
+        with self._lock:
+            self.misses += 1
+
+        if (instance := loader()) is not None:
+            self._backend.set(key, {
+                'version': version, 'columns': self._snapshot(instance)
+            })
+
+        return instance
+
+    def invalidate(self, model, *ids: int) -> None:
+        self._backend.delete(*(self.make_key(model, id_) for id_ in ids))
+
+        with self._lock:
+            self.invalidations += len(ids)
+
+    def clear(self) -> None:
+        self._backend.clear()
+
+    def stats(self) -> dict:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self._backend.evictions,
+            'invalidations': self.invalidations
+        }
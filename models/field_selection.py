@@ -0,0 +1,39 @@
+"""Columns of a model, and of its relationships, a query loads.
+
+A ``FieldSelection`` turns into ORM loader options: ``load_only``
+for the columns, ``joinedload`` for a related object, ``selectinload``
+for a related collection and ``raiseload`` for every other
+relationship, so touching anything not selected raises
+instead of quietly issuing another query.
+
+"""
+
+from typing import NamedTuple, Tuple
+
+from sqlalchemy.orm import joinedload, load_only, raiseload, selectinload
+
+
+class FieldSelection(NamedTuple):
+    # Attribute names of the columns, the primary key is always loaded.
+    columns: Tuple[str, ...]
+    # (relationship name, FieldSelection of the related model) pairs.
+    relationships: Tuple[Tuple[str, 'FieldSelection'], ...] = ()
+
+    def loader_options(self, model) -> list:
+        options = [
+            load_only(*(getattr(model, column) for column in self.columns))
+        ]
+
+        for name, selection in self.relationships:
+            relationship = getattr(model, name)
+            loader = (
+                selectinload if relationship.property.uselist else joinedload
+            )
+
+            options.append(loader(relationship).options(
+                *selection.loader_options(relationship.property.mapper.class_)
+            ))
+
+        options.append(raiseload('*'))
+
+        return options
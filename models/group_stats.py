@@ -0,0 +1,57 @@
+from typing import Dict, List
+
+from sqlalchemy import Table, bindparam, func, select, update
+
+
+def students_count_deltas(deltas: Dict[int, int]) -> List[dict]:
+    """Parameters for ``update_students_counts``, one set per group.
+
+    Ordered by group id, so concurrent writers lock group rows
+    in the same order and cannot deadlock each other.
+
+    """
+
+    return [
+        {'changed_group_id': group_id, 'delta': delta}
+        for group_id, delta in sorted(deltas.items()) if delta
+    ]
+
+
+def update_students_counts(group: Table):
+    """UPDATE adding ``delta`` to the count of ``changed_group_id``,
+    meant to be executed with ``students_count_deltas``.
+
+    """
+
+    return update(group).where(
+        group.c.id == bindparam('changed_group_id')
+    ).values(students_count=group.c.students_count + bindparam('delta'))
+
+
+def _actual_counts(group: Table, student: Table):
+    return select(
+        func.count(student.c.id)
+    ).where(student.c.group_id == group.c.id).scalar_subquery()
+
+
+def select_students_count_mismatches(group: Table, student: Table):
+    """Groups whose stored count differs from the real one:
+    (group id, stored count, real count).
+
+    """
+
+    actual_count = _actual_counts(group, student)
+
+    return select(
+        group.c.id, group.c.students_count, actual_count
+    ).where(group.c.students_count != actual_count).order_by(group.c.id)
+
+
+def rebuild_students_counts(group: Table, student: Table):
+    """UPDATE setting every wrong count to the real one."""
+
+    actual_count = _actual_counts(group, student)
+
+    return update(group).where(
+        group.c.students_count != actual_count
+    ).values(students_count=actual_count)
@@ -1,11 +1,41 @@
-from typing import List
+import threading
+from contextlib import contextmanager
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
-from sqlalchemy import select, func
-from sqlalchemy.orm import Session, selectinload, joinedload
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
 
-from app import db_engine
+from app import db_engine, db_replica_engines, db_replica_selection
 
 from models.models import Course, Group, Student, SchoolBase
+from models.models import course_student
+from models import statements
+from models.bulk_operations import BulkWriteReport, bulk_write_rows
+from models.bulk_operations import next_free_id, sync_id_sequence
+from models.bulk_operations import insert_ignoring_conflicts
+from models.bulk_operations import is_foreign_key_violation
+from models.bulk_operations import chunked, RejectedRows
+from models.entity_cache import EntityCache
+from models.db_routing import REPLICA_SELECTORS, mark_write
+from models.db_routing import primary_reads, reads_from_primary
+from models.db_routing import get_table_version, remember_table_versions
+from models.db_routing import select_replica, single_source_reads
+from models.dto import CourseRow, GroupRow, StudentRow, StudentDetails
+from models.dto import GroupRoster, StudentMatch, StudentsPage
+from models.dto import CourseEnrollments, CourseLoad, GroupSize
+from models.field_selection import FieldSelection
+from models.table_versions import SELECT_TABLE_STATES, TableState
+from models.table_versions import bump_table_versions, read_table_states
+from models.table_versions import pop_changed_rows, record_changed_rows
+from models.group_stats import update_students_counts, students_count_deltas
+from models.group_stats import rebuild_students_counts
+from models.group_stats import select_students_count_mismatches
+from models.student_search import StudentNameIndex, normalize_query
+from models.student_search import rank_matches, select_name_matches
+from models import school_stats
 
 from school_generator.school_data_generator import StudentGenerator
 from school_generator.school_data_generator import GroupGenerator
@@ -14,18 +44,178 @@ from school_generator.school_data_generator import AssignStudentGroup
 from school_generator.school_data_generator import AssignStudentCourse
 
 
+class StudentNotExistsError(ValueError):
+    pass
+
+
+class StudentAlreadyExistsError(ValueError):
+    pass
+
+
+class StudentNotInCourseError(ValueError):
+    pass
+
+
+class GroupNotExistsError(ValueError):
+    pass
+
+
+class CourseNotExistsError(ValueError):
+    pass
+
+
+class EnrollmentStatus:
+    ENROLLED = 'enrolled'
+    ALREADY_ENROLLED = 'already_enrolled'
+    REMOVED = 'removed'
+    NOT_ENROLLED = 'not_enrolled'
+    STUDENT_NOT_FOUND = 'student_not_found'
+    COURSE_NOT_FOUND = 'course_not_found'
+
+
 class SchoolDb:
     """Base class to inherit."""
 
     def __init__(
             self, course_model=Course, group_model=Group,
-            student_model=Student, base=SchoolBase, engine=db_engine
+            student_model=Student, base=SchoolBase, engine=db_engine,
+            cache: EntityCache = None,
+            replica_engines: Sequence[Engine] = db_replica_engines,
+            replica_selection: str = db_replica_selection
     ):
         self._course_model = course_model
         self._group_model = group_model
         self._student_model = student_model
         self._base = base
         self._engine = engine
+        self._cache = cache
+
+        self._replica_selector = None
+        if replica_engines:
+            self._replica_selector = REPLICA_SELECTORS[replica_selection](
+                replica_engines
+            )
+
+    def _read_engine(self) -> Engine:
+        """Engine for read-only queries.
+
+        A replica unless there are none or the current context
+        needs to read from the primary (see ``models.db_routing``).
+
+        """
+
+        if self._replica_selector is None or reads_from_primary():
+            return self._engine
+
+        return select_replica(self._replica_selector)
+
+    @contextmanager
+    def _begin_write(self, *table_names: str) -> Iterator[Connection]:
+        """Transaction on the primary bumping versions of the given tables
+        if it changed rows (see ``record_changed_rows``).
+
+        """
+
+        mark_write()
+
+        with self._engine.begin() as connection:
+            pop_changed_rows(connection)
+
+            try:
+                yield connection
+            finally:
+                changed_rows = pop_changed_rows(connection)
+
+            if changed_rows:
+                bump_table_versions(connection, table_names)
+
+    def get_table_states(
+            self, table_names: Iterable[str]) -> Dict[str, TableState]:
+        """Versions of the given tables, those never written are left out.
+
+        Inside ``single_source_reads`` they are remembered (0 for those
+        never written) as the versions of the data read afterwards.
+
+        """
+
+        table_names = sorted(set(table_names))
+
+        with self._read_engine().connect() as connection:
+            states = read_table_states(connection.execute(
+                SELECT_TABLE_STATES, {'table_names': table_names}
+            ))
+
+        remember_table_versions({
+            table_name: states[table_name].version
+            if table_name in states else 0
+            for table_name in table_names
+        })
+
+        return states
+
+    def _get_by_id(self, model, id_: int, fields: FieldSelection = None):
+        if fields is not None:
+            # Partially loaded objects never go to the cache.
+            with Session(self._read_engine()) as session:
+                return session.get(
+                    model, id_, options=fields.loader_options(model)
+                )
+
+        def load():
+            with Session(self._read_engine()) as session:
+                return session.get(model, id_)
+
+        if self._cache is None:
+            return load()
+
+        # The version and the entity come from the same database, a
+        # cached entity of an older version (e.g. cached by another
+        # worker before a write) is loaded again.
+        with single_source_reads():
+            if (version := get_table_version(model.__tablename__)) is None:
+                version = self.get_table_states(
+                    (model.__tablename__,)
+                ).get(model.__tablename__, TableState(0, None)).version
+
+            return self._cache.get_or_load(model, id_, version, load)
+
+    @staticmethod
+    def _select_rows(model, row_type, columns: Sequence[str] = None):
+        """Column-only select of ``model`` ordered by id, of ``columns``
+        or of the fields of the ``row_type`` named tuple.
+
+        """
+
+        return statements.select_rows(
+            model, tuple(columns or row_type._fields)
+        )
+
+    def _read_rows(self, query, row_type, columns: Sequence[str] = None,
+                   parameters: dict = None) -> list:
+        """Rows of a column-only ``query``, ``row_type`` named tuples
+        unless it selects ``columns``. No ORM objects, identity map
+        or instance state are involved.
+
+        """
+
+        with self._read_engine().connect() as connection:
+            result = connection.execute(query, parameters)
+
+            if columns:
+                return result.all()
+
+            return list(map(row_type._make, result))
+
+    @staticmethod
+    def _with_fields(query, model, fields: FieldSelection = None):
+        if fields is None:
+            return query
+
+        return query.options(*fields.loader_options(model))
+
+    def _evict(self, model, *ids: int) -> None:
+        if self._cache is not None:
+            self._cache.invalidate(model, *ids)
 
 
 class InitSchoolDb(SchoolDb):
@@ -126,6 +316,18 @@ class InitSchoolDb(SchoolDb):
 
         self._init_student_courses()
 
+    def _finish_init(self, connection: Connection) -> None:
+        connection.execute(rebuild_students_counts(
+            self._group_model.__table__, self._student_model.__table__
+        ))
+
+        bump_table_versions(connection, (
+            self._group_model.__tablename__,
+            self._course_model.__tablename__,
+            self._student_model.__tablename__,
+            course_student.name
+        ))
+
     def init_db(self) -> None:
         self._base.metadata.create_all(self._engine)
 
@@ -133,9 +335,132 @@ class InitSchoolDb(SchoolDb):
         self._init_course_model()
         self._init_student_model()
 
+        with self._engine.begin() as connection:
+            self._finish_init(connection)
+
     def test_students(self):
         self._init_student_model()
 
+    def _bulk_init_named_model(
+            self, connection: Connection, model, rows: List[dict],
+            chunk_size: int, report: BulkWriteReport) -> Dict[str, int]:
+        table = model.__table__
+
+        bulk_write_rows(
+            connection, table, list(rows[0]) if rows else [],
+            [tuple(row.values()) for row in rows], chunk_size,
+            use_copy=False, report=report
+        )
+
+        # Groups and courses are few, so one select resolves all their IDs.
+        return dict(
+            connection.execute(select(table.c.name, table.c.id)).all()
+        )
+
+    def _bulk_init_student_model(
+            self, connection: Connection, group_ids: Dict[str, int],
+            chunk_size: int, use_copy: bool,
+            report: BulkWriteReport) -> Dict[str, int]:
+        """Writes students with explicitly assigned IDs.
+
+        Returns the ID of the first student inserted with each full name,
+        the same student ``init_db`` finds by first and last name.
+
+        """
+
+        table = self._student_model.__table__
+
+        group_students = AssignStudentGroup.assign_student_to_group(
+            self._students, self._groups
+        )
+
+        first_id_by_name = {}
+        student_id = next_free_id(connection, table)
+
+        def student_rows():
+            nonlocal student_id
+
+            for group, students in group_students.items():
+                group_id = group_ids[group]
+
+                for student_name in students:
+                    first_name, last_name = student_name.split()
+                    first_id_by_name.setdefault(student_name, student_id)
+
+                    yield student_id, group_id, first_name, last_name
+                    student_id += 1
+
+        bulk_write_rows(
+            connection, table, ('id', 'group_id', 'first_name', 'last_name'),
+            student_rows(), chunk_size, use_copy, report
+        )
+        sync_id_sequence(connection, table)
+
+        return first_id_by_name
+
+    def _bulk_init_student_courses(
+            self, connection: Connection, student_ids: Dict[str, int],
+            course_ids: Dict[str, int], chunk_size: int, use_copy: bool,
+            report: BulkWriteReport) -> None:
+        student_courses = AssignStudentCourse.assign_student_to_course(
+            self._students, self._courses
+        )
+
+        course_student_rows = (
+            (course_ids[course], student_ids[student])
+            for student, courses in student_courses.items()
+            # Students left without a group were never written.
+            if student in student_ids
+            for course in courses
+        )
+
+        bulk_write_rows(
+            connection, course_student, ('course_id', 'student_id'),
+            course_student_rows, chunk_size, use_copy, report
+        )
+
+    def bulk_init_db(self, chunk_size: int = 10_000,
+                     use_copy: bool = True) -> BulkWriteReport:
+        """Fills db with the same data as ``init_db`` in one transaction.
+
+        Rows are written in chunks of ``chunk_size`` (``COPY`` on PostgreSQL
+        when ``use_copy`` is set, multi-row INSERT otherwise) and IDs are
+        resolved once instead of being looked up for every student.
+
+        """
+
+        self._base.metadata.create_all(self._engine)
+
+        report = BulkWriteReport()
+
+        with self._engine.begin() as connection:
+            group_ids = self._bulk_init_named_model(
+                connection, self._group_model,
+                [{'name': group_name} for group_name in self._groups],
+                chunk_size, report
+            )
+
+            course_ids = self._bulk_init_named_model(
+                connection, self._course_model,
+                [{'name': course,
+                  'description': f'Test description for {course}'}
+                 for course in self._courses],
+                chunk_size, report
+            )
+
+            student_ids = self._bulk_init_student_model(
+                connection, group_ids, chunk_size, use_copy, report
+            )
+
+            self._bulk_init_student_courses(
+                connection, student_ids, course_ids,
+                chunk_size, use_copy, report
+            )
+
+            self._finish_init(connection)
+
+        return report
+
 
 class DropSchoolDb(SchoolDb):
     def drop_tables(self):
@@ -157,142 +482,796 @@ class StudentInterface(SchoolDb):
 
     """
 
-    def get_all_students(self) -> List[Student]:
-        with Session(self._engine) as session:
-            return session.execute(select(self._student_model)).all()
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
 
-    def get_student_by_id(self, student_id: int) -> Student:
-        with Session(self._engine) as session:
-            return session.get(self._student_model, student_id)
+        # Name search of dialects without the search indexes,
+        # rebuilt when the version of the student table changes.
+        self._name_index = None
+        self._name_index_state = None
+        self._name_index_lock = threading.Lock()
+
+    def get_all_students(
+            self, fields: FieldSelection = None) -> List[Student]:
+        student = self._student_model
+
+        query = self._with_fields(
+            select(student).order_by(student.id), student, fields
+        )
+
+        with Session(self._read_engine()) as session:
+            return session.execute(query).all()
+
+    def get_student_by_id(
+            self, student_id: int, fields: FieldSelection = None) -> Student:
+        return self._get_by_id(self._student_model, student_id, fields)
+
+    def get_students_page(
+            self, limit: int, after: int = None,
+            fields: FieldSelection = None) -> List[Student]:
+        """Returns up to ``limit`` students with id greater than ``after``.
+
+        Keyset pagination on the primary key, so every page
+        costs the same no matter how deep it is.
+
+        """
+
+        query = self._with_fields(
+            select(
+                self._student_model
+            ).order_by(self._student_model.id).limit(limit),
+            self._student_model, fields
+        )
+
+        if after is not None:
+            query = query.where(self._student_model.id > after)
+
+        with Session(self._read_engine()) as session:
+            return session.execute(query).all()
+
+    def iter_students(
+            self, after: int = None, batch_size: int = 1000,
+            columns: Sequence[str] = None) -> Iterator[tuple]:
+        """Yields ``columns`` (by default id, first_name, last_name
+        and group_id) of every student.
+
+        Rows are fetched through a server-side cursor ``batch_size``
+        at a time and never hydrated into ORM objects, so memory
+        does not grow with the table. The database is picked by the
+        call, not by the first row, so a stream started inside
+        ``single_source_reads`` reads from its database.
+
+        """
+
+        query = self._select_student_rows(columns)
+
+        if after is not None:
+            query = query.where(self._student_model.id > after)
+
+        return self._stream_rows(self._read_engine(), query, batch_size)
+
+    @staticmethod
+    def _stream_rows(engine: Engine, query,
+                     batch_size: int) -> Iterator[tuple]:
+        with engine.connect() as connection:
+            result = connection.execution_options(
+                stream_results=True
+            ).execute(query)
+
+            for partition in result.partitions(batch_size):
+                yield from partition
 
     def get_students_related_to_course(
-            self, course_name: str) -> List[Student] or None:
-        with Session(self._engine) as session:
-            course = session.execute(
-                select(
-                    self._course_model
-                ).where(
-                    self._course_model.name == course_name
-                )
+            self, course_name: str, fields: FieldSelection = None,
+            limit: int = None,
+            after: int = None) -> List[Student] or None:
+        """Students of the course ordered by id, a keyset page of them
+        if ``limit`` or ``after`` is given.
+
+        """
+
+        with Session(self._read_engine()) as session:
+            course_id = session.execute(
+                statements.select_course_id_by_name(self._course_model),
+                {'course_name': course_name}
             ).scalar()
 
             # if course with given name is not exists.
-            if not course:
+            if course_id is None:
                 return None
 
             students = session.execute(
-                select(
-                    self._student_model
-                ).where(
-                    self._student_model.courses.contains(course)
-                ).options(
-                    selectinload(self._student_model.courses)
-                ).order_by(self._student_model.id)
+                statements.select_students_of_course(
+                    self._student_model, fields,
+                    after is not None, limit is not None
+                ),
+                {'course_id': course_id, 'after': after, 'limit': limit}
             ).all()
 
             return students
 
     def get_student_with_full_info(self, student_id: int) -> Student:
-        with Session(self._engine) as session:
+        with Session(self._read_engine()) as session:
             student = session.execute(
-                select(
+                statements.select_student_with_full_info(
                     self._student_model
-                ).where(
-                    self._student_model.id == student_id
-                ).options(
-                    joinedload(self._student_model.group),
-                    selectinload(self._student_model.courses)
-                )
+                ),
+                {'student_id': student_id}
             ).scalar()
 
             return student
 
     def add_new_student(self, id_: int, group_id: int, first_name: str,
                         last_name: str) -> None:
-        with Session(self._engine) as session:
-            new_student = self._student_model(
-                id=id_, group_id=group_id,
-                first_name=first_name, last_name=last_name
+        """Inserts a student with a single INSERT ... ON CONFLICT DO NOTHING.
+
+        Raises StudentAlreadyExistsError if the id is taken
+        and GroupNotExistsError if the group does not exist.
+
+        """
+
+        student_table = self._student_model.__table__
+        group_table = self._group_model.__table__
+
+        try:
+            with self._begin_write(
+                    student_table.name, group_table.name
+            ) as connection:
+                inserted = record_changed_rows(connection, connection.execute(
+                    statements.insert_student(
+                        self._student_model, connection.dialect.name
+                    ), {
+                        'id': id_, 'group_id': group_id,
+                        'first_name': first_name, 'last_name': last_name
+                    }
+                ).rowcount)
+
+                if inserted:
+                    connection.execute(
+                        update_students_counts(group_table),
+                        students_count_deltas({group_id: 1})
+                    )
+        except IntegrityError as err:
+            if is_foreign_key_violation(err):
+                raise GroupNotExistsError(
+                    f'Passed invalid group ID ({group_id})!'
+                ) from err
+            raise
+
+        if not inserted:
+            raise StudentAlreadyExistsError(
+                f'Student with given ID ({id_}) already exists!'
             )
 
-            session.add(new_student)
-            session.flush()
-            session.commit()
+        self._evict(self._student_model, id_)
+        self._evict(self._group_model, group_id)
 
     def check_if_student_exists(self, student_id: int) -> bool:
-        with Session(self._engine) as session:
+        with Session(self._read_engine()) as session:
             return bool(session.get(self._student_model, student_id))
 
-    def add_student_to_course(self, student_id: int, course_name: str) -> None:
-        with Session(self._engine) as session:
-            if not (student := session.get(self._student_model, student_id)):
-                session.rollback()
-                raise ValueError(f'Passed invalid student ID ({student_id})!')
-
-            course = session.execute(
+    def _check_if_course_exists(self, course_name: str) -> bool:
+        with Session(self._read_engine()) as session:
+            return bool(session.execute(
                 select(
-                    self._course_model
+                    self._course_model.id
                 ).where(self._course_model.name == course_name)
-            ).scalar()
+            ).first())
+
+    def _raise_student_or_course_not_exists(
+            self, student_id: int, course_name: str) -> None:
+        """Tells which of the two is missing after a write touched no rows."""
+
+        with primary_reads():
+            if not self.check_if_student_exists(student_id):
+                raise StudentNotExistsError(
+                    f'Passed invalid student ID ({student_id})!'
+                )
 
-            if not course:
-                session.rollback()
-                raise ValueError(
+            if not self._check_if_course_exists(course_name):
+                raise CourseNotExistsError(
                     f'Passed invalid course name ({course_name})!'
                 )
 
-            student.courses.append(course)
+    def add_student_to_course(self, student_id: int, course_name: str) -> None:
+        with self._begin_write(course_student.name) as connection:
+            # Enrolling twice is a no-op (ON CONFLICT DO NOTHING).
+            inserted = record_changed_rows(connection, connection.execute(
+                statements.enroll_student(
+                    self._student_model, self._course_model,
+                    connection.dialect.name
+                ),
+                {'student_id': student_id, 'course_name': course_name}
+            ).rowcount)
 
-            session.flush()
-            session.commit()
+        if not inserted:
+            self._raise_student_or_course_not_exists(student_id, course_name)
+
+        self._evict(self._student_model, student_id)
+
+    def _delete_student(self, connection: Connection,
+                        student_id: int) -> Tuple[bool, Optional[int]]:
+        """Returns whether the student was deleted and its group ID.
+
+        One statement on PostgreSQL, elsewhere the student row is locked
+        and the rest is deleted and counted statement by statement.
+
+        """
+
+        parameters = {'student_id': student_id}
+
+        if connection.dialect.name == 'postgresql':
+            row = connection.execute(
+                statements.delete_student_returning_group(
+                    self._student_model, self._group_model
+                ), parameters
+            ).first()
+
+            if row is None:
+                return False, None
+
+            return True, row[0]
+
+        group_id = connection.execute(
+            statements.select_student_group_for_update(self._student_model),
+            parameters
+        ).scalar()
+
+        connection.execute(statements.delete_student_enrollments(), parameters)
+
+        if not connection.execute(
+                statements.delete_student(self._student_model), parameters
+        ).rowcount:
+            return False, None
+
+        if group_id is not None:
+            connection.execute(
+                update_students_counts(self._group_model.__table__),
+                students_count_deltas({group_id: -1})
+            )
+
+        return True, group_id
 
     def delete_student_by_id(self, student_id: int) -> None:
-        with Session(self._engine) as session:
-            if not self.check_if_student_exists(student_id):
-                session.rollback()
-                raise ValueError(f'Passed invalid student ID ({student_id})!')
+        student = self._student_model.__table__
+        group = self._group_model.__table__
 
-            session.delete(session.get(self._student_model, student_id))
-            session.flush()
+        with self._begin_write(
+                student.name, course_student.name, group.name
+        ) as connection:
+            deleted, group_id = self._delete_student(connection, student_id)
 
-            session.commit()
+            if not deleted:
+                raise StudentNotExistsError(
+                    f'Passed invalid student ID ({student_id})!'
+                )
+
+            record_changed_rows(connection, 1)
+
+        self._evict(self._student_model, student_id)
+        self._evict(self._group_model, group_id)
 
     def remove_student_from_course(
             self, student_id: int, course_name: str) -> None:
-        with Session(self._engine) as session:
-            if not (student := session.get(self._student_model, student_id)):
-                session.rollback()
-                raise ValueError(f'Passed invalid student ID ({student_id})!')
+        with self._begin_write(course_student.name) as connection:
+            deleted = record_changed_rows(connection, connection.execute(
+                statements.unenroll_student(self._course_model),
+                {'student_id': student_id, 'course_name': course_name}
+            ).rowcount)
+
+        if not deleted:
+            self._raise_student_or_course_not_exists(student_id, course_name)
+
+            raise StudentNotInCourseError(
+                f'Student ({student_id}) does not have '
+                f'given course ({course_name})!'
+            )
 
-            course = session.execute(
-                select(
-                    self._course_model
-                ).where(
-                    self._course_model.name == course_name
+        self._evict(self._student_model, student_id)
+
+    def _resolve_course_ids(
+            self, connection: Connection, course_names: Iterable[str],
+            course_ids: Dict[str, int]) -> None:
+        """Adds IDs of not yet resolved course names (None if missing)."""
+
+        if not (unknown_names := set(course_names) - course_ids.keys()):
+            return
+
+        course = self._course_model.__table__
+
+        course_ids.update(connection.execute(
+            select(course.c.name, course.c.id).where(
+                course.c.name.in_(unknown_names)
+            )
+        ).all())
+
+        for course_name in unknown_names:
+            course_ids.setdefault(course_name, None)
+
+    def _change_enrollments_at_once(
+            self, connection: Connection, chunk: List[Tuple[int, str]],
+            enroll: bool) -> Dict[Tuple[int, str], tuple]:
+        """Looks the chunk up and writes it with one statement."""
+
+        rows = connection.execute(
+            statements.change_enrollments(
+                self._student_model, self._course_model, enroll
+            ), {
+                'student_ids': [student_id for student_id, _ in chunk],
+                'course_names': [course_name for _, course_name in chunk]
+            }
+        )
+
+        return {
+            (student_id, course_name): (student_found, course_id, changed)
+            for student_id, course_name, student_found, course_id, changed
+            in rows
+        }
+
+    def _lookup_and_change_enrollments(
+            self, connection: Connection, chunk: List[Tuple[int, str]],
+            enroll: bool, course_ids: Dict[str, int]
+    ) -> Dict[Tuple[int, str], tuple]:
+        """Dialects without data-modifying CTEs: looks up existing
+        students and their enrollments first, then writes the changes.
+
+        """
+
+        student = self._student_model.__table__
+
+        self._resolve_course_ids(
+            connection, (course_name for _, course_name in chunk), course_ids
+        )
+
+        student_ids = {student_id for student_id, _ in chunk}
+        chunk_course_ids = {
+            course_ids[course_name] for _, course_name in chunk
+        } - {None}
+
+        existing_students = set(connection.execute(
+            select(student.c.id).where(student.c.id.in_(student_ids))
+        ).scalars())
+
+        enrollments = set(connection.execute(
+            select(
+                course_student.c.student_id, course_student.c.course_id
+            ).where(
+                course_student.c.student_id.in_(existing_students),
+                course_student.c.course_id.in_(chunk_course_ids)
+            )
+        ).all()) if existing_students and chunk_course_ids else set()
+
+        results = {}
+        rows_to_change = set()
+        for student_id, course_name in chunk:
+            course_id = course_ids[course_name]
+            enrollment = (student_id, course_id)
+            changed = (
+                student_id in existing_students and course_id is not None
+                and enroll != (enrollment in enrollments)
+            )
+
+            if changed:
+                rows_to_change.add(enrollment)
+
+            results[student_id, course_name] = (
+                student_id in existing_students, course_id, changed
+            )
+
+        if rows_to_change and enroll:
+            # Concurrent batches may have enrolled some meanwhile.
+            connection.execute(insert_ignoring_conflicts(
+                connection.dialect.name, course_student
+            ).values([
+                {'student_id': student_id, 'course_id': course_id}
+                for student_id, course_id in rows_to_change
+            ]))
+        elif rows_to_change:
+            connection.execute(delete(course_student).where(
+                tuple_(
+                    course_student.c.student_id, course_student.c.course_id
+                ).in_(rows_to_change)
+            ))
+
+        return results
+
+    def _change_enrollments(
+            self, pairs: Iterable[Tuple[int, str]], enroll: bool,
+            chunk_size: int) -> List[str]:
+        statuses = []
+        course_ids = {}
+        changed_students = set()
+
+        with self._begin_write(course_student.name) as connection:
+            at_once = connection.dialect.name == 'postgresql'
+
+            for chunk in chunked(pairs, chunk_size):
+                if at_once:
+                    results = self._change_enrollments_at_once(
+                        connection, chunk, enroll
+                    )
+                else:
+                    results = self._lookup_and_change_enrollments(
+                        connection, chunk, enroll, course_ids
+                    )
+
+                # A pair repeated in the chunk is changed only once.
+                changed_enrollments = set()
+                for student_id, course_name in chunk:
+                    student_found, course_id, changed = results[
+                        student_id, course_name
+                    ]
+                    enrollment = (student_id, course_id)
+
+                    if not student_found:
+                        status = EnrollmentStatus.STUDENT_NOT_FOUND
+                    elif course_id is None:
+                        status = EnrollmentStatus.COURSE_NOT_FOUND
+                    elif changed and enrollment not in changed_enrollments:
+                        changed_enrollments.add(enrollment)
+                        status = (EnrollmentStatus.ENROLLED if enroll
+                                  else EnrollmentStatus.REMOVED)
+                    elif enroll:
+                        status = EnrollmentStatus.ALREADY_ENROLLED
+                    else:
+                        status = EnrollmentStatus.NOT_ENROLLED
+
+                    statuses.append(status)
+
+                record_changed_rows(connection, len(changed_enrollments))
+                changed_students.update(
+                    student_id for student_id, _ in changed_enrollments
                 )
-            ).scalar()
 
-            if not course:
-                session.rollback()
-                raise ValueError(f'Passed invalid course name! {course_name}')
+        if changed_students:
+            self._evict(self._student_model, *changed_students)
 
-            student.courses.remove(course)
+        return statuses
 
-            session.flush()
-            session.commit()
+    def add_students_to_courses(
+            self, pairs: Iterable[Tuple[int, str]],
+            chunk_size: int = 1000) -> List[str]:
+        """Enrolls (student_id, course_name) pairs in one transaction.
 
-    def get_students_related_to_group(self, group_id: int) -> List[Student]:
-        with Session(self._engine) as session:
-            group = session.get(self._group_model, group_id)
+        On PostgreSQL every chunk is looked up and written by one
+        INSERT ... SELECT ... ON CONFLICT DO NOTHING, other dialects
+        look students, courses and enrollments up first.
+        Returns an EnrollmentStatus for every pair, in the same order.
+
+        """
+
+        return self._change_enrollments(pairs, True, chunk_size)
+
+    def remove_students_from_courses(
+            self, pairs: Iterable[Tuple[int, str]],
+            chunk_size: int = 1000) -> List[str]:
+        """Batch counterpart of ``remove_student_from_course``.
+
+        Returns an EnrollmentStatus for every pair, in the same order.
+
+        """
+
+        return self._change_enrollments(pairs, False, chunk_size)
+
+    def _reject_unknown_students_rows(
+            self, connection: Connection, chunk: List[tuple],
+            group_ids: Dict[int, bool], rejected: RejectedRows) -> List[tuple]:
+        student = self._student_model.__table__
+        group = self._group_model.__table__
+
+        if unknown_groups := {row[2] for row in chunk} - group_ids.keys():
+            existing_groups = set(connection.execute(
+                select(group.c.id).where(group.c.id.in_(unknown_groups))
+            ).scalars())
+
+            for group_id in unknown_groups:
+                group_ids[group_id] = group_id in existing_groups
+
+        taken_ids = set(connection.execute(
+            select(student.c.id).where(
+                student.c.id.in_({row[1] for row in chunk})
+            )
+        ).scalars())
+
+        valid_rows = []
+        for row_reference, id_, group_id, first_name, last_name in chunk:
+            if id_ in taken_ids:
+                rejected.add(
+                    row_reference, f'Student with given id ({id_}) '
+                                   'already exists!'
+                )
+            elif not group_ids[group_id]:
+                rejected.add(
+                    row_reference, f'Group with given id ({group_id}) '
+                                   'does not exists!'
+                )
+            else:
+                taken_ids.add(id_)
+                valid_rows.append((id_, group_id, first_name, last_name))
+
+        return valid_rows
+
+    def import_students(
+            self, rows: Iterable[Tuple[object, int, int, str, str]],
+            rejected: RejectedRows, chunk_size: int = 10_000,
+            use_copy: bool = True) -> BulkWriteReport:
+        """Writes a stream of students in one transaction.
+
+        ``rows`` are (row_reference, id, group_id, first_name, last_name)
+        tuples, the reference identifies a row in ``rejected``. Each chunk
+        gets its IDs and groups checked with one query apiece (groups
+        already seen are not queried again) and is written with COPY.
+
+        """
+
+        student = self._student_model.__table__
+        group = self._group_model.__table__
 
+        report = BulkWriteReport()
+        group_ids = {}
+        added_to_groups = Counter()
+
+        with self._begin_write(student.name, group.name) as connection:
+            for chunk in chunked(rows, chunk_size):
+                valid_rows = self._reject_unknown_students_rows(
+                    connection, chunk, group_ids, rejected
+                )
+
+                bulk_write_rows(
+                    connection, student,
+                    ('id', 'group_id', 'first_name', 'last_name'),
+                    valid_rows, chunk_size, use_copy, report
+                )
+
+                record_changed_rows(connection, len(valid_rows))
+                added_to_groups.update(row[1] for row in valid_rows)
+
+            if added_to_groups:
+                connection.execute(
+                    update_students_counts(group),
+                    students_count_deltas(added_to_groups)
+                )
+
+            sync_id_sequence(connection, student)
+
+        self._evict(self._group_model, *added_to_groups)
+
+        return report
+
+    def get_students_related_to_group(self, group_id: int) -> List[Student]:
+        with Session(self._read_engine()) as session:
             students = session.execute(
                 select(
                     self._student_model
-                ).where(self._student_model.group == group)
+                ).where(
+                    self._student_model.group_id == group_id
+                ).order_by(self._student_model.id)
             ).all()
 
             return students
 
+    def _select_student_rows(self, columns: Sequence[str] = None):
+        return self._select_rows(self._student_model, StudentRow, columns)
+
+    def get_student_rows(
+            self, columns: Sequence[str] = None) -> List[StudentRow]:
+        """All students as plain rows, without ORM objects."""
+
+        return self._read_rows(
+            self._select_student_rows(columns), StudentRow, columns
+        )
+
+    def _read_students_page(
+            self, query, columns: Sequence[str] = None,
+            parameters: dict = None) -> StudentsPage:
+        """Page of a ``query`` selecting the student id before
+        the columns.
+
+        """
+
+        with self._read_engine().connect() as connection:
+            rows = connection.execute(query, parameters).all()
+
+        make_row = tuple if columns else StudentRow._make
+
+        return StudentsPage(
+            [make_row(row[1:]) for row in rows], [row[0] for row in rows]
+        )
+
+    def get_student_rows_page(
+            self, limit: int, after: int = None,
+            columns: Sequence[str] = None) -> StudentsPage:
+        """Rows of ``get_students_page``."""
+
+        query = statements.select_rows_page(
+            self._student_model, tuple(columns or StudentRow._fields),
+            after is not None
+        )
+
+        return self._read_students_page(
+            query, columns, {'limit': limit, 'after': after}
+        )
+
+    def get_student_rows_related_to_group(
+            self, group_id: int) -> List[StudentRow]:
+        query = self._select_student_rows().where(
+            self._student_model.group_id == group_id
+        )
+
+        return self._read_rows(query, StudentRow)
+
+    def _read_course_roster(
+            self, parameters: dict, columns: Sequence[str] = None,
+            limit: int = None, after: int = None) -> List[StudentRow]:
+        query = statements.select_course_roster(
+            self._student_model, self._course_model,
+            tuple(columns or StudentRow._fields),
+            'course_name' in parameters, after is not None,
+            limit is not None
+        )
+
+        return self._read_rows(
+            query, StudentRow, columns,
+            {**parameters, 'after': after, 'limit': limit}
+        )
+
+    def get_student_rows_related_to_course(
+            self, course_id: int, columns: Sequence[str] = None,
+            limit: int = None, after: int = None) -> List[StudentRow]:
+        """Roster of the course in one statement: students ordered
+        by id, a keyset page of them if ``limit`` or ``after`` is given.
+
+        """
+
+        return self._read_course_roster(
+            {'course_id': course_id}, columns, limit, after
+        )
+
+    def get_student_rows_related_to_course_name(
+            self, course_name: str, columns: Sequence[str] = None,
+            limit: int = None, after: int = None) -> List[StudentRow]:
+        """Roster of the course with the given name, its id is looked up
+        within the same statement. An unknown course has no students.
+
+        """
+
+        return self._read_course_roster(
+            {'course_name': course_name}, columns, limit, after
+        )
+
+    def get_student_rows_page_related_to_course_name(
+            self, course_name: str, limit: int, after: int = None,
+            columns: Sequence[str] = None) -> StudentsPage:
+        """Keyset page of the roster of the course with the given name."""
+
+        query = statements.select_course_roster(
+            self._student_model, self._course_model,
+            tuple(columns or StudentRow._fields), True, after is not None,
+            True, True
+        )
+
+        return self._read_students_page(query, columns, {
+            'course_name': course_name, 'after': after, 'limit': limit
+        })
+
+    def _count_course_students(self, parameters: dict) -> int:
+        with self._read_engine().connect() as connection:
+            return connection.execute(
+                statements.select_course_students_count(
+                    self._course_model, 'course_name' in parameters
+                ),
+                parameters
+            ).scalar()
+
+    def count_students_related_to_course(self, course_id: int) -> int:
+        return self._count_course_students({'course_id': course_id})
+
+    def count_students_related_to_course_name(
+            self, course_name: str) -> int:
+        return self._count_course_students({'course_name': course_name})
+
+    def get_student_details(self, student_id: int) -> StudentDetails:
+        """Student with the student's group and courses,
+        in two statements.
+
+        """
+
+        student = self._student_model
+        group = self._group_model
+        course = self._course_model
+
+        with self._read_engine().connect() as connection:
+            row = connection.execute(
+                select(
+                    student.id, student.first_name, student.last_name,
+                    student.group_id, group.id, group.name
+                ).outerjoin(
+                    group, group.id == student.group_id
+                ).where(student.id == student_id)
+            ).first()
+
+            if not row:
+                return None
+
+            courses = connection.execute(
+                select(
+                    course.id, course.name, course.description
+                ).join(
+                    course_student, course_student.c.course_id == course.id
+                ).where(
+                    course_student.c.student_id == student_id
+                ).order_by(course.id)
+            ).all()
+
+        group_row = GroupRow(row[4], row[5]) if row[4] is not None else None
+
+        return StudentDetails(
+            *row[:4], group_row,
+            tuple(CourseRow(*course_) for course_ in courses)
+        )
+
+    def get_student_profile(self, student_id: int) -> StudentDetails:
+        """Same as ``get_student_details``, but in a single statement
+        on PostgreSQL (a lateral join aggregating the courses to JSON).
+
+        """
+
+        engine = self._read_engine()
+
+        if engine.dialect.name != 'postgresql':
+            return self.get_student_details(student_id)
+
+        with engine.connect() as connection:
+            row = connection.execute(
+                statements.select_student_profile(
+                    self._student_model, self._group_model,
+                    self._course_model
+                ),
+                {'student_id': student_id}
+            ).first()
+
+        if not row:
+            return None
+
+        group_row = GroupRow(row[4], row[5]) if row[4] is not None else None
+
+        return StudentDetails(
+            *row[:4], group_row,
+            tuple(CourseRow(*course_) for course_ in row[6])
+        )
+
+    def _get_name_index(self) -> StudentNameIndex:
+        table_name = self._student_model.__tablename__
+        state = self.get_table_states((table_name,)).get(table_name)
+
+        with self._name_index_lock:
+            if self._name_index is None or self._name_index_state != state:
+                self._name_index = StudentNameIndex(self.get_student_rows())
+                self._name_index_state = state
+
+            return self._name_index
+
+    def search_students(self, query: str, limit: int) -> List[StudentMatch]:
+        """Students whose "first last" or "last first" name starts
+        with ``query``, best matches first (see ``models.student_search``).
+
+        """
+
+        if not (query := normalize_query(query)):
+            return []
+
+        engine = self._read_engine()
+
+        if engine.dialect.name != 'postgresql':
+            return self._get_name_index().search(query, limit)
+
+        with engine.connect() as connection:
+            return rank_matches(
+                connection.execute(select_name_matches(
+                    self._student_model.__table__, query, limit
+                )), limit
+            )
+
 
 class GroupInterface(SchoolDb):
     """Class that provides an interface
@@ -301,51 +1280,170 @@ class GroupInterface(SchoolDb):
     """
 
     def get_all_groups(self) -> List[Group]:
-        with Session(self._engine) as session:
+        with Session(self._read_engine()) as session:
             return session.execute(select(self._group_model)).all()
 
-    def get_group_by_id(self, group_id: int) -> Group:
-        with Session(self._engine) as session:
-            return session.get(self._group_model, group_id)
+    def get_group_by_id(
+            self, group_id: int, fields: FieldSelection = None) -> Group:
+        return self._get_by_id(self._group_model, group_id, fields)
 
     def get_group_with_less_students_count(
             self, student_count: int) -> List[Group]:
-        with Session(self._engine) as session:
-            groups = session.execute(
-                select(
-                    self._group_model, func.count(
-                        self._student_model.id
-                    ).label('students_count')
-                ).join_from(
-                    self._group_model, self._student_model
-                ).group_by(
-                    self._group_model.id
-                ).having(
-                    func.count('students_count') <= student_count
-                ).order_by(self._group_model.id)
+        """Groups (empty ones included) with at most ``student_count``
+        students, read from the maintained ``students_count`` column.
+
+        """
+
+        with Session(self._read_engine()) as session:
+            return session.execute(
+                statements.select_groups_with_less_students(
+                    self._group_model
+                ),
+                {'students_count': student_count}
             ).all()
 
-            return groups
+    def get_group_rows(
+            self, columns: Sequence[str] = None) -> List[GroupRow]:
+        return self._read_rows(
+            self._select_rows(self._group_model, GroupRow, columns),
+            GroupRow, columns
+        )
+
+    def get_group_rows_with_less_students_count(
+            self, student_count: int,
+            columns: Sequence[str] = None) -> List[GroupRow]:
+        """Rows of ``get_group_with_less_students_count``."""
+
+        query = statements.select_groups_with_less_students(
+            self._group_model, tuple(columns or GroupRow._fields)
+        )
+
+        return self._read_rows(
+            query, GroupRow, columns, {'students_count': student_count}
+        )
+
+    def get_group_roster(
+            self, group_id: int, columns: Sequence[str] = None,
+            limit: int = None, after: int = None) -> GroupRoster:
+        """The group and its students ordered by id (a keyset page
+        of them if ``limit`` or ``after`` is given) in one statement.
+        None if there is no group with the given id.
+
+        """
+
+        query = statements.select_group_roster(
+            self._student_model, self._group_model,
+            tuple(columns or StudentRow._fields),
+            after is not None, limit is not None
+        )
+
+        with self._read_engine().connect() as connection:
+            rows = connection.execute(query, {
+                'group_id': group_id, 'after': after, 'limit': limit
+            }).all()
+
+        if not rows:
+            return None
+
+        make_row = tuple if columns else StudentRow._make
+        student_rows = [row for row in rows if row[2] is not None]
+
+        return GroupRoster(
+            GroupRow(*rows[0][:2]),
+            [make_row(row[3:]) for row in student_rows],
+            [row[2] for row in student_rows]
+        )
 
     def check_if_group_exists(self, group_id: int) -> bool:
-        with Session(self._engine) as session:
+        with Session(self._read_engine()) as session:
             return bool(session.get(self._group_model, group_id))
 
+    def check_students_counts(self) -> List[Tuple[int, int, int]]:
+        """(group id, stored count, real count) of every group
+        whose ``students_count`` is out of sync.
+
+        """
+
+        with self._engine.connect() as connection:
+            return [tuple(row) for row in connection.execute(
+                select_students_count_mismatches(
+                    self._group_model.__table__, self._student_model.__table__
+                )
+            )]
+
+    def rebuild_students_counts(self) -> int:
+        """Fixes every wrong ``students_count``, returns how many were."""
+
+        group = self._group_model.__table__
+
+        with self._begin_write(group.name) as connection:
+            fixed = record_changed_rows(connection, connection.execute(
+                rebuild_students_counts(group, self._student_model.__table__)
+            ).rowcount)
 
-class CourseInterface:
+        if self._cache is not None:
+            self._cache.clear()
+
+        return fixed
+
+
+class CourseInterface(SchoolDb):
     """Class that provides an interface
         for working with  a Course table in db.
 
     """
 
-    def __init__(self, course_model=Course, engine=db_engine):
-        self._course = course_model
-        self._engine = engine
-
     def get_all_courses(self) -> List[Course]:
-        with Session(self._engine) as session:
-            return session.execute(select(self._course)).all()
+        with Session(self._read_engine()) as session:
+            return session.execute(select(self._course_model)).all()
+
+    def get_course_rows(
+            self, columns: Sequence[str] = None) -> List[CourseRow]:
+        return self._read_rows(
+            self._select_rows(self._course_model, CourseRow, columns),
+            CourseRow, columns
+        )
 
-    def get_course_by_id(self, course_id: int) -> Course:
-        with Session(self._engine) as session:
-            return session.get(self._course, course_id)
+    def get_course_by_id(
+            self, course_id: int, fields: FieldSelection = None) -> Course:
+        return self._get_by_id(self._course_model, course_id, fields)
+
+
+class StatsInterface(SchoolDb):
+    """Aggregates of the school computed in SQL, see
+    ``models.school_stats``.
+
+    """
+
+    def get_course_enrollments(self) -> List[CourseEnrollments]:
+        return self._read_rows(
+            school_stats.select_course_enrollments(self._course_model),
+            CourseEnrollments
+        )
+
+    def get_group_sizes(self) -> List[GroupSize]:
+        return self._read_rows(
+            school_stats.select_group_sizes(
+                self._group_model, self._student_model
+            ),
+            GroupSize
+        )
+
+    def get_small_groups(self, students_count: int) -> List[GroupSize]:
+        """Groups (empty ones included) with at most ``students_count``
+        students, counted in the student table.
+
+        """
+
+        return self._read_rows(
+            school_stats.select_small_groups(
+                self._group_model, self._student_model
+            ),
+            GroupSize, parameters={'students_count': students_count}
+        )
+
+    def get_course_loads(self) -> List[CourseLoad]:
+        return self._read_rows(
+            school_stats.select_course_loads(self._student_model),
+            CourseLoad
+        )
@@ -1,13 +1,19 @@
-from sqlalchemy import Column, Integer, String, Table, ForeignKey
+from sqlalchemy import Column, DateTime, Integer, String, Table, ForeignKey
+from sqlalchemy import DDL, Index, event
 from sqlalchemy.orm import declarative_base, relationship
 
+from models.student_search import SEARCH_KEYS
+
 SchoolBase = declarative_base()
 
 
+# The primary key serves lookups by course,
+# the reverse index the ones by student.
 course_student = Table(
     'course_student', SchoolBase.metadata,
-    Column('course_id', Integer, ForeignKey('course.id')),
-    Column('student_id', Integer, ForeignKey('student.id'))
+    Column('course_id', Integer, ForeignKey('course.id'), primary_key=True),
+    Column('student_id', Integer, ForeignKey('student.id'), primary_key=True),
+    Index('ix_course_student_student_id_course_id', 'student_id', 'course_id')
 )
 
 
@@ -17,6 +23,12 @@ class Group(SchoolBase):
     id = Column(Integer, primary_key=True)
     name = Column(String(20), nullable=False, unique=True)
 
+    # Kept up to date by every transaction adding or removing students
+    # (see models.group_stats), so filtering by it is an index range scan.
+    students_count = Column(
+        Integer, nullable=False, default=0, server_default='0', index=True
+    )
+
     students = relationship('Student', back_populates='group')
 
     def __repr__(self):
@@ -26,8 +38,12 @@ class Group(SchoolBase):
 class Student(SchoolBase):
     __tablename__ = 'student'
 
+    __table_args__ = (
+        Index('ix_student_last_name_first_name', 'last_name', 'first_name'),
+    )
+
     id = Column(Integer, primary_key=True)
-    group_id = Column(ForeignKey('group.id'))
+    group_id = Column(ForeignKey('group.id'), index=True)
 
     first_name = Column(String(30), nullable=False)
     last_name = Column(String(40), nullable=False)
@@ -46,6 +62,16 @@ class Student(SchoolBase):
         )
 
 
+# Indexes of the name search (models.student_search). SQLite has
+# no "C" collation and searches an in-process index instead.
+for index_name, first_column, second_column in SEARCH_KEYS:
+    event.listen(Student.__table__, 'after_create', DDL(
+        f'CREATE INDEX {index_name} ON student ('
+        f"(lower({first_column} || ' ' || {second_column}) COLLATE \"C\"), "
+        'id)'
+    ).execute_if(dialect='postgresql'))
+
+
 class Course(SchoolBase):
     __tablename__ = 'course'
 
@@ -56,3 +82,21 @@ class Course(SchoolBase):
     def __repr__(self):
         return (f'Subject id: {self.id}, name: {self.name!r}, '
                 f'description: {self.description!r}')
+
+
+class TableVersion(SchoolBase):
+    """Version of a table, bumped by every transaction writing into it.
+
+    ETags and Last-Modified of HTTP responses are built from it.
+
+    """
+
+    __tablename__ = 'table_version'
+
+    table_name = Column(String(63), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self):
+        return (f'Table {self.table_name!r} version: {self.version}, '
+                f'updated at: {self.updated_at}')
@@ -0,0 +1,105 @@
+"""Aggregates of the school computed in SQL (``/api/v1/stats/``).
+
+Link tables are grouped on their own first, names are joined to the
+(far fewer) aggregated rows. Statements are built once per models,
+values are bound at execution.
+
+"""
+
+from functools import lru_cache
+
+from sqlalchemy import Float, bindparam, cast, func, select
+
+from models.models import course_student
+
+
+# Tables an aggregate is computed from, its cached result
+# is outdated once the version of any of them changes.
+STATS_TABLES = {
+    'course_enrollments': ('course', 'course_student'),
+    'group_sizes': ('group', 'student'),
+    'course_loads': ('student', 'course_student'),
+    'small_groups': ('group', 'student')
+}
+
+
+def _group_sizes(group, student):
+    """(group id, name, students count) of every group, empty ones too."""
+
+    sizes = select(
+        student.group_id, func.count().label('students_count')
+    ).where(
+        student.group_id.isnot(None)
+    ).group_by(student.group_id).subquery('group_sizes')
+
+    students_count = func.coalesce(sizes.c.students_count, 0)
+
+    return select(
+        group.id, group.name, students_count.label('students_count')
+    ).outerjoin(
+        sizes, sizes.c.group_id == group.id
+    ).order_by(group.id), students_count
+
+
+@lru_cache(maxsize=None)
+def select_course_enrollments(course):
+    """(course id, name, students count) of every course, empty ones too."""
+
+    enrollments = select(
+        course_student.c.course_id, func.count().label('students_count')
+    ).group_by(course_student.c.course_id).subquery('enrollments')
+
+    return select(
+        course.id, course.name,
+        func.coalesce(enrollments.c.students_count, 0)
+    ).outerjoin(
+        enrollments, enrollments.c.course_id == course.id
+    ).order_by(course.id)
+
+
+@lru_cache(maxsize=None)
+def select_group_sizes(group, student):
+    return _group_sizes(group, student)[0]
+
+
+@lru_cache(maxsize=None)
+def select_small_groups(group, student):
+    """Groups with at most bound ``students_count`` students."""
+
+    query, students_count = _group_sizes(group, student)
+
+    return query.where(students_count <= bindparam('students_count'))
+
+
+@lru_cache(maxsize=None)
+def select_course_loads(student):
+    """How many students take each number of courses (0 included):
+    (courses count, students count, share of all students, share
+    of the students taking at most that many courses).
+
+    """
+
+    loads = select(
+        course_student.c.student_id, func.count().label('courses_count')
+    ).group_by(course_student.c.student_id).subquery('loads')
+
+    courses_count = func.coalesce(
+        loads.c.courses_count, 0
+    ).label('courses_count')
+
+    student_loads = select(courses_count).select_from(student).outerjoin(
+        loads, loads.c.student_id == student.id
+    ).subquery('student_loads')
+
+    students_count = func.count()
+    all_students = cast(func.sum(students_count).over(), Float)
+
+    return select(
+        student_loads.c.courses_count, students_count,
+        cast(students_count, Float) / all_students,
+        cast(func.sum(students_count).over(
+            order_by=student_loads.c.courses_count
+        ), Float) / all_students
+    ).group_by(
+        student_loads.c.courses_count
+    ).order_by(student_loads.c.courses_count)
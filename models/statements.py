@@ -0,0 +1,427 @@
+"""Statements of the hot interface methods, built once and reused.
+
+Building a ``select()`` with its loader options costs more Python time
+than executing an already built one. Every function here builds its
+statement on the first call for its arguments (models of an interface,
+selected columns) and returns the same object afterwards, values are
+bound at execution. SQLAlchemy memoizes the cache key of a statement
+object and takes its compiled form from the compiled cache of the
+engine, so a call only binds parameters.
+
+Arguments must be hashable, columns are tuples.
+
+"""
+
+from functools import lru_cache
+from typing import Tuple
+
+from sqlalchemy import JSON, Integer, String, and_, bindparam, delete, func
+from sqlalchemy import literal_column, select, update
+from sqlalchemy import true
+from sqlalchemy import type_coerce
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import joinedload, selectinload
+
+from models.bulk_operations import insert_ignoring_conflicts
+from models.field_selection import FieldSelection
+from models.models import course_student
+
+
+@lru_cache(maxsize=None)
+def select_rows(model, columns: Tuple[str, ...]):
+    return select(
+        *(getattr(model, column) for column in columns)
+    ).order_by(model.id)
+
+
+@lru_cache(maxsize=None)
+def select_rows_page(model, columns: Tuple[str, ...], after: bool):
+    """The id (the cursor of the next page), then ``columns``.
+    Binds ``limit`` and, if ``after``, the ``after`` id.
+
+    """
+
+    query = select(
+        model.id.label('page_id'),
+        *(getattr(model, column) for column in columns)
+    ).order_by(model.id).limit(bindparam('limit'))
+
+    if after:
+        query = query.where(model.id > bindparam('after'))
+
+    return query
+
+
+def _course_id(course, by_name: bool):
+    """Bound ``course_id``, or the id of the course with bound
+    ``course_name`` (no course, no id) if ``by_name``.
+
+    """
+
+    if not by_name:
+        return bindparam('course_id')
+
+    return select(course.id).where(
+        course.name == bindparam('course_name')
+    ).scalar_subquery()
+
+
+def _roster_page(query, after: bool, limited: bool):
+    """Keyset page of a roster ordered by ``course_student.student_id``."""
+
+    if after:
+        query = query.where(course_student.c.student_id > bindparam('after'))
+
+    if limited:
+        query = query.limit(bindparam('limit'))
+
+    return query
+
+
+@lru_cache(maxsize=None)
+def select_course_roster(student, course, columns: Tuple[str, ...],
+                         by_name: bool = False, after: bool = False,
+                         limited: bool = False, with_ids: bool = False):
+    """Students of a course ordered by id, through the primary key
+    of ``course_student`` (course_id, student_id), which both filters
+    and orders them. Binds ``after`` and ``limit`` if asked to.
+    With ``with_ids`` the student id (the cursor of the next page)
+    is selected before ``columns``.
+
+    """
+
+    selected = [getattr(student, column) for column in columns]
+
+    if with_ids:
+        selected.insert(0, student.id.label('page_id'))
+
+    query = select(*selected).join(
+        course_student, course_student.c.student_id == student.id
+    ).where(
+        course_student.c.course_id == _course_id(course, by_name)
+    ).order_by(course_student.c.student_id)
+
+    return _roster_page(query, after, limited)
+
+
+@lru_cache(maxsize=None)
+def select_course_students_count(course, by_name: bool = False):
+    return select(func.count()).select_from(course_student).where(
+        course_student.c.course_id == _course_id(course, by_name)
+    )
+
+
+@lru_cache(maxsize=None)
+def select_course_id_by_name(course):
+    """Binds ``course_name``."""
+
+    return select(course.id).where(course.name == bindparam('course_name'))
+
+
+@lru_cache(maxsize=None)
+def select_students_of_course(student, fields: FieldSelection = None,
+                              after: bool = False, limited: bool = False):
+    """Students (ORM) of the course with bound ``course_id``,
+    with their courses unless ``fields`` are selected.
+    Binds ``after`` and ``limit`` if asked to.
+
+    """
+
+    query = _roster_page(select(student).join(
+        course_student, course_student.c.student_id == student.id
+    ).where(
+        course_student.c.course_id == bindparam('course_id')
+    ).order_by(course_student.c.student_id), after, limited)
+
+    if fields is None:
+        return query.options(selectinload(student.courses))
+
+    return query.options(*fields.loader_options(student))
+
+
+@lru_cache(maxsize=None)
+def select_student_with_full_info(student):
+    """Binds ``student_id``."""
+
+    return select(student).where(
+        student.id == bindparam('student_id')
+    ).options(
+        joinedload(student.group),
+        selectinload(student.courses)
+    )
+
+
+@lru_cache(maxsize=None)
+def select_groups_with_less_students(group, columns: Tuple[str, ...] = None):
+    """Binds ``students_count``, groups are ORM objects
+    unless ``columns`` are given.
+
+    """
+
+    query = select_rows(group, columns) if columns else select(
+        group
+    ).order_by(group.id)
+
+    return query.where(group.students_count <= bindparam('students_count'))
+
+
+@lru_cache(maxsize=None)
+def select_group_roster(student, group, columns: Tuple[str, ...],
+                        after: bool = False, limited: bool = False):
+    """The group with bound ``group_id`` joined to its students
+    ordered by id: group id and name, student id, then ``columns``.
+
+    The join is an outer one filtering ``student.group_id``, so an
+    empty group (or a page after its last student) still gives the
+    group, in a single row without a student. Binds ``after``
+    and ``limit`` if asked to.
+
+    """
+
+    in_group = student.group_id == group.id
+
+    if after:
+        in_group = and_(in_group, student.id > bindparam('after'))
+
+    query = select(
+        group.id, group.name, student.id.label('roster_student_id'),
+        *(getattr(student, column) for column in columns)
+    ).select_from(
+        group
+    ).outerjoin(
+        student, in_group
+    ).where(group.id == bindparam('group_id')).order_by(student.id)
+
+    if limited:
+        query = query.limit(bindparam('limit'))
+
+    return query
+
+
+@lru_cache(maxsize=None)
+def select_student_profile(student, group, course):
+    """Binds ``student_id``.
+
+    One row per student: the aggregate of the lateral subquery
+    gives a (maybe empty) JSON array of its courses.
+
+    """
+
+    courses = select(
+        type_coerce(func.coalesce(
+            func.json_agg(aggregate_order_by(
+                func.json_build_array(
+                    course.id, course.name, course.description
+                ),
+                course.id
+            )),
+            literal_column("'[]'::json")
+        ), JSON).label('courses')
+    ).select_from(
+        course_student.join(course, course.id == course_student.c.course_id)
+    ).where(
+        course_student.c.student_id == student.id
+    ).lateral('student_courses')
+
+    return select(
+        student.id, student.first_name, student.last_name,
+        student.group_id, group.id, group.name, courses.c.courses
+    ).select_from(
+        student
+    ).outerjoin(
+        group, group.id == student.group_id
+    ).join(
+        courses, true()
+    ).where(student.id == bindparam('student_id'))
+
+
+# Writes, shared by the sync (``manage_school_db``) and the asyncio
+# (``async_school_db``) interfaces. Dialect specific ones take
+# the dialect name of the connection.
+
+
+@lru_cache(maxsize=None)
+def insert_student(student, dialect_name: str):
+    """Executed with the values of the new student,
+    inserts nothing if the id is taken.
+
+    """
+
+    return insert_ignoring_conflicts(dialect_name, student.__table__)
+
+
+@lru_cache(maxsize=None)
+def enroll_student(student, course, dialect_name: str):
+    """Enrolls the student with bound ``student_id`` to the course with
+    bound ``course_name``, inserts nothing if either does not exist
+    or the student is enrolled already.
+
+    """
+
+    student = student.__table__
+    course = course.__table__
+
+    return insert_ignoring_conflicts(
+        dialect_name, course_student
+    ).from_select(
+        ['course_id', 'student_id'],
+        select(course.c.id, student.c.id).select_from(
+            # Both sides are filtered down to a single row.
+            course.join(student, true())
+        ).where(
+            course.c.name == bindparam('course_name'),
+            student.c.id == bindparam('student_id')
+        )
+    )
+
+
+@lru_cache(maxsize=None)
+def unenroll_student(course):
+    """Removes the student with bound ``student_id``
+    from the course with bound ``course_name``.
+
+    """
+
+    return delete(course_student).where(
+        course_student.c.student_id == bindparam('student_id'),
+        course_student.c.course_id.in_(
+            select(course.id).where(course.name == bindparam('course_name'))
+        )
+    )
+
+
+@lru_cache(maxsize=None)
+def change_enrollments(student, course, enroll: bool):
+    """PostgreSQL only: enrolls (or, unless ``enroll``, unenrolls)
+    the pairs of bound ``student_ids`` and ``course_names`` arrays
+    in one statement.
+
+    Returns a row for every pair: student id, course name, whether
+    the student exists, the course id (None if there is no such course)
+    and whether the statement changed its enrollment. Pairs already
+    enrolled (not enrolled) are left as they are.
+
+    """
+
+    student = student.__table__
+    course = course.__table__
+
+    pairs = select(
+        func.unnest(
+            bindparam('student_ids', type_=postgresql.ARRAY(Integer))
+        ).label('student_id'),
+        func.unnest(
+            bindparam('course_names', type_=postgresql.ARRAY(String))
+        ).label('course_name')
+    ).cte('pairs')
+
+    found = select(
+        pairs.c.student_id, pairs.c.course_name,
+        student.c.id.label('found_student_id'),
+        course.c.id.label('course_id')
+    ).select_from(
+        pairs.outerjoin(
+            student, student.c.id == pairs.c.student_id
+        ).outerjoin(course, course.c.name == pairs.c.course_name)
+    ).cte('found')
+
+    if enroll:
+        changed = insert_ignoring_conflicts(
+            'postgresql', course_student
+        ).from_select(
+            ['student_id', 'course_id'],
+            select(found.c.found_student_id, found.c.course_id).where(
+                found.c.found_student_id.isnot(None),
+                found.c.course_id.isnot(None)
+            ).distinct()
+        )
+    else:
+        # Rendered as DELETE ... USING found.
+        changed = delete(course_student).where(
+            course_student.c.student_id == found.c.found_student_id,
+            course_student.c.course_id == found.c.course_id
+        )
+
+    changed = changed.returning(
+        course_student.c.student_id, course_student.c.course_id
+    ).cte('changed')
+
+    return select(
+        found.c.student_id, found.c.course_name,
+        found.c.found_student_id.isnot(None), found.c.course_id,
+        changed.c.student_id.isnot(None)
+    ).select_from(found.outerjoin(changed, and_(
+        changed.c.student_id == found.c.found_student_id,
+        changed.c.course_id == found.c.course_id
+    )))
+
+
+@lru_cache(maxsize=None)
+def delete_student_returning_group(student, group):
+    """PostgreSQL only: deletes the student with bound ``student_id``
+    with its enrollments and takes it off the count of its group,
+    in one statement. Returns (group id, enrollments deleted), no row
+    if there is no such student.
+
+    Foreign keys are checked at the end of the statement, so the
+    enrollments and the student go in the same one.
+
+    """
+
+    student = student.__table__
+    group = group.__table__
+
+    deleted_student = delete(student).where(
+        student.c.id == bindparam('student_id')
+    ).returning(student.c.group_id).cte('deleted_student')
+
+    deleted_enrollments = delete(course_student).where(
+        course_student.c.student_id == bindparam('student_id')
+    ).returning(course_student.c.course_id).cte('deleted_enrollments')
+
+    # Referenced by the result, so it is part of the statement.
+    counted_group = update(group).where(
+        group.c.id.in_(select(deleted_student.c.group_id))
+    ).values(
+        students_count=group.c.students_count - 1
+    ).returning(group.c.id).cte('counted_group')
+
+    return select(
+        deleted_student.c.group_id,
+        select(func.count()).select_from(
+            deleted_enrollments
+        ).scalar_subquery(),
+        select(func.count()).select_from(counted_group).scalar_subquery()
+    )
+
+
+@lru_cache(maxsize=None)
+def select_student_group_for_update(student):
+    """Binds ``student_id``, locks the student row. With
+    the two statements below, the delete of dialects other than
+    PostgreSQL.
+
+    """
+
+    return select(student.group_id).where(
+        student.id == bindparam('student_id')
+    ).with_for_update()
+
+
+@lru_cache(maxsize=None)
+def delete_student_enrollments():
+    """Binds ``student_id``."""
+
+    return delete(course_student).where(
+        course_student.c.student_id == bindparam('student_id')
+    )
+
+
+@lru_cache(maxsize=None)
+def delete_student(student):
+    """Binds ``student_id``."""
+
+    return delete(student.__table__).where(
+        student.__table__.c.id == bindparam('student_id')
+    )
@@ -0,0 +1,133 @@
+"""Type-ahead search of students by name.
+
+A student matches when one of the search keys, ``first last`` or
+``last first`` in lower case, starts with the (normalized) query.
+Matches are ranked by the matched key in code point order, so exact
+names come before their continuations, then by student id.
+
+On PostgreSQL both keys have an index in the "C" collation (see
+``models.models``), every key is an index range scan read in order
+and stopped at the limit. Other dialects search an in-process
+``StudentNameIndex`` with the same ranking.
+
+"""
+
+from bisect import bisect_left
+from typing import Iterable, List
+
+from sqlalchemy import Table, func, literal_column, select, union_all
+
+from models.dto import StudentMatch, StudentRow
+
+
+MAX_QUERY_LENGTH = 100
+
+# Columns of the search keys, see ``search_key_columns``.
+SEARCH_KEYS = (
+    ('ix_student_search_first_last', 'first_name', 'last_name'),
+    ('ix_student_search_last_first', 'last_name', 'first_name')
+)
+
+
+def normalize_query(query: str) -> str:
+    return ' '.join(query.lower().split())
+
+
+def search_key(*names: str) -> str:
+    return ' '.join(names).lower()
+
+
+def escape_like(value: str) -> str:
+    return (value.replace('\\', '\\\\')
+            .replace('%', '\\%').replace('_', '\\_'))
+
+
+def search_key_column(student: Table, first: str, second: str):
+    return func.lower(
+        student.c[first] + literal_column("' '") + student.c[second]
+    ).collate('C')
+
+
+def select_name_matches(student: Table, query: str, limit: int):
+    """Up to ``limit`` best matches of every search key
+    (``rank_matches`` merges them), ``query`` must be normalized.
+
+    """
+
+    pattern = escape_like(query) + '%'
+
+    selects = []
+    for _, first, second in SEARCH_KEYS:
+        key = search_key_column(student, first, second)
+
+        selects.append(
+            select(
+                student.c.id, student.c.first_name, student.c.last_name,
+                student.c.group_id, key.label('matched_name')
+            ).where(
+                key.like(pattern, escape='\\')
+            ).order_by(key, student.c.id).limit(limit)
+        )
+
+    return union_all(*selects)
+
+
+def rank_matches(rows: Iterable, limit: int) -> List[StudentMatch]:
+    """Best ``limit`` matches, one per student."""
+
+    matches = []
+    seen = set()
+
+    for row in sorted(rows, key=lambda row: (row[4], row[0])):
+        if row[0] in seen:
+            continue
+
+        seen.add(row[0])
+        matches.append(StudentMatch(*row))
+
+        if len(matches) == limit:
+            break
+
+    return matches
+
+
+class StudentNameIndex:
+    """Search keys of all students in a sorted list,
+    a search is a binary search plus a scan of ``limit`` matches.
+
+    """
+
+    def __init__(self, rows: Iterable[StudentRow]):
+        entries = []
+
+        for row in rows:
+            entries.append((search_key(row.first_name, row.last_name), row))
+            entries.append((search_key(row.last_name, row.first_name), row))
+
+        entries.sort(key=lambda entry: (entry[0], entry[1].id))
+
+        self._keys = [key for key, _ in entries]
+        self._rows = [row for _, row in entries]
+
+    def __len__(self):
+        return len(self._keys)
+
+    def search(self, query: str, limit: int) -> List[StudentMatch]:
+        """``query`` must be normalized."""
+
+        matches = []
+        seen = set()
+
+        index = bisect_left(self._keys, query)
+
+        while (len(matches) < limit and index < len(self._keys)
+               and self._keys[index].startswith(query)):
+            row = self._rows[index]
+
+            if row.id not in seen:
+                seen.add(row.id)
+                matches.append(StudentMatch(*row, self._keys[index]))
+
+            index += 1
+
+        return matches
@@ -0,0 +1,101 @@
+from datetime import datetime, timezone
+from typing import Dict, Iterable, NamedTuple
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+
+from models.models import TableVersion
+
+
+class TableState(NamedTuple):
+    version: int
+    updated_at: datetime
+
+
+def bump_versions_statement(dialect_name: str, table_names: Iterable[str]):
+    """Statement adding one to the version of every given table.
+
+    Missing version rows are created (PostgreSQL and SQLite), other
+    dialects rely on the rows written by the initialization of the db.
+
+    """
+
+    table = TableVersion.__table__
+    table_names = sorted(set(table_names))
+    now = datetime.now(timezone.utc)
+
+    dialect_inserts = {
+        'postgresql': postgresql.insert,
+        'sqlite': sqlite.insert
+    }
+
+    if not (dialect_insert := dialect_inserts.get(dialect_name)):
+        return update(table).where(
+            table.c.table_name.in_(table_names)
+        ).values(version=table.c.version + 1, updated_at=now)
+
+    statement = dialect_insert(table).values([
+        {'table_name': name, 'version': 1, 'updated_at': now}
+        for name in table_names
+    ])
+
+    return statement.on_conflict_do_update(
+        index_elements=[table.c.table_name],
+        set_={'version': table.c.version + 1, 'updated_at': now}
+    )
+
+
+def bump_table_versions(connection: Connection,
+                        table_names: Iterable[str]) -> None:
+    connection.execute(
+        bump_versions_statement(connection.dialect.name, table_names)
+    )
+
+
+# Key of the count in ``Connection.info``, which lives as long as the
+# DBAPI connection, so every write transaction pops it.
+_CHANGED_ROWS = 'changed_rows'
+
+
+def record_changed_rows(connection, rowcount: int) -> int:
+    """Adds rows changed by a write of the current transaction
+    of the connection, returns ``rowcount``.
+
+    A write transaction bumps versions only if it changed any rows,
+    so writes that change nothing keep ETags and cached stats valid.
+
+    """
+
+    info = connection.info
+    info[_CHANGED_ROWS] = info.get(_CHANGED_ROWS, 0) + max(rowcount, 0)
+
+    return rowcount
+
+
+def pop_changed_rows(connection) -> int:
+    """Rows recorded since the last call, the count starts over."""
+
+    return connection.info.pop(_CHANGED_ROWS, 0)
+
+
+# Built once, the names are bound as an expanding ``table_names``.
+SELECT_TABLE_STATES = select(
+    TableVersion.__table__.c.table_name, TableVersion.__table__.c.version,
+    TableVersion.__table__.c.updated_at
+).where(TableVersion.__table__.c.table_name.in_(
+    bindparam('table_names', expanding=True)
+))
+
+
+def read_table_states(rows) -> Dict[str, TableState]:
+    states = {}
+
+    for table_name, version, updated_at in rows:
+        # SQLite gives back naive datetimes, they are stored in UTC.
+        if updated_at.tzinfo is None:
+            updated_at = updated_at.replace(tzinfo=timezone.utc)
+
+        states[table_name] = TableState(version, updated_at)
+
+    return states
@@ -0,0 +1,114 @@
+"""Request body handling shared by the WSGI (``api``)
+and the ASGI (``asgi_api``) REST APIs.
+
+"""
+
+import csv
+import json
+from collections import Counter
+from typing import Callable, Iterable, Iterator, List
+
+from models.bulk_operations import RejectedRows
+
+from schemas.json_schemas import EnrollmentSchema, StudentImportSchema
+from schemas.json_schemas import ValidationError
+
+
+# What invalid UTF-8 of a body is decoded to.
+REPLACEMENT_CHARACTER = '\ufffd'
+
+
+def decode_lines(lines: Iterable[bytes]) -> Iterator[str]:
+    """Invalid UTF-8 does not fail the whole body,
+    ``validate_student_rows`` rejects the rows it is in.
+
+    """
+
+    return (line.decode('utf-8', errors='replace') for line in lines)
+
+
+def read_csv_rows(lines: Iterable[str]) -> Iterator[tuple]:
+    reader = csv.DictReader(lines)
+
+    for row in reader:
+        yield reader.line_num, row
+
+
+def read_ndjson_rows(lines: Iterable[str]) -> Iterator[tuple]:
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+
+        try:
+            yield line_number, json.loads(line)
+        except ValueError:
+            yield line_number, None
+
+
+def validate_student_rows(rows: Iterable[tuple],
+                          rejected: RejectedRows) -> Iterator[tuple]:
+    """Yields (line number, id, group id, first name, last name)
+    of valid rows, the rest goes to ``rejected``.
+
+    """
+
+    for line_number, row in rows:
+        if not isinstance(row, dict):
+            rejected.add(line_number, 'Row is not a valid JSON object!')
+            continue
+
+        if any(REPLACEMENT_CHARACTER in str(value)
+               for value in row.values()):
+            rejected.add(line_number, 'Row is not valid UTF-8!')
+            continue
+
+        try:
+            student = StudentImportSchema.parse_obj(row)
+        except ValidationError as err:
+            rejected.add(line_number, json.loads(err.json()))
+            continue
+
+        yield (
+            line_number, student.student_id, student.group_id,
+            student.first_name, student.last_name
+        )
+
+
+def change_enrollments(items: Iterable,
+                       change_function: Callable[[List[tuple]], List[str]]
+                       ) -> dict:
+    """Validates enrollment items and applies ``change_function``
+    to the valid (student id, course name) pairs.
+
+    """
+
+    results = []
+    pairs = []
+    valid_results = []
+
+    for item in items:
+        try:
+            enrollment = EnrollmentSchema.parse_obj(item)
+        except ValidationError as err:
+            results.append({
+                'item': item, 'status': 'invalid',
+                'errors': json.loads(err.json())
+            })
+            continue
+
+        result = {
+            'student_id': enrollment.student_id,
+            'course_name': enrollment.course_name
+        }
+
+        results.append(result)
+        valid_results.append(result)
+        pairs.append((enrollment.student_id, enrollment.course_name))
+
+    for result, status in zip(valid_results, change_function(pairs)):
+        result['status'] = status
+
+    return {
+        'results': results,
+        'summary': dict(Counter(result['status'] for result in results))
+    }
@@ -0,0 +1,158 @@
+import json
+import logging
+import time
+
+from flask import Flask, current_app, g, has_app_context, request
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.default import CACHE_HIT
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+class RequestQueryStats:
+    """SQL statements issued while handling one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.cached_count = 0
+        self.total_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement = None
+
+    def add(self, statement: str, seconds: float,
+            cached: bool = False) -> None:
+        self.count += 1
+        self.cached_count += cached
+        self.total_seconds += seconds
+
+        if seconds >= self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.total_seconds * 1000:.2f};'
+            f'desc="{self.count} queries", '
+            f'db-slowest;dur={self.slowest_seconds * 1000:.2f}, '
+            f'db-cache;desc="{self.cached_count} cached"'
+        )
+
+    def as_dict(self) -> dict:
+        return {
+            'queries': self.count,
+            'cached_queries': self.cached_count,
+            'db_time_ms': round(self.total_seconds * 1000, 3),
+            'slowest_ms': round(self.slowest_seconds * 1000, 3),
+            'slowest_statement': self.slowest_statement
+        }
+
+
+class QueryMetrics:
+    """Flask extension that measures SQL statements of every request.
+
+    Adds a ``Server-Timing`` header and logs one JSON line per request.
+    A budget (max statements per request) can be set for all endpoints
+    with ``QUERY_BUDGET`` or per endpoint with ``QUERY_BUDGETS``;
+    exceeding it is logged, or fails the request when
+    ``QUERY_BUDGET_ENFORCE`` is set (tests and staging).
+
+    Statements are counted on every engine unless one is passed,
+    so engines swapped in by tests are measured as well.
+
+    """
+
+    def __init__(self, app: Flask = None, engine=None):
+        self._target = engine if engine is not None else Engine
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        app.config.setdefault('QUERY_BUDGET', None)
+        app.config.setdefault('QUERY_BUDGETS', {})
+        app.config.setdefault('QUERY_BUDGET_ENFORCE', False)
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+        if not event.contains(
+                self._target, 'before_cursor_execute', _before_execute
+        ):
+            event.listen(self._target, 'before_cursor_execute',
+                         _before_execute)
+            event.listen(self._target, 'after_cursor_execute',
+                         _after_execute)
+
+    @staticmethod
+    def _start_request() -> None:
+        g.query_stats = RequestQueryStats()
+
+    @staticmethod
+    def _get_budget(app: Flask):
+        return app.config['QUERY_BUDGETS'].get(
+            request.endpoint, app.config['QUERY_BUDGET']
+        )
+
+    def _finish_request(self, response):
+        if (stats := g.pop('query_stats', None)) is None:
+            return response
+
+        response.headers.add('Server-Timing', stats.server_timing())
+
+        log_record = {
+            'endpoint': request.endpoint,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            **stats.as_dict()
+        }
+
+        budget = self._get_budget(current_app)
+
+        if budget is not None and stats.count > budget:
+            log_record['query_budget'] = budget
+            logger.warning(json.dumps(log_record))
+
+            if current_app.config['QUERY_BUDGET_ENFORCE']:
+                raise QueryBudgetExceeded(
+                    f'{request.endpoint} issued {stats.count} SQL '
+                    f'statements (budget is {budget})!'
+                )
+        else:
+            logger.info(json.dumps(log_record))
+
+        return response
+
+
+def current_query_stats() -> RequestQueryStats:
+    if has_app_context():
+        return g.get('query_stats')
+    return None
+
+
+def _before_execute(conn, cursor, statement, parameters, context,
+                    executemany):
+    if current_query_stats() is not None:
+        context._query_started_at = time.perf_counter()
+
+
+def _after_execute(conn, cursor, statement, parameters, context,
+                   executemany):
+    if (stats := current_query_stats()) is None:
+        return
+
+    if (started_at := getattr(context, '_query_started_at', None)) is None:
+        return
+
+    # Compiled form taken from the cache of the engine.
+    stats.add(
+        statement, time.perf_counter() - started_at,
+        cached=getattr(context, 'cache_hit', None) is CACHE_HIT
+    )
@@ -1,7 +1,32 @@
-from pydantic import BaseModel, ValidationError
+from pydantic import BaseModel, ValidationError, conint, constr, validator
+
+
+# Ids are INTEGER columns.
+MAX_ID = 2 ** 31 - 1
 
 
 class StudentSchema(BaseModel):
     first_name: str
     last_name: str
     group_id: int
+
+
+class StudentImportSchema(StudentSchema):
+    # Imported rows go straight to COPY, values must fit their columns.
+    first_name: constr(min_length=1, max_length=30)
+    last_name: constr(min_length=1, max_length=40)
+    group_id: conint(ge=1, le=MAX_ID)
+    student_id: conint(ge=1, le=MAX_ID)
+
+    @validator('first_name', 'last_name')
+    def has_no_nul(cls, value: str) -> str:
+        # PostgreSQL text cannot hold NUL characters.
+        if '\x00' in value:
+            raise ValueError('NUL characters are not allowed')
+
+        return value
+
+
+class EnrollmentSchema(BaseModel):
+    student_id: int
+    course_name: str
@@ -2,70 +2,71 @@ from random import choices, randint, choice, sample
 import string
 
 
-class GroupGenerator:
-    _letters = string.ascii_uppercase
+GROUP_NAME_LETTERS = string.ascii_uppercase
+
+FIRST_NAMES = [
+    'Liam', 'Olivia',
+    'Noah', 'Emma',
+    'Oliver', 'Ava',
+    'Elijah', 'Charlotte',
+    'William', 'Sophia',
+    'James', 'Amelia',
+    'Benjamin', 'Isabella',
+    'Lucas', 'Mia',
+    'Henry', 'Evelyn',
+    'Alexander', 'Harper',
+]
+
+LAST_NAMES = [
+    'Smith', 'Johnson',
+    'Williams', 'Brown',
+    'Jones', 'Miller',
+    'Davis', 'Garcia',
+    'Rodriguez', 'Wilson',
+    'Martinez', 'Anderson',
+    'Taylor', 'Thomas',
+    'Hernande', 'Moore',
+    'Martin', 'Jackson',
+    'Thompson', 'White',
+]
+
+COURSE_NAMES = [
+    'Art', 'Citizenship',
+    'Geography', 'History',
+    'French', 'German',
+    'Literacy', 'Music',
+    'Natural history', 'Science',
+    'Arithmetic', 'Social studies',
+    'Reading', 'Writing',
+    'Math', 'Business studies',
+    'Drama', 'Modern studies',
+    'Computer studies', 'Chemistry',
+]
+
 
+class GroupGenerator:
     @classmethod
     def generate_random_groups_name(cls, count: int) -> list:
         return (
-            [f'{"".join(choices(cls._letters, k=2))}'
+            [f'{"".join(choices(GROUP_NAME_LETTERS, k=2))}'
              f'-{randint(0, 9)}{randint(0, 9)}' for _ in range(count)]
         )
 
 
 class StudentGenerator:
-    _first_names = [
-        'Liam', 'Olivia',
-        'Noah', 'Emma',
-        'Oliver', 'Ava',
-        'Elijah', 'Charlotte',
-        'William', 'Sophia',
-        'James', 'Amelia',
-        'Benjamin', 'Isabella',
-        'Lucas', 'Mia',
-        'Henry', 'Evelyn',
-        'Alexander', 'Harper',
-    ]
-
-    _last_names = [
-        'Smith', 'Johnson',
-        'Williams', 'Brown',
-        'Jones', 'Miller',
-        'Davis', 'Garcia',
-        'Rodriguez', 'Wilson',
-        'Martinez', 'Anderson',
-        'Taylor', 'Thomas',
-        'Hernande', 'Moore',
-        'Martin', 'Jackson',
-        'Thompson', 'White',
-    ]
-
     @classmethod
     def generate_random_students(cls, count: int) -> list:
-        return [f'{choice(cls._first_names)} {choice(cls._last_names)}'
+        return [f'{choice(FIRST_NAMES)} {choice(LAST_NAMES)}'
                 for _ in range(count)]
 
 
 class CoursesGenerator:
-    _courses = [
-        'Art', 'Citizenship',
-        'Geography', 'History',
-        'French', 'German',
-        'Literacy', 'Music',
-        'Natural history', 'Science',
-        'Arithmetic', 'Social studies',
-        'Reading', 'Writing',
-        'Math', 'Business studies',
-        'Drama', 'Modern studies',
-        'Computer studies', 'Chemistry',
-        ]
-
     @classmethod
     def generate_random_courses(cls, count: int):
-        if count > len(cls._courses):
-            raise ValueError(f'Max count is - {len(cls._courses)}')
+        if count > len(COURSE_NAMES):
+            raise ValueError(f'Max count is - {len(COURSE_NAMES)}')
 
-        return sample(cls._courses, count)
+        return sample(COURSE_NAMES, count)
 
 
 class AssignStudentGroup:
@@ -73,7 +74,8 @@ class AssignStudentGroup:
     def assign_student_to_group(students: list, groups: list):
         group_students = {}
 
-        not_assigned_students = students[:]
+        # Shuffled once, so students are taken from the end in O(1).
+        not_assigned_students = sample(students, len(students))
 
         for group in groups:
             group_students[group] = []
@@ -82,12 +84,7 @@ class AssignStudentGroup:
                 if len(not_assigned_students) <= 0:
                     return group_students
 
-                random_student = (
-                    not_assigned_students.pop(
-                        randint(0, len(not_assigned_students) - 1))
-                )
-
-                group_students[group].append(random_student)
+                group_students[group].append(not_assigned_students.pop())
         return group_students
 
 
@@ -0,0 +1,440 @@
+"""Synthetic school of any size, the same for the same seed and sizes.
+
+    python -m school_generator.synthetic_school --seed 42 --groups 10000 \\
+        --students 5000000 --courses 2000 --workers 8 --csv-dir school_csv
+
+Without ``--csv-dir`` the rows are written into the database of
+``SCHOOL_DB_*`` (or ``--db-url``), whose tables are created if needed.
+
+"""
+
+import argparse
+import csv
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Callable, Iterator, List, Tuple
+
+import numpy as np
+
+from engine_factory import EngineSettings, create_db_engine
+
+from models.bulk_operations import BulkWriteReport
+from models.bulk_operations import bulk_write_rows, sync_id_sequence
+from models.models import SchoolBase, Course, Group, Student, course_student
+from models.table_versions import bump_table_versions
+
+from school_generator.school_data_generator import COURSE_NAMES
+from school_generator.school_data_generator import FIRST_NAMES, LAST_NAMES
+from school_generator.school_data_generator import GROUP_NAME_LETTERS
+
+
+GROUP_COLUMNS = ('id', 'name', 'students_count')
+COURSE_COLUMNS = ('id', 'name', 'description')
+STUDENT_COLUMNS = ('id', 'group_id', 'first_name', 'last_name')
+COURSE_STUDENT_COLUMNS = ('course_id', 'student_id')
+
+# Keys of the random streams, see ``SyntheticSchool._rng``.
+GROUP_NAMES_STREAM = 0
+STUDENT_GROUPS_STREAM = 1
+STUDENT_NAMES_STREAM = 2
+STUDENT_COURSES_STREAM = 3
+
+
+class SyntheticSchool:
+    """Groups, courses, students and enrollments drawn from ``seed``.
+
+    Students are made block by block (``block_size`` students with
+    consecutive IDs), every block from its own random streams, so any
+    block can be generated by any process and the result does not
+    depend on the number of workers. Sampling is vectorized with NumPy
+    and linear in the number of students.
+
+    """
+
+    def __init__(self, seed: int, groups: int = 10_000,
+                 students: int = 5_000_000, courses: int = 2_000,
+                 min_courses: int = 1, max_courses: int = 3,
+                 block_size: int = 100_000):
+        letters = len(GROUP_NAME_LETTERS)
+        max_groups = letters * letters * 100
+
+        if not 0 < groups <= max_groups:
+            raise ValueError(f'Groups count must be in 1..{max_groups}!')
+
+        if not 0 <= min_courses <= max_courses <= courses:
+            raise ValueError(
+                f'Passed invalid courses per student ({min_courses}..'
+                f'{max_courses}) for {courses} courses!'
+            )
+
+        if students < 0 or block_size <= 0:
+            raise ValueError('Passed invalid students count or block size!')
+
+        self.seed = seed
+        self.groups = groups
+        self.students = students
+        self.courses = courses
+        self.min_courses = min_courses
+        self.max_courses = max_courses
+        self.block_size = block_size
+
+    def _rng(self, *key: int) -> np.random.Generator:
+        return np.random.default_rng(
+            np.random.SeedSequence(self.seed, spawn_key=key)
+        )
+
+    @property
+    def blocks(self) -> range:
+        return range(math.ceil(self.students / self.block_size))
+
+    def _block_ids(self, block: int) -> np.ndarray:
+        start = block * self.block_size
+
+        return np.arange(
+            start + 1, min(start + self.block_size, self.students) + 1
+        )
+
+    def _block_group_ids(self, block: int, size: int) -> np.ndarray:
+        return self._rng(STUDENT_GROUPS_STREAM, block).integers(
+            1, self.groups + 1, size
+        )
+
+    def students_counts(self) -> np.ndarray:
+        """Students of every group, group ``id`` is at ``id - 1``."""
+
+        counts = np.zeros(self.groups + 1, dtype=np.int64)
+
+        for block in self.blocks:
+            counts += np.bincount(
+                self._block_group_ids(block, len(self._block_ids(block))),
+                minlength=self.groups + 1
+            )
+
+        return counts[1:]
+
+    def group_rows(self) -> List[Tuple[int, str, int]]:
+        """(id, name, students_count), names are unique ``XX-00`` ones."""
+
+        letters = GROUP_NAME_LETTERS
+        letters_count = len(letters)
+
+        codes = self._rng(GROUP_NAMES_STREAM).choice(
+            letters_count * letters_count * 100, self.groups, replace=False
+        )
+
+        return [
+            (id_, f'{letters[code // 100 // letters_count]}'
+                  f'{letters[code // 100 % letters_count]}-{code % 100:02}',
+             students_count)
+            for id_, (code, students_count) in enumerate(
+                zip(codes.tolist(), self.students_counts().tolist()), 1
+            )
+        ]
+
+    def course_rows(self) -> List[Tuple[int, str, str]]:
+        """(id, name, description), names after the first
+        ``COURSE_NAMES`` get a level (``Art 2``).
+
+        """
+
+        names = COURSE_NAMES
+
+        rows = []
+        for index in range(self.courses):
+            level, name = divmod(index, len(names))
+            name = names[name] + (f' {level + 1}' if level else '')
+
+            rows.append((index + 1, name, f'Test description for {name}'))
+
+        return rows
+
+    def student_rows(self, block: int) -> Iterator[Tuple[int, int, str, str]]:
+        ids = self._block_ids(block)
+        group_ids = self._block_group_ids(block, len(ids))
+
+        first_names = np.array(FIRST_NAMES)
+        last_names = np.array(LAST_NAMES)
+
+        rng = self._rng(STUDENT_NAMES_STREAM, block)
+
+        return zip(
+            ids.tolist(), group_ids.tolist(),
+            first_names[
+                rng.integers(0, len(first_names), len(ids))
+            ].tolist(),
+            last_names[rng.integers(0, len(last_names), len(ids))].tolist()
+        )
+
+    def enrollments(self, block: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Course and student IDs of the block, distinct courses per student.
+
+        Every student gets ``min_courses..max_courses`` courses sampled
+        without replacement by Floyd's algorithm, one column at a time
+        for all students of the block.
+
+        """
+
+        ids = self._block_ids(block)
+        rng = self._rng(STUDENT_COURSES_STREAM, block)
+
+        counts = rng.integers(self.min_courses, self.max_courses + 1, len(ids))
+        chosen = np.zeros((len(ids), self.max_courses), dtype=np.int64)
+
+        for column in range(self.max_courses):
+            # Columns past the count of a student are dropped below.
+            upper = self.courses - counts + column
+            picks = rng.integers(0, upper + 1)
+
+            taken = (chosen[:, :column] == picks[:, None]).any(axis=1)
+            chosen[:, column] = np.where(taken, upper, picks)
+
+        used = np.arange(self.max_courses) < counts[:, None]
+
+        return chosen[used] + 1, np.repeat(ids, counts)
+
+    def course_student_rows(self, block: int) -> Iterator[Tuple[int, int]]:
+        course_ids, student_ids = self.enrollments(block)
+
+        return zip(course_ids.tolist(), student_ids.tolist())
+
+
+def _run_blocks(function: Callable, school: SyntheticSchool,
+                workers: int, *args) -> BulkWriteReport:
+    """Calls ``function(school, block, *args)`` for every block,
+    in ``workers`` processes, and merges the reports they return.
+
+    """
+
+    if workers <= 1:
+        reports = [function(school, block, *args) for block in school.blocks]
+    else:
+        with ProcessPoolExecutor(workers) as executor:
+            reports = list(executor.map(
+                function, repeat(school), school.blocks,
+                *(repeat(arg) for arg in args)
+            ))
+
+    report = BulkWriteReport()
+    for block_report in reports:
+        report.merge(block_report)
+
+    return report
+
+
+def _write_csv_file(path: str, table_name: str, columns, rows,
+                    report: BulkWriteReport) -> None:
+    started = time.perf_counter()
+
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(columns)
+
+        written = 0
+        for row in rows:
+            writer.writerow(row)
+            written += 1
+
+    report.add(table_name, written, time.perf_counter() - started)
+
+
+def csv_file_name(table_name: str, block: int = None) -> str:
+    if block is None:
+        return f'{table_name}.csv'
+
+    return f'{table_name}.{block:05}.csv'
+
+
+def _write_block_csv_files(school: SyntheticSchool, block: int,
+                           directory: str) -> BulkWriteReport:
+    report = BulkWriteReport()
+
+    _write_csv_file(
+        os.path.join(directory, csv_file_name(Student.__tablename__, block)),
+        Student.__tablename__, STUDENT_COLUMNS, school.student_rows(block),
+        report
+    )
+    _write_csv_file(
+        os.path.join(directory, csv_file_name(course_student.name, block)),
+        course_student.name, COURSE_STUDENT_COLUMNS,
+        school.course_student_rows(block), report
+    )
+
+    return report
+
+
+def _copy_command(table_name: str, columns, file_name: str) -> str:
+    return (f'\\copy "{table_name}" ({", ".join(columns)}) FROM '
+            f"'{file_name}' WITH (FORMAT csv, HEADER true)")
+
+
+def write_load_script(school: SyntheticSchool, directory: str) -> None:
+    """``load.sql`` for ``psql``, run from ``directory`` on created tables."""
+
+    commands = [
+        _copy_command(Group.__tablename__, GROUP_COLUMNS,
+                      csv_file_name(Group.__tablename__)),
+        _copy_command(Course.__tablename__, COURSE_COLUMNS,
+                      csv_file_name(Course.__tablename__))
+    ]
+
+    for table_name, columns in ((Student.__tablename__, STUDENT_COLUMNS),
+                                (course_student.name, COURSE_STUDENT_COLUMNS)):
+        commands.extend(
+            _copy_command(
+                table_name, columns, csv_file_name(table_name, block)
+            ) for block in school.blocks
+        )
+
+    commands.extend(
+        f"SELECT setval(pg_get_serial_sequence('\"{table_name}\"', 'id'), "
+        f'(SELECT coalesce(max(id), 0) + 1 FROM "{table_name}"), false);'
+        for table_name in (Group.__tablename__, Course.__tablename__,
+                           Student.__tablename__)
+    )
+
+    with open(os.path.join(directory, 'load.sql'), 'w',
+              encoding='utf-8') as file:
+        file.write('\n'.join(commands) + '\n')
+
+
+def write_csv_files(school: SyntheticSchool, directory: str,
+                    workers: int = 1) -> BulkWriteReport:
+    """Writes ``COPY ... WITH (FORMAT csv, HEADER true)`` files,
+    students and enrollments one file per block, and ``load.sql``.
+
+    """
+
+    os.makedirs(directory, exist_ok=True)
+
+    report = BulkWriteReport()
+
+    _write_csv_file(
+        os.path.join(directory, csv_file_name(Group.__tablename__)),
+        Group.__tablename__, GROUP_COLUMNS, school.group_rows(), report
+    )
+    _write_csv_file(
+        os.path.join(directory, csv_file_name(Course.__tablename__)),
+        Course.__tablename__, COURSE_COLUMNS, school.course_rows(), report
+    )
+
+    report.merge(_run_blocks(
+        _write_block_csv_files, school, workers, directory
+    ))
+
+    write_load_script(school, directory)
+
+    return report
+
+
+def _write_block_to_db(school: SyntheticSchool, block: int,
+                       settings: EngineSettings,
+                       chunk_size: int) -> BulkWriteReport:
+    report = BulkWriteReport()
+    engine = create_db_engine(settings)
+
+    try:
+        # Enrollments of a block only refer to its own students.
+        with engine.begin() as connection:
+            bulk_write_rows(
+                connection, Student.__table__, STUDENT_COLUMNS,
+                school.student_rows(block), chunk_size, report=report
+            )
+            bulk_write_rows(
+                connection, course_student, COURSE_STUDENT_COLUMNS,
+                school.course_student_rows(block), chunk_size, report=report
+            )
+    finally:
+        engine.dispose()
+
+    return report
+
+
+def write_to_db(school: SyntheticSchool, settings: EngineSettings = None,
+                workers: int = 1,
+                chunk_size: int = 10_000) -> BulkWriteReport:
+    """Writes the school into empty tables (created if missing).
+
+    Every block is committed on its own, by the worker that made it,
+    with ``COPY`` on PostgreSQL. Group counts are known beforehand,
+    so they are written along with the groups.
+
+    """
+
+    settings = settings or EngineSettings.from_env()
+    engine = create_db_engine(settings)
+
+    SchoolBase.metadata.create_all(engine)
+
+    report = BulkWriteReport()
+
+    try:
+        with engine.begin() as connection:
+            bulk_write_rows(
+                connection, Group.__table__, GROUP_COLUMNS,
+                school.group_rows(), chunk_size, report=report
+            )
+            bulk_write_rows(
+                connection, Course.__table__, COURSE_COLUMNS,
+                school.course_rows(), chunk_size, report=report
+            )
+
+        report.merge(_run_blocks(
+            _write_block_to_db, school, workers, settings, chunk_size
+        ))
+
+        with engine.begin() as connection:
+            for table in (Group.__table__, Course.__table__,
+                          Student.__table__):
+                sync_id_sequence(connection, table)
+
+            bump_table_versions(connection, (
+                Group.__tablename__, Course.__tablename__,
+                Student.__tablename__, course_student.name
+            ))
+    finally:
+        engine.dispose()
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--seed', type=int, required=True)
+    parser.add_argument('--groups', type=int, default=10_000)
+    parser.add_argument('--students', type=int, default=5_000_000)
+    parser.add_argument('--courses', type=int, default=2_000)
+    parser.add_argument('--min-courses', type=int, default=1)
+    parser.add_argument('--max-courses', type=int, default=3)
+    parser.add_argument('--block-size', type=int, default=100_000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--chunk-size', type=int, default=10_000)
+    parser.add_argument('--csv-dir')
+    parser.add_argument('--db-url')
+
+    args = parser.parse_args()
+
+    school = SyntheticSchool(
+        args.seed, args.groups, args.students, args.courses,
+        args.min_courses, args.max_courses, args.block_size
+    )
+
+    if args.csv_dir:
+        report = write_csv_files(school, args.csv_dir, args.workers)
+    else:
+        settings = EngineSettings.from_env()
+
+        if args.db_url:
+            settings.url = args.db_url
+
+        report = write_to_db(
+            school, settings, args.workers, args.chunk_size
+        )
+
+    print(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""Field selection of the REST API responses.
+
+    /api/v1/students/1/?fields=student_id,first_name
+        &include=group,courses&fields[courses]=course_name
+
+``fields`` picks the keys of the resource, ``include`` adds related
+resources and ``fields[<include>]`` picks their keys. Requested
+fields become a ``FieldSelection``, so only the columns and the
+relationships behind them are loaded.
+
+"""
+
+from typing import Dict, Mapping, NamedTuple, Optional, Tuple
+
+from models.field_selection import FieldSelection
+
+
+class InvalidFieldsError(ValueError):
+    pass
+
+
+def split_names(value: str, parameter: str) -> Tuple[str, ...]:
+    names = tuple(name.strip() for name in value.split(',') if name.strip())
+
+    if not names:
+        raise InvalidFieldsError(f'{parameter} must not be empty!')
+
+    return names
+
+
+class ResourceFields:
+    """Response keys of a resource mapped to attributes of its model
+    (or row), and the resources that can be included.
+
+    """
+
+    def __init__(self, name: str, keys: Dict[str, str],
+                 includes: Dict[str, 'ResourceFields'] = None):
+        self.name = name
+        self.keys = keys
+        self.includes = includes or {}
+
+    def parse_keys(self, value: str = None,
+                   parameter: str = 'fields') -> Tuple[str, ...]:
+        """Requested keys in the order of the resource,
+        all of them if ``value`` is None.
+
+        """
+
+        if value is None:
+            return tuple(self.keys)
+
+        requested = split_names(value, parameter)
+
+        if unknown := [key for key in requested if key not in self.keys]:
+            raise InvalidFieldsError(
+                f'Unknown {self.name} fields ({", ".join(unknown)})! '
+                f'Available: {", ".join(self.keys)}'
+            )
+
+        return tuple(key for key in self.keys if key in requested)
+
+    def parse(self, args: Mapping[str, str]) -> Optional['RequestedFields']:
+        """Fields requested by query ``args``,
+        None if there are no ``fields`` or ``include`` among them.
+
+        """
+
+        nested_fields = {
+            parameter[len('fields['):-1]: value
+            for parameter, value in args.items()
+            if parameter.startswith('fields[') and parameter.endswith(']')
+        }
+
+        if 'fields' not in args and 'include' not in args \
+                and not nested_fields:
+            return None
+
+        includes = ()
+        if 'include' in args:
+            includes = split_names(args['include'], 'include')
+
+        if unknown := [name for name in includes
+                       if name not in self.includes]:
+            raise InvalidFieldsError(
+                f'Unknown includes of {self.name} ({", ".join(unknown)})! '
+                f'Available: {", ".join(self.includes) or "none"}'
+            )
+
+        if not_included := [name for name in nested_fields
+                            if name not in includes]:
+            raise InvalidFieldsError(
+                f'Fields of {", ".join(not_included)} are given '
+                'but not included!'
+            )
+
+        return RequestedFields(
+            self, self.parse_keys(args.get('fields')),
+            tuple(
+                (name, RequestedFields(
+                    self.includes[name],
+                    self.includes[name].parse_keys(
+                        nested_fields.get(name), f'fields[{name}]'
+                    )
+                ))
+                for name in self.includes if name in includes
+            )
+        )
+
+
+class RequestedFields(NamedTuple):
+    resource: ResourceFields
+    keys: Tuple[str, ...]
+    # (include name, RequestedFields of the included resource) pairs.
+    includes: Tuple[Tuple[str, 'RequestedFields'], ...] = ()
+
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        return tuple(self.resource.keys[key] for key in self.keys)
+
+    @property
+    def selection(self) -> FieldSelection:
+        return FieldSelection(
+            self.columns,
+            tuple(
+                (name, requested.selection)
+                for name, requested in self.includes
+            )
+        )
+
+    def serialize(self, obj) -> dict:
+        response = {
+            key: getattr(obj, self.resource.keys[key]) for key in self.keys
+        }
+
+        for name, requested in self.includes:
+            related = getattr(obj, name)
+
+            if related is None:
+                response[name] = None
+            elif isinstance(related, list):
+                response[name] = [
+                    requested.serialize(item) for item in related
+                ]
+            else:
+                response[name] = requested.serialize(related)
+
+        return response
+
+
+GROUP_FIELDS = ResourceFields(
+    'group', {'group_id': 'id', 'group_name': 'name'}
+)
+
+COURSE_FIELDS = ResourceFields('course', {
+    'course_id': 'id', 'course_name': 'name',
+    'course_description': 'description'
+})
+
+STUDENT_FIELDS = ResourceFields('student', {
+    'student_id': 'id', 'first_name': 'first_name',
+    'last_name': 'last_name', 'group_id': 'group_id'
+}, includes={'group': GROUP_FIELDS, 'courses': COURSE_FIELDS})
+
+STUDENT_MATCH_FIELDS = ResourceFields(
+    'student', {**STUDENT_FIELDS.keys, 'matched_name': 'matched_name'}
+)
+
+# Students of a group roster, which has the group in its header.
+GROUP_STUDENT_FIELDS = ResourceFields('student', STUDENT_FIELDS.keys)
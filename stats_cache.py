@@ -0,0 +1,151 @@
+"""Results of aggregate queries cached until their tables change.
+
+An entry keeps the versions (``table_version``) of the tables it was
+computed from. Every write bumps them, so the next read finds the entry
+outdated, in every worker process. Backends are the ones of
+``models.entity_cache``, values have to be JSON serializable.
+
+With background refresh an outdated result is served right away while
+a thread computes the new one, so only the first read of a result waits
+for the aggregate.
+
+"""
+
+import json
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Dict, NamedTuple, Sequence
+
+from models.entity_cache import LRUTTLCacheBackend
+
+
+logger = logging.getLogger(__name__)
+
+# Computations of the same result wait for each other,
+# the lock of a key is one of these.
+KEY_LOCKS = 64
+
+
+class CachedResult(NamedTuple):
+    value: object
+    computed_at: str
+    # Computed before the last write, a refresh is running.
+    stale: bool
+
+
+class StatsCache:
+    """Versioned results of ``interface`` (a ``SchoolDb``, it reads
+    the table versions).
+
+    """
+
+    def __init__(self, interface, backend=None,
+                 background_refresh: bool = False):
+        self._interface = interface
+        self._backend = backend if backend is not None else (
+            LRUTTLCacheBackend(max_size=1000, ttl=3600)
+        )
+        self.background_refresh = background_refresh
+
+        self._lock = threading.Lock()
+        self._key_locks = [threading.Lock() for _ in range(KEY_LOCKS)]
+        self._refreshing = set()
+
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.refreshes = 0
+
+    @staticmethod
+    def make_key(name: str, parameters: dict = None) -> str:
+        return f'stats:{name}:{json.dumps(parameters or {}, sort_keys=True)}'
+
+    def _get_versions(self, table_names: Sequence[str]) -> Dict[str, int]:
+        states = self._interface.get_table_states(table_names)
+
+        return {
+            table_name: states[table_name].version
+            if table_name in states else 0
+            for table_name in table_names
+        }
+
+    def _compute(self, key: str, versions: Dict[str, int],
+                 compute: Callable) -> dict:
+        # Versions are read before computing, a write made meanwhile
+        # leaves the entry outdated rather than wrongly fresh.
+        entry = {
+            'versions': versions,
+            'value': compute(),
+            'computed_at': datetime.now(timezone.utc).isoformat()
+        }
+        self._backend.set(key, entry)
+
+        return entry
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _refresh_in_background(self, key: str, versions: Dict[str, int],
+                               compute: Callable) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self._compute(key, versions, compute)
+                self._count('refreshes')
+            except Exception:
+                logger.exception(f'Refresh of {key} failed!')
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(
+            target=refresh, name=f'refresh {key}', daemon=True
+        ).start()
+
+    def get_or_compute(self, name: str, parameters: dict,
+                       table_names: Sequence[str],
+                       compute: Callable) -> CachedResult:
+        key = self.make_key(name, parameters)
+        versions = self._get_versions(table_names)
+
+        entry = self._backend.get(key)
+
+        if entry is not None and entry['versions'] == versions:
+            self._count('hits')
+            return CachedResult(entry['value'], entry['computed_at'], False)
+
+        if entry is not None and self.background_refresh:
+            self._count('stale_hits')
+            self._refresh_in_background(key, versions, compute)
+
+            return CachedResult(entry['value'], entry['computed_at'], True)
+
+        self._count('misses')
+
+        with self._key_locks[hash(key) % KEY_LOCKS]:
+            # Computed by a request that held the lock before.
+            entry = self._backend.get(key)
+
+            if entry is None or entry['versions'] != versions:
+                entry = self._compute(key, versions, compute)
+
+        return CachedResult(entry['value'], entry['computed_at'], False)
+
+    def clear(self) -> None:
+        self._backend.clear()
+
+    def stats(self) -> dict:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'stale_hits': self.stale_hits,
+            'refreshes': self.refreshes,
+            'evictions': self._backend.evictions
+        }
@@ -1,12 +1,40 @@
 import unittest
+from contextlib import contextmanager
 from unittest import mock
 
+from sqlalchemy import event
+
+from app import entity_cache
+
 from models.manage_school_db import InitSchoolDb, DropSchoolDb
 
 from tests.test_data.test_school_data import test_data
 from tests.test_db_settings.settings import test_engine
 
 
+class QueryCounter:
+    """Records SQL statements sent through the engine while active."""
+
+    def __init__(self, engine):
+        self._engine = engine
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context,
+                executemany):
+        self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __enter__(self):
+        event.listen(self._engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        event.remove(self._engine, 'before_cursor_execute', self._record)
+
+
 class InitTestDbForTests(unittest.TestCase):
     @mock.patch(
         'school_generator.'
@@ -35,7 +63,21 @@ class InitTestDbForTests(unittest.TestCase):
     )
     def setUp(self, students, groups, courses,
               students_courses, students_group) -> None:
+        entity_cache.clear()
+
         InitSchoolDb(engine=test_engine).init_db()
 
     def tearDown(self) -> None:
         DropSchoolDb(engine=test_engine).drop_tables()
+
+    @contextmanager
+    def assertMaxQueries(self, max_queries: int, engine=test_engine):
+        with QueryCounter(engine) as counter:
+            yield counter
+
+        self.assertLessEqual(
+            counter.count, max_queries,
+            f'{counter.count} SQL statements were issued '
+            f'(at most {max_queries} expected):\n' +
+            '\n'.join(counter.statements)
+        )
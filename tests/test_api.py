@@ -1,9 +1,19 @@
+import json
 import unittest
+from datetime import datetime, timedelta, timezone
 from unittest import mock
 
+from sqlalchemy import event, update
+
+from werkzeug.http import http_date
+
 import api
+from http_cache import http_last_modified
+from models.models import Course, Group, Student, TableVersion
+from models.manage_school_db import StudentInterface
+from models.entity_cache import EntityCache, LRUTTLCacheBackend
 
-from tests.base_db_class_for_tests import InitTestDbForTests
+from tests.base_db_class_for_tests import InitTestDbForTests, QueryCounter
 
 from tests.test_db_settings.settings import test_engine
 
@@ -123,6 +133,97 @@ class TestGroups(InitTestDbForTests):
                 self.assertEqual(response.status_code, 404)
 
 
+@mock.patch.object(
+    api.GroupStudents.group_interface, '_engine', new=test_engine
+)
+class TestGroupStudents(InitTestDbForTests):
+    def setUp(self, students=None, groups=None, courses=None,
+              students_courses=None, students_group=None) -> None:
+        super().setUp()
+
+        api.app.config['TESTING'] = True
+
+        self.app = api.app.test_client()
+
+    def test_get_group_students(self):
+        response = self.app.get('/api/v1/groups/2/students/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), {
+            'group': {'group_id': 2, 'group_name': 'TU-69'},
+            'students': [
+                {'student_id': 4, 'first_name': 'Charlotte',
+                 'last_name': 'Brown', 'group_id': 2},
+                {'student_id': 5, 'first_name': 'Evelyn',
+                 'last_name': 'White', 'group_id': 2}
+            ],
+            'next_after': None,
+            'next': None
+        })
+
+    def test_get_group_students_pages(self):
+        expected_pages = [(2, 2), (1, None)]
+
+        url = '/api/v1/groups/1/students/?limit=2&fields=first_name'
+
+        for expected_count, expected_next_after in expected_pages:
+            response = self.app.get(url)
+            received_json = response.get_json()
+
+            with self.subTest(url=url):
+                self.assertEqual(
+                    received_json['group'],
+                    {'group_id': 1, 'group_name': 'SD-58'}
+                )
+                self.assertEqual(
+                    len(received_json['students']), expected_count
+                )
+                self.assertEqual(
+                    set(received_json['students'][0]), {'first_name'}
+                )
+                self.assertEqual(
+                    received_json['next_after'], expected_next_after
+                )
+
+            url = received_json['next']
+
+        self.assertIsNone(url)
+
+    def test_get_group_students_after_last_student(self):
+        received_json = self.app.get(
+            '/api/v1/groups/5/students/?after=10'
+        ).get_json()
+
+        self.assertEqual(received_json['group']['group_name'], 'CX-73')
+        self.assertEqual(received_json['students'], [])
+
+    def test_group_students_is_one_statement(self):
+        with QueryCounter(test_engine) as counter:
+            self.app.get('/api/v1/groups/1/students/?limit=2')
+
+        self.assertEqual(
+            len([statement for statement in counter.statements
+                 if 'table_version' not in statement]),
+            1
+        )
+
+    def test_get_students_of_not_existing_group(self):
+        response = self.app.get('/api/v1/groups/100/students/')
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(
+            response.get_json(),
+            {'message': 'Group with given id (100) does not exists!'}
+        )
+
+    def test_invalid_group_students_request(self):
+        for url in ('/api/v1/groups/1/students/?include=courses',
+                    '/api/v1/groups/1/students/?fields=group_name',
+                    '/api/v1/groups/1/students/?limit=0'):
+            with self.subTest(url=url):
+                self.assertEqual(self.app.get(url).status_code, 400)
+
+
 class TestIndStudent(InitTestDbForTests):
     def setUp(self, students=None, groups=None, courses=None,
               students_courses=None, students_group=None) -> None:
@@ -471,6 +572,53 @@ class TestIndStudent(InitTestDbForTests):
                 self.assertEqual(response.status_code, 400)
 
 
+@mock.patch.object(
+    api.StudentProfile.student_interface, '_engine', new=test_engine
+)
+class TestStudentProfile(InitTestDbForTests):
+    def setUp(self, students=None, groups=None, courses=None,
+              students_courses=None, students_group=None) -> None:
+        super().setUp()
+
+        api.app.config['TESTING'] = True
+
+        self.app = api.app.test_client()
+
+    def test_get_student_profile(self):
+        response = self.app.get('/api/v1/students/3/profile/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), {
+            'student_id': 3, 'first_name': 'Mia', 'last_name': 'Wilson',
+            'group_id': 1,
+            'group': {'group_id': 1, 'group_name': 'SD-58'},
+            'courses': [
+                {'course_id': 1, 'course_name': 'Geography',
+                 'course_description': 'Test description for Geography'},
+                {'course_id': 4, 'course_name': 'Writing',
+                 'course_description': 'Test description for Writing'},
+                {'course_id': 5, 'course_name': 'German',
+                 'course_description': 'Test description for German'}
+            ]
+        })
+
+    def test_profile_is_one_statement(self):
+        if test_engine.dialect.name != 'postgresql':
+            self.skipTest('A single statement on PostgreSQL only')
+
+        # The other one reads versions of the tables (ETag).
+        with self.assertMaxQueries(2):
+            self.app.get('/api/v1/students/5/profile/')
+
+    def test_get_not_existing_student_profile(self):
+        response = self.app.get('/api/v1/students/100/profile/')
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.get_json(), {
+            'message': 'Student with given id (100) does not exists!'
+        })
+
+
 class TestStudents(InitTestDbForTests):
     def setUp(self, students=None, groups=None, courses=None,
               students_courses=None, students_group=None) -> None:
@@ -588,6 +736,466 @@ class TestStudents(InitTestDbForTests):
                 self.assertEqual(response.get_json(), error_json)
                 self.assertEqual(response.status_code, 404)
 
+    @mock.patch.object(
+        api.Students.student_interface, '_engine', new=test_engine
+    )
+    def test_get_students_pages(self):
+        expected_pages = [
+            ([1, 2, 3, 4], 4), ([5, 6, 7, 8], 8), ([9, 10], None)
+        ]
+
+        url = '/api/v1/students/?limit=4'
+
+        for expected_ids, expected_next_after in expected_pages:
+            response = self.app.get(url)
+            received_json = response.get_json()
+
+            received_ids = [
+                student['student_id'] for student in received_json['students']
+            ]
+
+            with self.subTest():
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(received_ids, expected_ids)
+                self.assertEqual(
+                    received_json['next_after'], expected_next_after
+                )
+
+            url = received_json['next']
+
+        self.assertIsNone(url)
+
+    @mock.patch.object(
+        api.Students.student_interface, '_engine', new=test_engine
+    )
+    def test_get_course_roster_pages_with_count(self):
+        expected_pages = [([1, 4], 4), ([5, 9], 9), ([10], None)]
+
+        url = '/api/v1/students/?course_name=Art&limit=2&count=true'
+
+        for expected_ids, expected_next_after in expected_pages:
+            received_json = self.app.get(url).get_json()
+
+            with self.subTest(url=url):
+                self.assertEqual(
+                    [student['student_id']
+                     for student in received_json['students']],
+                    expected_ids
+                )
+                self.assertEqual(
+                    received_json['next_after'], expected_next_after
+                )
+                self.assertEqual(received_json['count'], 5)
+
+            url = received_json['next']
+
+        self.assertIsNone(url)
+
+    @mock.patch.object(
+        api.Students.student_interface, '_engine', new=test_engine
+    )
+    def test_get_students_page_after_last_student(self):
+        response = self.app.get('/api/v1/students/?after=10')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.get_json(),
+            {'students': [], 'next_after': None, 'next': None}
+        )
+
+    @mock.patch.object(
+        api.Students.student_interface, '_engine', new=test_engine
+    )
+    def test_get_students_page_with_invalid_limit(self):
+        for limit in (0, -5, 1001):
+            response = self.app.get(f'/api/v1/students/?limit={limit}')
+
+            with self.subTest():
+                self.assertEqual(response.status_code, 400)
+
+    @mock.patch.object(
+        api.Students.student_interface, '_engine', new=test_engine
+    )
+    def test_stream_students_as_ndjson(self):
+        response = self.app.get(
+            '/api/v1/students/?after=7',
+            headers={'Accept': 'application/x-ndjson'}
+        )
+
+        received_lines = [
+            json.loads(line) for line in response.data.decode().splitlines()
+        ]
+
+        expected_lines = [
+            {'student_id': 8, 'first_name': 'Mia', 'last_name': 'Thompson',
+             'group_id': 4},
+
+            {'student_id': 9, 'first_name': 'Ava', 'last_name': 'Thompson',
+             'group_id': 4},
+
+            {'student_id': 10, 'first_name': 'Lucas', 'last_name': 'Jones',
+             'group_id': 5}
+        ]
+
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        self.assertEqual(received_lines, expected_lines)
+
+    @mock.patch.object(
+        api.Students.student_interface, '_engine', new=test_engine
+    )
+    def test_students_representation_follows_accept_q_values(self):
+        accepts = {
+            'application/json;q=0.1, application/x-ndjson':
+                'application/x-ndjson',
+            'application/x-ndjson;q=0, application/json': 'application/json',
+            'application/x-ndjson;q=0': 'application/json',
+            '*/*': 'application/json'
+        }
+
+        for accept, mimetype in accepts.items():
+            response = self.app.get(
+                '/api/v1/students/?after=7', headers={'Accept': accept}
+            )
+
+            with self.subTest(accept=accept):
+                self.assertEqual(response.mimetype, mimetype)
+                # Reading the stream ends its request context.
+                self.assertIn(b'Lucas', response.data)
+
+
+class TestBatchEnrollments(InitTestDbForTests):
+    def setUp(self, students=None, groups=None, courses=None,
+              students_courses=None, students_group=None) -> None:
+        super().setUp()
+
+        api.app.config['TESTING'] = True
+
+        self.app = api.app.test_client()
+
+    @mock.patch.object(
+        api.BatchEnrollments.student_interface, '_engine', new=test_engine
+    )
+    @mock.patch.object(
+        api.IndStudent.student_interface, '_engine', new=test_engine
+    )
+    def test_post_enrollments(self):
+        enrollments = [
+            {'student_id': 2, 'course_name': 'Art'},
+            {'student_id': 2, 'course_name': 'Geography'},
+            {'student_id': 2, 'course_name': 'Art'},
+            {'student_id': 15, 'course_name': 'Art'},
+            {'student_id': 6, 'course_name': 'Math'},
+            {'student_id': 6, 'course_name': 'German'},
+            {'studentId': 6}
+        ]
+
+        expected_statuses = [
+            'enrolled', 'already_enrolled', 'already_enrolled',
+            'student_not_found', 'course_not_found', 'enrolled', 'invalid'
+        ]
+
+        received_json = self.app.post(
+            '/api/v1/enrollments/batch/', json=enrollments
+        ).get_json()
+
+        statuses = [result['status'] for result in received_json['results']]
+
+        self.assertEqual(statuses, expected_statuses)
+        self.assertEqual(received_json['summary'], {
+            'enrolled': 2, 'already_enrolled': 2, 'student_not_found': 1,
+            'course_not_found': 1, 'invalid': 1
+        })
+
+        for student_id, expected_courses in {
+            2: ['Geography', 'Art'], 6: ['Writing', 'German']
+        }.items():
+            student_courses = self.app.get(
+                f'/api/v1/students/{student_id}/?show_courses=true'
+            ).get_json()[str(student_id)]['courses']
+
+            with self.subTest():
+                self.assertEqual(
+                    sorted(course['course_name']
+                           for course in student_courses),
+                    sorted(expected_courses)
+                )
+
+    @mock.patch.object(
+        api.BatchEnrollments.student_interface, '_engine', new=test_engine
+    )
+    def test_post_enrollments_as_ndjson(self):
+        body = (
+            '{"student_id": 4, "course_name": "German"}\n'
+            '\n'
+            '{"student_id": 5, "course_name": "German"}\n'
+        )
+
+        received_json = self.app.post(
+            '/api/v1/enrollments/batch/', data=body,
+            content_type='application/x-ndjson'
+        ).get_json()
+
+        self.assertEqual(received_json['results'], [
+            {'student_id': 4, 'course_name': 'German', 'status': 'enrolled'},
+            {'student_id': 5, 'course_name': 'German',
+             'status': 'already_enrolled'}
+        ])
+
+    @mock.patch.object(
+        api.BatchEnrollments.student_interface, '_engine', new=test_engine
+    )
+    def test_post_enrollments_with_invalid_body(self):
+        bodies = [
+            {'json': {'student_id': 4, 'course_name': 'German'}},
+            {'data': '{"student_id": 4}\n{', 'content_type':
+                'application/x-ndjson'}
+        ]
+
+        for body in bodies:
+            response = self.app.post('/api/v1/enrollments/batch/', **body)
+
+            with self.subTest():
+                self.assertEqual(response.status_code, 400)
+
+    @mock.patch.object(
+        api.BatchEnrollments.student_interface, '_engine', new=test_engine
+    )
+    def test_delete_enrollments(self):
+        enrollments = [
+            {'student_id': 3, 'course_name': 'German'},
+            {'student_id': 3, 'course_name': 'German'},
+            {'student_id': 3, 'course_name': 'Art'},
+            {'student_id': 15, 'course_name': 'Art'},
+            {'student_id': 3, 'course_name': 'Math'}
+        ]
+
+        expected_statuses = [
+            'removed', 'not_enrolled', 'not_enrolled',
+            'student_not_found', 'course_not_found'
+        ]
+
+        received_json = self.app.delete(
+            '/api/v1/enrollments/batch/', json=enrollments
+        ).get_json()
+
+        statuses = [result['status'] for result in received_json['results']]
+
+        self.assertEqual(statuses, expected_statuses)
+
+
+class TestStudentsImport(InitTestDbForTests):
+    def setUp(self, students=None, groups=None, courses=None,
+              students_courses=None, students_group=None) -> None:
+        super().setUp()
+
+        api.app.config['TESTING'] = True
+
+        self.app = api.app.test_client()
+
+    @mock.patch.object(
+        api.StudentsImport.student_interface, '_engine', new=test_engine
+    )
+    @mock.patch.object(
+        api.Students.student_interface, '_engine', new=test_engine
+    )
+    def test_import_students_from_csv(self):
+        body = (
+            'student_id,first_name,last_name,group_id\n'
+            '11,Larry,Bottom,3\n'
+            '12,Harry,Erland,2\n'
+            '1,Taken,Id,2\n'
+            '13,Marry,Bottom,15\n'
+            '14,Bad,Group,two\n'
+            '12,Twice,Imported,1\n'
+        )
+
+        received_json = self.app.post(
+            '/api/v1/students/import/', data=body, content_type='text/csv'
+        ).get_json()
+
+        self.assertEqual(received_json['imported'], 2)
+        self.assertEqual(received_json['rejected'], 4)
+        self.assertEqual(
+            sorted(error['row'] for error in received_json['errors']),
+            [4, 5, 6, 7]
+        )
+
+        students = self.app.get('/api/v1/students/?after=10').get_json()
+
+        self.assertEqual(students['students'], [
+            {'student_id': 11, 'first_name': 'Larry', 'last_name': 'Bottom',
+             'group_id': 3},
+            {'student_id': 12, 'first_name': 'Harry', 'last_name': 'Erland',
+             'group_id': 2}
+        ])
+
+    @mock.patch.object(
+        api.StudentsImport.student_interface, '_engine', new=test_engine
+    )
+    def test_import_students_rejects_rows_not_fitting_columns(self):
+        body = (
+            b'student_id,first_name,last_name,group_id\n'
+            b'11,Larry,Bottom,3\n'
+            b'12,,Erland,2\n'
+            b'13,Marry,' + b'B' * 41 + b',2\n'
+            b'14,\xff\xfeHarry,Erland,2\n'
+            b'15,Barry,Erland,2\n'
+        )
+
+        response = self.app.post(
+            '/api/v1/students/import/', data=body, content_type='text/csv'
+        )
+        received_json = response.get_json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(received_json['imported'], 2)
+        self.assertEqual(
+            [error['row'] for error in received_json['errors']], [3, 4, 5]
+        )
+        self.assertEqual(
+            received_json['errors'][2]['errors'], 'Row is not valid UTF-8!'
+        )
+
+    def import_ndjson(self, rows: list) -> dict:
+        response = self.app.post(
+            '/api/v1/students/import/',
+            data=''.join(json.dumps(row) + '\n' for row in rows),
+            content_type='application/x-ndjson'
+        )
+
+        self.assertEqual(response.status_code, 200)
+
+        return response.get_json()
+
+    @mock.patch.object(
+        api.StudentsImport.student_interface, '_engine', new=test_engine
+    )
+    def test_import_students_rejects_ids_out_of_integer_range(self):
+        received_json = self.import_ndjson([
+            {'student_id': 11, 'first_name': 'Larry',
+             'last_name': 'Bottom', 'group_id': 3},
+            {'student_id': 3_000_000_000, 'first_name': 'Harry',
+             'last_name': 'Erland', 'group_id': 2},
+            {'student_id': 12, 'first_name': 'Harry',
+             'last_name': 'Erland', 'group_id': 3_000_000_000}
+        ])
+
+        self.assertEqual(received_json['imported'], 1)
+        self.assertEqual(
+            [(error['row'], error['errors'][0]['loc'])
+             for error in received_json['errors']],
+            [(2, ['student_id']), (3, ['group_id'])]
+        )
+
+    @mock.patch.object(
+        api.StudentsImport.student_interface, '_engine', new=test_engine
+    )
+    def test_import_students_rejects_nul_in_names(self):
+        received_json = self.import_ndjson([
+            {'student_id': 11, 'first_name': 'Ma\u0000rry',
+             'last_name': 'Bottom', 'group_id': 2},
+            {'student_id': 12, 'first_name': 'Larry',
+             'last_name': 'Bot\u0000tom', 'group_id': 2},
+            {'student_id': 13, 'first_name': 'Barry',
+             'last_name': 'Erland', 'group_id': 2}
+        ])
+
+        self.assertEqual(received_json['imported'], 1)
+        self.assertEqual(
+            [(error['row'], error['errors'][0]['loc'])
+             for error in received_json['errors']],
+            [(1, ['first_name']), (2, ['last_name'])]
+        )
+
+    @mock.patch.object(
+        api.StudentsImport.student_interface, '_engine', new=test_engine
+    )
+    def test_import_students_from_ndjson(self):
+        body = (
+            '{"student_id": 11, "first_name": "Larry", '
+            '"last_name": "Bottom", "group_id": 3}\n'
+            '{"student_id": 12\n'
+            '[]\n'
+        )
+
+        received_json = self.app.post(
+            '/api/v1/students/import/', data=body,
+            content_type='application/x-ndjson'
+        ).get_json()
+
+        self.assertEqual(received_json['imported'], 1)
+        self.assertEqual(received_json['errors'], [
+            {'row': 2, 'errors': 'Row is not a valid JSON object!'},
+            {'row': 3, 'errors': 'Row is not a valid JSON object!'}
+        ])
+
+    def test_import_students_with_unsupported_body(self):
+        response = self.app.post(
+            '/api/v1/students/import/', json=[{'student_id': 11}]
+        )
+
+        self.assertEqual(response.status_code, 415)
+
+
+@mock.patch.object(
+    api.StudentsSearch.student_interface, '_engine', new=test_engine
+)
+class TestStudentsSearch(InitTestDbForTests):
+    def setUp(self, students=None, groups=None, courses=None,
+              students_courses=None, students_group=None) -> None:
+        super().setUp()
+
+        api.app.config['TESTING'] = True
+
+        self.app = api.app.test_client()
+
+    def test_search_students(self):
+        response = self.app.get('/api/v1/students/search/?q=Mia')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), {'students': [
+            {'student_id': 8, 'first_name': 'Mia', 'last_name': 'Thompson',
+             'group_id': 4, 'matched_name': 'mia thompson'},
+            {'student_id': 3, 'first_name': 'Mia', 'last_name': 'Wilson',
+             'group_id': 1, 'matched_name': 'mia wilson'}
+        ]})
+
+    def test_search_by_last_name_with_limit(self):
+        response = self.app.get('/api/v1/students/search/?q=whi&limit=1')
+
+        self.assertEqual(
+            [student['matched_name']
+             for student in response.get_json()['students']],
+            ['white evelyn']
+        )
+
+    def test_search_without_matches(self):
+        response = self.app.get('/api/v1/students/search/?q=zoe')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), {'students': []})
+
+    def test_search_with_invalid_arguments(self):
+        urls_and_messages = {
+            '/api/v1/students/search/':
+                'Search query (q) must not be empty!',
+            '/api/v1/students/search/?q=%20':
+                'Search query (q) must not be empty!',
+            f'/api/v1/students/search/?q={"a" * 101}':
+                'Search query must be at most 100 characters long!',
+            '/api/v1/students/search/?q=mia&limit=51':
+                'Limit must be between 1 and 50 (51 was given)!',
+            '/api/v1/students/search/?q=mia&limit=0':
+                'Limit must be between 1 and 50 (0 was given)!'
+        }
+
+        for url, message in urls_and_messages.items():
+            response = self.app.get(url)
+
+            with self.subTest(url=url):
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.get_json(), {'message': message})
+
 
 class TestIndCourse(InitTestDbForTests):
     def setUp(self, students=None, groups=None, courses=None,
@@ -673,5 +1281,530 @@ class TestCourses(InitTestDbForTests):
         self.assertEqual(received_json, expected_json)
 
 
+class TestConditionalGet(InitTestDbForTests):
+    def setUp(self, students=None, groups=None, courses=None,
+              students_courses=None, students_group=None) -> None:
+        super().setUp()
+
+        # Last-Modified is only sent once the second of a write is over.
+        self.set_updated_at(datetime.now(timezone.utc) - timedelta(seconds=2))
+
+        api.app.config['TESTING'] = True
+
+        self.app = api.app.test_client()
+
+    @staticmethod
+    def set_updated_at(updated_at: datetime) -> None:
+        with test_engine.begin() as connection:
+            connection.execute(
+                update(TableVersion).values(updated_at=updated_at)
+            )
+
+    def tearDown(self) -> None:
+        api.app.config.pop('CACHE_CONTROLS', None)
+
+        super().tearDown()
+
+    @mock.patch.object(
+        api.Groups.group_interface, '_engine', new=test_engine
+    )
+    def test_not_modified_with_if_none_match(self):
+        response = self.app.get('/api/v1/groups/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Cache-Control'], 'no-cache')
+        self.assertIn('Last-Modified', response.headers)
+
+        with self.assertMaxQueries(1):
+            cached_response = self.app.get(
+                '/api/v1/groups/',
+                headers={'If-None-Match': response.headers['ETag']}
+            )
+
+        self.assertEqual(cached_response.status_code, 304)
+        self.assertEqual(cached_response.data, b'')
+        self.assertEqual(
+            cached_response.headers['ETag'], response.headers['ETag']
+        )
+
+    @mock.patch.object(
+        api.Courses.course_interface, '_engine', new=test_engine
+    )
+    def test_not_modified_with_if_modified_since(self):
+        response = self.app.get('/api/v1/courses/')
+
+        cached_response = self.app.get('/api/v1/courses/', headers={
+            'If-Modified-Since': response.headers['Last-Modified']
+        })
+
+        self.assertEqual(cached_response.status_code, 304)
+
+    @mock.patch.object(
+        api.Courses.course_interface, '_engine', new=test_engine
+    )
+    def test_write_in_same_second_is_modified(self):
+        written_at = datetime.now(timezone.utc).replace(microsecond=1)
+        self.set_updated_at(written_at)
+
+        response = self.app.get('/api/v1/courses/')
+
+        self.assertNotIn('Last-Modified', response.headers)
+
+        # Written later in the second the client saw the data.
+        self.set_updated_at(written_at + timedelta(microseconds=1))
+
+        response = self.app.get('/api/v1/courses/', headers={
+            'If-Modified-Since': http_date(written_at)
+        })
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_last_modified_is_rounded_up(self):
+        second = datetime(2024, 5, 1, 12, 0, 10, tzinfo=timezone.utc)
+        now = second + timedelta(seconds=0.5)
+
+        self.assertEqual(
+            http_last_modified(second - timedelta(seconds=0.5), now), second
+        )
+        self.assertEqual(http_last_modified(second, now), second)
+        self.assertIsNone(
+            http_last_modified(second + timedelta(seconds=0.2), now)
+        )
+
+    @mock.patch.object(
+        api.IndStudent.student_interface, '_engine', new=test_engine
+    )
+    def test_write_of_another_process_is_not_served_from_cache(self):
+        api.entity_cache.clear()
+        self.app.get('/api/v1/students/3/')
+
+        # Its own cache, like an interface of another worker.
+        StudentInterface(
+            engine=test_engine, cache=EntityCache(LRUTTLCacheBackend())
+        ).delete_student_by_id(3)
+
+        self.assertEqual(
+            self.app.get('/api/v1/students/3/').status_code, 404
+        )
+
+    @mock.patch.object(
+        api.IndStudent.student_interface, '_engine', new=test_engine
+    )
+    def test_entity_cache_metrics(self):
+        api.entity_cache.clear()
+        before = self.app.get('/metrics/entity-cache').get_json()
+
+        self.app.get('/api/v1/students/3/')
+        self.app.get('/api/v1/students/3/')
+
+        after = self.app.get('/metrics/entity-cache').get_json()
+
+        self.assertEqual(
+            set(after), {'hits', 'misses', 'evictions', 'invalidations'}
+        )
+        self.assertEqual(after['misses'] - before['misses'], 1)
+        self.assertEqual(after['hits'] - before['hits'], 1)
+
+    @mock.patch.object(
+        api.IndStudent.student_interface, '_engine', new=test_engine
+    )
+    def test_write_changes_etag(self):
+        etag = self.app.get('/api/v1/students/3/').headers['ETag']
+
+        self.app.delete('/api/v1/students/3/?course_name=Writing')
+
+        response = self.app.get(
+            '/api/v1/students/3/', headers={'If-None-Match': etag}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    @mock.patch.object(
+        api.IndStudent.student_interface, '_engine', new=test_engine
+    )
+    def test_representations_have_different_etags(self):
+        etag = self.app.get('/api/v1/students/3/').headers['ETag']
+
+        response = self.app.get(
+            '/api/v1/students/3/?show_courses=true',
+            headers={'If-None-Match': etag}
+        )
+
+        self.assertEqual(response.status_code, 200)
+
+    @mock.patch.object(
+        api.IndCourse.course_interface, '_engine', new=test_engine
+    )
+    def test_cache_control_per_endpoint(self):
+        api.app.config['CACHE_CONTROLS'] = {'indcourse': 'max-age=60'}
+
+        response = self.app.get('/api/v1/courses/1/')
+
+        self.assertEqual(response.headers['Cache-Control'], 'max-age=60')
+
+
+@mock.patch.object(api.Groups.group_interface, '_engine', new=test_engine)
+@mock.patch.object(api.Students.student_interface, '_engine', new=test_engine)
+@mock.patch.object(api.Courses.course_interface, '_engine', new=test_engine)
+class TestListingRows(InitTestDbForTests):
+    def setUp(self, students=None, groups=None, courses=None,
+              students_courses=None, students_group=None) -> None:
+        super().setUp()
+
+        api.app.config['TESTING'] = True
+
+        self.app = api.app.test_client()
+
+        self.loaded = []
+
+        for model in (Student, Group, Course):
+            event.listen(model, 'load', self.record_load)
+
+    def tearDown(self) -> None:
+        for model in (Student, Group, Course):
+            event.remove(model, 'load', self.record_load)
+
+        super().tearDown()
+
+    def record_load(self, target, context):
+        self.loaded.append(target)
+
+    def test_listings_load_no_orm_objects(self):
+        for url in ('/api/v1/groups/', '/api/v1/groups/?students_count=1',
+                    '/api/v1/groups/?fields=group_name',
+                    '/api/v1/courses/', '/api/v1/courses/?fields=course_id',
+                    '/api/v1/students/', '/api/v1/students/?limit=3',
+                    '/api/v1/students/?limit=3&fields=last_name',
+                    '/api/v1/students/?course_name=Art',
+                    '/api/v1/students/?course_name=Art&fields=student_id'):
+            response = self.app.get(url)
+
+            with self.subTest(url=url):
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(self.loaded, [])
+
+    def test_includes_load_orm_objects(self):
+        response = self.app.get('/api/v1/students/?limit=3&include=group')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(self.loaded)
+
+    def test_page_without_id_field(self):
+        response = self.app.get(
+            '/api/v1/students/?limit=2&after=2&fields=last_name'
+        )
+
+        self.assertEqual(response.get_json(), {
+            'students': [{'last_name': 'Wilson'}, {'last_name': 'Brown'}],
+            'next_after': 4,
+            'next': '/api/v1/students/?limit=2&after=4&fields=last_name'
+        })
+
+    def test_unknown_course_has_no_students(self):
+        response = self.app.get('/api/v1/students/?course_name=Astronomy')
+
+        self.assertEqual(response.status_code, 404)
+
+
+@mock.patch.object(api.IndGroup.group_interface, '_engine', new=test_engine)
+@mock.patch.object(api.Groups.group_interface, '_engine', new=test_engine)
+@mock.patch.object(
+    api.IndStudent.student_interface, '_engine', new=test_engine
+)
+@mock.patch.object(api.Students.student_interface, '_engine', new=test_engine)
+@mock.patch.object(
+    api.StudentsSearch.student_interface, '_engine', new=test_engine
+)
+@mock.patch.object(api.IndCourse.course_interface, '_engine', new=test_engine)
+@mock.patch.object(api.Courses.course_interface, '_engine', new=test_engine)
+class TestFieldSelection(InitTestDbForTests):
+    def setUp(self, students=None, groups=None, courses=None,
+              students_courses=None, students_group=None) -> None:
+        super().setUp()
+
+        api.app.config['TESTING'] = True
+
+        self.app = api.app.test_client()
+
+    def get_with_statements(self, url: str):
+        with QueryCounter(test_engine) as counter:
+            response = self.app.get(url)
+
+        return response, [
+            statement for statement in counter.statements
+            if 'table_version' not in statement
+        ]
+
+    def test_student_fields(self):
+        response, statements = self.get_with_statements(
+            '/api/v1/students/3/?fields=first_name,student_id'
+        )
+
+        self.assertEqual(
+            response.get_json(), {'student_id': 3, 'first_name': 'Mia'}
+        )
+        self.assertEqual(len(statements), 1)
+        self.assertNotIn('last_name', statements[0])
+
+    def test_student_with_includes(self):
+        response, statements = self.get_with_statements(
+            '/api/v1/students/3/?fields=last_name&include=courses,group'
+            '&fields[courses]=course_id,course_name'
+        )
+
+        self.assertEqual(response.get_json(), {
+            'last_name': 'Wilson',
+            'group': {'group_id': 1, 'group_name': 'SD-58'},
+            'courses': [
+                {'course_id': 1, 'course_name': 'Geography'},
+                {'course_id': 4, 'course_name': 'Writing'},
+                {'course_id': 5, 'course_name': 'German'}
+            ]
+        })
+        self.assertEqual(len(statements), 2)
+        self.assertFalse(any('description' in statement
+                             for statement in statements))
+
+    def test_course_roster_page_with_includes(self):
+        response = self.app.get(
+            '/api/v1/students/?course_name=Art&after=4&limit=1'
+            '&fields=student_id&include=group'
+        )
+
+        self.assertEqual(response.get_json()['students'], [
+            {'student_id': 5, 'group': {'group_id': 2, 'group_name': 'TU-69'}}
+        ])
+        self.assertEqual(response.get_json()['next_after'], 5)
+
+    def test_course_roster_page_is_one_statement(self):
+        response, statements = self.get_with_statements(
+            '/api/v1/students/?course_name=Art&limit=2&fields=last_name'
+        )
+
+        self.assertEqual(
+            response.get_json()['students'],
+            [{'last_name': 'Miller'}, {'last_name': 'Brown'}]
+        )
+        self.assertEqual(len(statements), 1)
+
+    def test_fields_win_over_show_courses(self):
+        response = self.app.get(
+            '/api/v1/students/3/?show_courses=true&fields=student_id'
+        )
+
+        self.assertEqual(response.get_json(), {'student_id': 3})
+
+    def test_not_existing_student(self):
+        response = self.app.get('/api/v1/students/100/?fields=student_id')
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_students_page_keeps_fields(self):
+        response, statements = self.get_with_statements(
+            '/api/v1/students/?fields=student_id&limit=2&after=4'
+        )
+
+        self.assertEqual(response.get_json(), {
+            'students': [{'student_id': 5}, {'student_id': 6}],
+            'next_after': 6,
+            'next': '/api/v1/students/?fields=student_id&limit=2&after=6'
+        })
+        self.assertNotIn('first_name', statements[0])
+
+    def test_students_of_course(self):
+        response, statements = self.get_with_statements(
+            '/api/v1/students/?course_name=Art&fields=student_id'
+            '&include=group&fields[group]=group_name'
+        )
+
+        self.assertEqual(response.get_json()['students'][:2], [
+            {'student_id': 1, 'group': {'group_name': 'SD-58'}},
+            {'student_id': 4, 'group': {'group_name': 'TU-69'}}
+        ])
+        self.assertFalse(any('description' in statement
+                             for statement in statements))
+
+    def test_all_students(self):
+        response = self.app.get('/api/v1/students/?fields=last_name')
+
+        self.assertEqual(
+            response.get_json()['students'][:2],
+            [{'last_name': 'Miller'}, {'last_name': 'Johnson'}]
+        )
+
+    def test_students_ndjson(self):
+        response = self.app.get(
+            '/api/v1/students/?fields=student_id&after=8',
+            headers={'Accept': api.NDJSON_MIMETYPE}
+        )
+
+        self.assertEqual(
+            response.get_data(as_text=True).splitlines(),
+            ['{"student_id":9}', '{"student_id":10}']
+        )
+
+        response = self.app.get(
+            '/api/v1/students/?include=group',
+            headers={'Accept': api.NDJSON_MIMETYPE}
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_search_fields(self):
+        response = self.app.get(
+            '/api/v1/students/search/?q=mia&fields=student_id,matched_name'
+        )
+
+        self.assertEqual(response.get_json(), {'students': [
+            {'student_id': 8, 'matched_name': 'mia thompson'},
+            {'student_id': 3, 'matched_name': 'mia wilson'}
+        ]})
+
+    def test_group_fields(self):
+        self.assertEqual(
+            self.app.get('/api/v1/groups/3/?fields=group_name').get_json(),
+            {'group_name': 'DD-30'}
+        )
+        self.assertEqual(
+            self.app.get(
+                '/api/v1/groups/?fields=group_id&students_count=1'
+            ).get_json(),
+            {'groups': [{'group_id': 5}]}
+        )
+        self.assertEqual(
+            len(self.app.get('/api/v1/groups/?fields=group_id')
+                .get_json()['groups']),
+            5
+        )
+
+    def test_course_fields(self):
+        response, statements = self.get_with_statements(
+            '/api/v1/courses/2/?fields=course_name'
+        )
+
+        self.assertEqual(response.get_json(), {'course_name': 'Art'})
+        self.assertNotIn('description', statements[0])
+
+        response, statements = self.get_with_statements(
+            '/api/v1/courses/?fields=course_id,course_name'
+        )
+
+        self.assertEqual(
+            response.get_json()['courses'][1],
+            {'course_id': 2, 'course_name': 'Art'}
+        )
+        self.assertNotIn('description', statements[0])
+
+    def test_invalid_fields(self):
+        urls_and_messages = {
+            '/api/v1/groups/1/?fields=name':
+                'Unknown group fields (name)! '
+                'Available: group_id, group_name',
+            '/api/v1/groups/?include=students':
+                'Unknown includes of group (students)! Available: none',
+            '/api/v1/courses/?fields=':
+                'fields must not be empty!',
+            '/api/v1/students/1/?fields[courses]=course_name':
+                'Fields of courses are given but not included!',
+            '/api/v1/students/?include=group,teachers&limit=1':
+                'Unknown includes of student (teachers)! '
+                'Available: group, courses'
+        }
+
+        for url, message in urls_and_messages.items():
+            response = self.app.get(url)
+
+            with self.subTest(url=url):
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.get_json(), {'message': message})
+
+
+@mock.patch.object(
+    api.SchoolStats.stats_interface, '_engine', new=test_engine
+)
+class TestStats(InitTestDbForTests):
+    student_interface = StudentInterface(engine=test_engine)
+
+    def setUp(self, students=None, groups=None, courses=None,
+              students_courses=None, students_group=None) -> None:
+        super().setUp()
+
+        api.app.config['TESTING'] = True
+
+        self.app = api.app.test_client()
+
+        api.SchoolStats.stats_cache.clear()
+
+    def test_course_enrollments(self):
+        received_json = self.app.get(
+            '/api/v1/stats/course-enrollments/'
+        ).get_json()
+
+        self.assertEqual(received_json['course_enrollments'][:2], [
+            {'course_id': 1, 'course_name': 'Geography', 'students_count': 4},
+            {'course_id': 2, 'course_name': 'Art', 'students_count': 5}
+        ])
+        self.assertFalse(received_json['stale'])
+
+    def test_group_sizes_and_small_groups(self):
+        group_sizes = self.app.get(
+            '/api/v1/stats/group-sizes/'
+        ).get_json()['group_sizes']
+
+        self.assertEqual(
+            [group['students_count'] for group in group_sizes],
+            [3, 2, 2, 2, 1]
+        )
+        self.assertEqual(
+            self.app.get(
+                '/api/v1/stats/small-groups/?students_count=1'
+            ).get_json()['small_groups'],
+            [{'group_id': 5, 'group_name': 'CX-73', 'students_count': 1}]
+        )
+
+    def test_course_loads(self):
+        course_loads = self.app.get(
+            '/api/v1/stats/course-loads/'
+        ).get_json()['course_loads']
+
+        self.assertEqual(course_loads[-1], {
+            'courses_count': 3, 'students_count': 5,
+            'share': 0.5, 'cumulative_share': 1.0
+        })
+
+    def test_cached_result_is_read_without_the_aggregate(self):
+        url = '/api/v1/stats/course-enrollments/'
+
+        computed_at = self.app.get(url).get_json()['computed_at']
+
+        with QueryCounter(test_engine) as counter:
+            received_json = self.app.get(url).get_json()
+
+        self.assertEqual(received_json['computed_at'], computed_at)
+        # Only the table versions are read.
+        self.assertEqual(counter.count, 1)
+        self.assertIn('table_version', counter.statements[0])
+
+    def test_write_outdates_the_result(self):
+        url = '/api/v1/stats/course-enrollments/'
+
+        self.app.get(url)
+        self.student_interface.add_student_to_course(3, 'Art')
+
+        received_json = self.app.get(url).get_json()
+
+        self.assertEqual(
+            received_json['course_enrollments'][1]['students_count'], 6
+        )
+        self.assertFalse(received_json['stale'])
+
+    def test_invalid_students_count(self):
+        for url in ('/api/v1/stats/small-groups/',
+                    '/api/v1/stats/small-groups/?students_count=-1'):
+            with self.subTest(url=url):
+                self.assertEqual(self.app.get(url).status_code, 400)
+
+
 if __name__ == '__main__':
     unittest.main()
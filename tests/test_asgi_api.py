@@ -0,0 +1,175 @@
+import unittest
+from unittest import mock
+
+from starlette.testclient import TestClient
+
+import asgi_api
+from models.entity_cache import EntityCache
+from models.manage_school_db import StudentInterface
+from models.models import Group, Student
+
+from tests import test_api
+from tests.base_db_class_for_tests import InitTestDbForTests
+from tests.test_db_settings.settings import test_engine, test_async_engine
+
+
+class AsgiTestResponse:
+    """The parts of Flask's test response used by ``test_api``."""
+
+    def __init__(self, response):
+        self._response = response
+
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.data = response.content
+        self.mimetype = response.headers.get(
+            'content-type', ''
+        ).split(';')[0]
+
+    def get_json(self):
+        try:
+            return self._response.json()
+        except ValueError:
+            return None
+
+
+class AsgiTestClient:
+    """Flask test client interface over the ASGI app,
+    so the tests of ``test_api`` run against it unchanged.
+
+    """
+
+    def __init__(self, app):
+        self._client = TestClient(app)
+
+    def open(self, method: str, url: str, json=None, data=None,
+             content_type: str = None, headers: dict = None):
+        headers = dict(headers or {})
+
+        if content_type is not None:
+            headers['Content-Type'] = content_type
+
+        return AsgiTestResponse(self._client.request(
+            method, url, json=json, content=data, headers=headers
+        ))
+
+    def get(self, url: str, **kwargs):
+        return self.open('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.open('POST', url, **kwargs)
+
+    def delete(self, url: str, **kwargs):
+        return self.open('DELETE', url, **kwargs)
+
+
+class AsgiApiTestMixin:
+    interfaces = [
+        asgi_api.IndGroup.group_interface, asgi_api.Groups.group_interface,
+        asgi_api.IndStudent.student_interface,
+        asgi_api.Students.student_interface,
+        asgi_api.IndCourse.course_interface,
+        asgi_api.Courses.course_interface
+    ]
+
+    sync_interfaces = [
+        asgi_api.StudentsImport.student_interface,
+        asgi_api.BatchEnrollments.student_interface
+    ]
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        for interface in self.interfaces:
+            self.patch_engine(interface, test_async_engine)
+
+        for interface in self.sync_interfaces:
+            self.patch_engine(interface, test_engine)
+
+        self.app = AsgiTestClient(asgi_api.app)
+
+    def patch_engine(self, interface, engine) -> None:
+        patcher = mock.patch.object(interface, '_engine', new=engine)
+        patcher.start()
+
+        self.addCleanup(patcher.stop)
+
+
+class TestAsgiIndGroup(AsgiApiTestMixin, test_api.TestIndGroup):
+    pass
+
+
+class TestAsgiGroups(AsgiApiTestMixin, test_api.TestGroups):
+    pass
+
+
+class TestAsgiIndStudent(AsgiApiTestMixin, test_api.TestIndStudent):
+    pass
+
+
+class TestAsgiStudents(AsgiApiTestMixin, test_api.TestStudents):
+    pass
+
+
+class TestAsgiBatchEnrollments(AsgiApiTestMixin,
+                               test_api.TestBatchEnrollments):
+    pass
+
+
+class TestAsgiStudentsImport(AsgiApiTestMixin, test_api.TestStudentsImport):
+    pass
+
+
+class TestAsgiIndCourse(AsgiApiTestMixin, test_api.TestIndCourse):
+    pass
+
+
+class TestAsgiCourses(AsgiApiTestMixin, test_api.TestCourses):
+    pass
+
+
+class TestAsgiWritesEvictEntityCache(AsgiApiTestMixin, InitTestDbForTests):
+    def setUp(self, students=None, groups=None, courses=None,
+              students_courses=None, students_group=None) -> None:
+        super().setUp()
+
+        asgi_api.entity_cache.clear()
+        self.read_student()
+
+    def read_student(self) -> None:
+        # Through the cache shared with the Flask API.
+        StudentInterface(
+            engine=test_engine, cache=asgi_api.entity_cache
+        ).get_student_by_id(3)
+
+        self.assertIsNotNone(asgi_api.entity_cache._backend.get(
+            EntityCache.make_key(Student, 3)
+        ))
+
+    def assert_not_cached(self, model, id_: int) -> None:
+        self.assertIsNone(asgi_api.entity_cache._backend.get(
+            EntityCache.make_key(model, id_)
+        ))
+
+    def test_delete_student_evicts_student_and_group(self):
+        self.app.delete('/api/v1/students/3/')
+
+        self.assert_not_cached(Student, 3)
+        self.assert_not_cached(Group, 1)
+
+    def test_enrollment_writes_evict_student(self):
+        writes = [
+            lambda: self.app.delete('/api/v1/students/3/?course_name=Writing'),
+            lambda: self.app.post('/api/v1/students/3/?course_name=Writing')
+        ]
+
+        for write in writes:
+            self.read_student()
+
+            with self.subTest():
+                self.assertEqual(write().status_code, 200)
+                self.assert_not_cached(Student, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,33 @@
+import os
+import tempfile
 import unittest
+from collections import Counter
+from unittest import mock
+
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.exc import InvalidRequestError
 
 from models.manage_school_db import StudentInterface, CourseInterface
-from models.manage_school_db import GroupInterface
+from models.manage_school_db import GroupInterface, StatsInterface
+from models.manage_school_db import InitSchoolDb, DropSchoolDb
+from models.manage_school_db import RejectedRows
+from models.manage_school_db import StudentNotExistsError
+from models.manage_school_db import StudentAlreadyExistsError
+from models.manage_school_db import StudentNotInCourseError
+from models.manage_school_db import GroupNotExistsError
+from models.manage_school_db import CourseNotExistsError
+from models.models import SchoolBase, Student, Group
+from models.group_stats import students_count_deltas
+from models.entity_cache import EntityCache, LRUTTLCacheBackend
+from models.db_routing import read_your_writes, primary_reads
+from models.db_routing import single_source_reads
+from models.field_selection import FieldSelection
+from models.dto import GroupRoster, GroupRow, StudentRow, StudentsPage
+from models.dto import CourseEnrollments, CourseLoad, GroupSize
+
+from engine_factory import EngineSettings, create_db_engine
+
+from tests.test_data.test_school_data import test_data
 
 from tests.test_db_settings.settings import test_engine
 
@@ -183,6 +209,154 @@ class TestStudentInterface(InitTestDbForTests):
                     with self.subTest():
                         self.assertEqual(course_repr, expected_course)
 
+    def test_get_student_details(self):
+        for id_ in (7, 5, 2, 1, 3, 4):
+            student = self.student_interface.get_student_details(id_)
+
+            with self.subTest():
+                self.assertEqual(str(student), self.test_student_data[id_])
+                self.assertEqual(
+                    str(student.group), self.test_student_group[id_]
+                )
+                self.assertEqual(
+                    [str(course) for course in student.courses],
+                    self.test_student_courses[id_]
+                )
+
+        self.assertIsNone(self.student_interface.get_student_details(15))
+
+    def test_get_student_profile(self):
+        with test_engine.begin() as connection:
+            connection.execute(insert(Student).values(
+                id=50, first_name='Zoe', last_name='Young'
+            ))
+
+        for id_ in (*self.test_student_data, 50, 15):
+            with self.subTest(id_=id_):
+                with self.assertMaxQueries(
+                        1 if test_engine.dialect.name == 'postgresql' else 2
+                ):
+                    profile = self.student_interface.get_student_profile(id_)
+
+                self.assertEqual(
+                    profile, self.student_interface.get_student_details(id_)
+                )
+
+    def test_get_student_profile_of_student_without_group(self):
+        with test_engine.begin() as connection:
+            connection.execute(insert(Student).values(
+                id=50, first_name='Zoe', last_name='Young'
+            ))
+
+        profile = self.student_interface.get_student_profile(50)
+
+        self.assertIsNone(profile.group)
+        self.assertEqual(profile.courses, ())
+
+    def test_get_student_rows(self):
+        students = self.student_interface.get_student_rows()
+
+        self.assertEqual(
+            [str(student) for student in students],
+            list(self.test_student_data.values())
+        )
+
+    def test_get_student_rows_page(self):
+        self.assertEqual(
+            self.student_interface.get_student_rows_page(3, 4).students,
+            [StudentRow(student.Student.id, student.Student.first_name,
+                        student.Student.last_name, student.Student.group_id)
+             for student in self.student_interface.get_students_page(3, 4)]
+        )
+        self.assertEqual(
+            self.student_interface.get_student_rows_page(2, 4, ('id',)),
+            StudentsPage([(5,), (6,)], [5, 6])
+        )
+
+    def test_pages_select_student_ids_besides_columns(self):
+        # Students of Art are 1, 4, 5, 9 and 10.
+        self.assertEqual(
+            self.student_interface.get_student_rows_page(
+                2, 4, ('last_name',)
+            ),
+            StudentsPage([('White',), ('White',)], [5, 6])
+        )
+        self.assertEqual(
+            self.student_interface
+            .get_student_rows_page_related_to_course_name(
+                'Art', 2, 1, ('first_name',)
+            ),
+            StudentsPage([('Charlotte',), ('Evelyn',)], [4, 5])
+        )
+
+    def test_get_student_rows_related_to_course_name(self):
+        students = self.student_interface.get_student_rows_related_to_course(
+            2
+        )
+
+        self.assertEqual(
+            self.student_interface.get_student_rows_related_to_course_name(
+                'Art'
+            ),
+            students
+        )
+        self.assertEqual(
+            self.student_interface.get_student_rows_related_to_course_name(
+                'Astronomy'
+            ),
+            []
+        )
+
+    def test_course_roster_pages(self):
+        # Students of Art are 1, 4, 5, 9 and 10.
+        self.assertEqual(
+            self.student_interface.get_student_rows_related_to_course(
+                2, ('id',), limit=2, after=1
+            ),
+            [(4,), (5,)]
+        )
+        self.assertEqual(
+            self.student_interface.get_student_rows_related_to_course_name(
+                'Art', ('id',), after=5
+            ),
+            [(9,), (10,)]
+        )
+        self.assertEqual(
+            [student.Student.id for student in
+             self.student_interface.get_students_related_to_course(
+                 'Art', limit=3
+             )],
+            [1, 4, 5]
+        )
+
+    def test_count_students_related_to_course(self):
+        self.assertEqual(
+            self.student_interface.count_students_related_to_course(2), 5
+        )
+        self.assertEqual(
+            self.student_interface.count_students_related_to_course_name(
+                'Art'
+            ),
+            5
+        )
+        self.assertEqual(
+            self.student_interface.count_students_related_to_course_name(
+                'Astronomy'
+            ),
+            0
+        )
+
+    def test_get_student_rows_of_columns(self):
+        students = self.student_interface.get_student_rows(
+            ('id', 'last_name')
+        )
+
+        self.assertEqual(students[0], (1, 'Miller'))
+        self.assertEqual(students[0].last_name, 'Miller')
+        self.assertEqual(
+            len(students), len(self.student_interface.get_student_rows())
+        )
+
     def test_get_student_full_info_with_not_existing_id(self):
         for id_ in self.not_existing_id:
             student = self.student_interface.get_student_with_full_info(id_)
@@ -286,6 +460,84 @@ class TestStudentInterface(InitTestDbForTests):
             with self.subTest():
                 self.assertEqual(student_repr, expected_repr)
 
+    def test_new_student_with_invalid_data(self):
+        with self.assertRaises(StudentAlreadyExistsError):
+            self.student_interface.add_new_student(1, 1, 'Test', 'Test')
+
+        with self.assertRaises(GroupNotExistsError):
+            self.student_interface.add_new_student(11, 15, 'Test', 'Test')
+
+        self.assertFalse(self.student_interface.check_if_student_exists(11))
+
+    def test_write_errors_tell_what_is_missing(self):
+        writes = (
+            self.student_interface.add_student_to_course,
+            self.student_interface.remove_student_from_course
+        )
+
+        for write in writes:
+            with self.subTest():
+                with self.assertRaises(StudentNotExistsError):
+                    write(15, 'Art')
+
+                with self.assertRaises(CourseNotExistsError):
+                    write(1, 'Math')
+
+        with self.assertRaises(StudentNotInCourseError):
+            self.student_interface.remove_student_from_course(2, 'Art')
+
+    def test_add_students_to_courses_in_chunks(self):
+        pairs = [(2, 'Art'), (7, 'Art'), (2, 'Art'), (7, 'German')]
+
+        statuses = self.student_interface.add_students_to_courses(
+            pairs, chunk_size=2
+        )
+
+        self.assertEqual(
+            statuses, ['enrolled', 'enrolled', 'already_enrolled', 'enrolled']
+        )
+
+        statuses = self.student_interface.remove_students_from_courses(
+            pairs, chunk_size=3
+        )
+
+        self.assertEqual(
+            statuses, ['removed', 'removed', 'not_enrolled', 'removed']
+        )
+
+        student = self.student_interface.get_student_with_full_info(7)
+        self.assertEqual(
+            [course.name for course in student.courses], ['Writing']
+        )
+
+    def test_every_chunk_of_enrollments_is_one_statement(self):
+        pairs = [(1, 'Art'), (2, 'Art'), (2, 'Art'), (15, 'Art'), (2, 'Math')]
+        writes = (
+            (self.student_interface.add_students_to_courses,
+             ['already_enrolled', 'enrolled', 'already_enrolled',
+              'student_not_found', 'course_not_found']),
+            (self.student_interface.remove_students_from_courses,
+             ['removed', 'removed', 'not_enrolled',
+              'student_not_found', 'course_not_found'])
+        )
+
+        for write, expected_statuses in writes:
+            statements = []
+
+            def count(conn, cursor, statement, *args):
+                if 'table_version' not in statement:
+                    statements.append(statement)
+
+            event.listen(test_engine, 'before_cursor_execute', count)
+            try:
+                statuses = write(pairs)
+            finally:
+                event.remove(test_engine, 'before_cursor_execute', count)
+
+            with self.subTest(write=write.__name__):
+                self.assertEqual(statuses, expected_statuses)
+                self.assertEqual(len(statements), 1)
+
     def test_add_student_to_course(self):
         students_courses_to_add = {
             2: ['Writing', 'German'],
@@ -391,6 +643,193 @@ class TestStudentInterface(InitTestDbForTests):
                         self.student_interface.remove_student_from_course(
                             id_, course)
 
+    def test_import_keeps_empty_strings(self):
+        # COPY must not read an empty name as NULL.
+        self.student_interface.import_students(
+            [(1, 11, 2, '', 'Bottom')], RejectedRows()
+        )
+
+        student = self.student_interface.get_student_with_full_info(11)
+
+        self.assertEqual(
+            (student.first_name, student.last_name), ('', 'Bottom')
+        )
+
+    def test_delete_student_is_one_statement(self):
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            if 'table_version' not in statement:
+                statements.append(statement)
+
+        event.listen(test_engine, 'before_cursor_execute', count)
+        try:
+            self.student_interface.delete_student_by_id(1)
+        finally:
+            event.remove(test_engine, 'before_cursor_execute', count)
+
+        self.assertEqual(len(statements), 1)
+        self.assertFalse(self.student_interface.check_if_student_exists(1))
+        self.assertEqual(
+            GroupInterface(engine=test_engine).check_students_counts(), []
+        )
+
+    def test_writes_changing_nothing_keep_table_versions(self):
+        tables = ('student', 'course_student', 'group')
+        states = self.student_interface.get_table_states(tables)
+
+        self.student_interface.add_student_to_course(1, 'Art')
+        self.student_interface.add_students_to_courses([(1, 'Art')])
+        self.student_interface.remove_students_from_courses([(2, 'Art')])
+        self.student_interface.import_students(
+            [(1, 1, 1, 'Taken', 'Id')], RejectedRows()
+        )
+        GroupInterface(engine=test_engine).rebuild_students_counts()
+
+        with self.assertRaises(StudentNotExistsError):
+            self.student_interface.delete_student_by_id(15)
+
+        self.assertEqual(
+            self.student_interface.get_table_states(tables), states
+        )
+
+        self.student_interface.add_student_to_course(2, 'Art')
+
+        self.assertEqual(
+            self.student_interface.get_table_states(tables)[
+                'course_student'
+            ].version,
+            states['course_student'].version + 1
+        )
+
+
+class TestStudentSearch(InitTestDbForTests):
+    student_interface = StudentInterface(engine=test_engine)
+
+    queries = ['mia', 'Thompson', 'white o', 'm', 'MIA   WILSON', 'x', '%']
+
+    def search(self, student_interface, query: str, limit: int = 10):
+        return [
+            (match.id, match.matched_name)
+            for match in student_interface.search_students(query, limit)
+        ]
+
+    def test_search_students(self):
+        self.assertEqual(self.search(self.student_interface, 'mia'), [
+            (8, 'mia thompson'), (3, 'mia wilson')
+        ])
+        self.assertEqual(self.search(self.student_interface, 'thom'), [
+            (9, 'thompson ava'), (8, 'thompson mia')
+        ])
+        self.assertEqual(self.search(self.student_interface, 'm', 3), [
+            (7, 'martin isabella'), (8, 'mia thompson'), (3, 'mia wilson')
+        ])
+        self.assertEqual(self.search(self.student_interface, '  '), [])
+
+    def test_in_process_index_gives_same_results(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            engine = create_db_engine(EngineSettings(
+                f'sqlite:///{os.path.join(tmp_dir, "school.db")}'
+            ))
+
+            SchoolBase.metadata.create_all(engine)
+
+            with engine.begin() as connection:
+                connection.execute(
+                    insert(Student.__table__),
+                    [row._asdict() for row in
+                     self.student_interface.get_student_rows()]
+                )
+
+            sqlite_interface = StudentInterface(
+                engine=engine, replica_engines=()
+            )
+
+            for query in self.queries:
+                for limit in (1, 3, 10):
+                    with self.subTest(query=query, limit=limit):
+                        self.assertEqual(
+                            self.search(sqlite_interface, query, limit),
+                            self.search(self.student_interface, query, limit)
+                        )
+
+            engine.dispose()
+
+    def test_in_process_index_follows_writes(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            engine = create_db_engine(EngineSettings(
+                f'sqlite:///{os.path.join(tmp_dir, "school.db")}'
+            ))
+
+            SchoolBase.metadata.create_all(engine)
+
+            with engine.begin() as connection:
+                connection.execute(
+                    insert(Group.__table__).values(id=1, name='SD-58')
+                )
+
+            sqlite_interface = StudentInterface(
+                engine=engine, replica_engines=()
+            )
+
+            self.assertEqual(self.search(sqlite_interface, 'zoe'), [])
+
+            sqlite_interface.add_new_student(1, 1, 'Zoe', 'Adams')
+
+            self.assertEqual(
+                self.search(sqlite_interface, 'zoe'), [(1, 'zoe adams')]
+            )
+
+            sqlite_interface.delete_student_by_id(1)
+
+            self.assertEqual(self.search(sqlite_interface, 'zoe'), [])
+
+            engine.dispose()
+
+
+class TestFieldSelection(InitTestDbForTests):
+    student_interface = StudentInterface(engine=test_engine)
+    course_interface = CourseInterface(engine=test_engine)
+
+    def test_only_selected_columns_are_loaded(self):
+        course = self.course_interface.get_course_by_id(
+            2, FieldSelection(('name',))
+        )
+
+        self.assertEqual(course.name, 'Art')
+        self.assertNotIn('description', course.__dict__)
+
+    def test_selected_relationships_are_loaded(self):
+        student = self.student_interface.get_student_by_id(3, FieldSelection(
+            ('first_name',), (
+                ('group', FieldSelection(('name',))),
+                ('courses', FieldSelection(('name',)))
+            )
+        ))
+
+        self.assertEqual(student.group.name, 'SD-58')
+        self.assertEqual(
+            [course.name for course in student.courses],
+            ['Geography', 'Writing', 'German']
+        )
+        self.assertNotIn('description', student.courses[0].__dict__)
+
+    def test_other_relationships_raise(self):
+        students = self.student_interface.get_students_page(
+            2, fields=FieldSelection(('first_name',))
+        )
+
+        with self.assertRaises(InvalidRequestError):
+            students[0].Student.courses
+
+    def test_iter_students_columns(self):
+        self.assertEqual(
+            list(self.student_interface.iter_students(
+                7, columns=('id', 'last_name')
+            ))[:2],
+            [(8, 'Thompson'), (9, 'Thompson')]
+        )
+
 
 class TestGroupInterface(InitTestDbForTests):
     group_interface = GroupInterface(engine=test_engine)
@@ -463,6 +902,20 @@ class TestGroupInterface(InitTestDbForTests):
                 with self.subTest():
                     self.assertEqual(group_repr, expected_repr)
 
+    def test_group_rows_with_less_students_count(self):
+        for count in (-1, 0, 1, 2, 100):
+            groups = self.group_interface.get_group_with_less_students_count(
+                count
+            )
+
+            with self.subTest(count=count):
+                self.assertEqual(
+                    self.group_interface
+                    .get_group_rows_with_less_students_count(count),
+                    [GroupRow(group.Group.id, group.Group.name)
+                     for group in groups]
+                )
+
     def test_group_with_less_students_count_with_incorrect_count(self):
         incorrect_count = [-20, 0, -3]
 
@@ -474,6 +927,121 @@ class TestGroupInterface(InitTestDbForTests):
             with self.subTest():
                 self.assertEqual(groups, [])
 
+    def test_group_with_less_students_count_includes_empty_groups(self):
+        with test_engine.begin() as connection:
+            connection.execute(insert(Group).values(id=6, name='EM-00'))
+
+        groups = self.group_interface.get_group_with_less_students_count(0)
+
+        self.assertEqual(
+            [str(group.Group) for group in groups],
+            ["Group id: 6, name: 'EM-00'"]
+        )
+
+    def get_students_counts(self) -> dict:
+        with test_engine.connect() as connection:
+            return dict(connection.execute(
+                select(Group.id, Group.students_count)
+            ).all())
+
+    def test_students_counts_follow_writes(self):
+        student_interface = StudentInterface(engine=test_engine)
+
+        self.assertEqual(
+            self.get_students_counts(), {1: 3, 2: 2, 3: 2, 4: 2, 5: 1}
+        )
+
+        student_interface.add_new_student(11, 5, 'Larry', 'Bottom')
+        student_interface.delete_student_by_id(1)
+        student_interface.import_students(
+            [(1, 12, 2, 'Harry', 'Erland'), (2, 13, 2, 'Marry', 'Bottom')],
+            RejectedRows()
+        )
+
+        self.assertEqual(
+            self.get_students_counts(), {1: 2, 2: 4, 3: 2, 4: 2, 5: 2}
+        )
+        self.assertEqual(self.group_interface.check_students_counts(), [])
+
+    def test_students_count_deltas_are_ordered_by_group(self):
+        self.assertEqual(
+            students_count_deltas(Counter({4: 2, 1: 1, 3: 0, 2: -1})), [
+                {'changed_group_id': 1, 'delta': 1},
+                {'changed_group_id': 2, 'delta': -1},
+                {'changed_group_id': 4, 'delta': 2}
+            ]
+        )
+
+    def test_rebuild_students_counts(self):
+        with test_engine.begin() as connection:
+            connection.execute(
+                update(Group).where(Group.id.in_([2, 4])).values(
+                    students_count=7
+                )
+            )
+
+        self.assertEqual(
+            self.group_interface.check_students_counts(),
+            [(2, 7, 2), (4, 7, 2)]
+        )
+
+        self.assertEqual(self.group_interface.rebuild_students_counts(), 2)
+        self.assertEqual(self.group_interface.check_students_counts(), [])
+
+    def test_get_group_roster(self):
+        roster = self.group_interface.get_group_roster(1)
+
+        self.assertEqual(roster.group, GroupRow(1, 'SD-58'))
+        self.assertEqual(roster.students, [
+            StudentRow(1, 'Benjamin', 'Miller', 1),
+            StudentRow(2, 'Alexander', 'Johnson', 1),
+            StudentRow(3, 'Mia', 'Wilson', 1)
+        ])
+
+    def test_get_group_roster_pages(self):
+        self.assertEqual(
+            self.group_interface.get_group_roster(1, ('first_name',), 1, 1),
+            GroupRoster(GroupRow(1, 'SD-58'), [('Alexander',)], [2])
+        )
+        # The group is there after its last student too.
+        self.assertEqual(
+            self.group_interface.get_group_roster(5, after=10),
+            GroupRoster(GroupRow(5, 'CX-73'), [], [])
+        )
+        self.assertIsNone(self.group_interface.get_group_roster(100))
+
+
+class TestStatsInterface(InitTestDbForTests):
+    stats_interface = StatsInterface(engine=test_engine)
+
+    def test_course_enrollments(self):
+        self.assertEqual(self.stats_interface.get_course_enrollments(), [
+            CourseEnrollments(1, 'Geography', 4),
+            CourseEnrollments(2, 'Art', 5),
+            CourseEnrollments(3, 'Computer studies', 3),
+            CourseEnrollments(4, 'Writing', 4),
+            CourseEnrollments(5, 'German', 5)
+        ])
+
+    def test_group_sizes(self):
+        StudentInterface(engine=test_engine).delete_student_by_id(10)
+
+        self.assertEqual(self.stats_interface.get_group_sizes(), [
+            GroupSize(1, 'SD-58', 3), GroupSize(2, 'TU-69', 2),
+            GroupSize(3, 'DD-30', 2), GroupSize(4, 'QK-85', 2),
+            GroupSize(5, 'CX-73', 0)
+        ])
+        self.assertEqual(self.stats_interface.get_small_groups(0), [
+            GroupSize(5, 'CX-73', 0)
+        ])
+
+    def test_course_loads(self):
+        self.assertEqual(self.stats_interface.get_course_loads(), [
+            CourseLoad(1, 4, 0.4, 0.4),
+            CourseLoad(2, 1, 0.1, 0.5),
+            CourseLoad(3, 5, 0.5, 1.0)
+        ])
+
 
 class TestCourseInterface(InitTestDbForTests):
     courses_interface = CourseInterface()
@@ -539,5 +1107,303 @@ class TestCourseInterface(InitTestDbForTests):
                 self.assertIsNone(course)
 
 
+class TestBulkInitSchoolDb(InitTestDbForTests):
+    @staticmethod
+    def dump_tables() -> dict:
+        with test_engine.connect() as connection:
+            return {
+                table.name: sorted(connection.execute(select(table)).all())
+                for table in SchoolBase.metadata.sorted_tables
+                # Versions hold the time of the write.
+                if table.name != 'table_version'
+            }
+
+    @mock.patch(
+        'school_generator.'
+        'school_data_generator.StudentGenerator.generate_random_students',
+        return_value=test_data['students']
+    )
+    @mock.patch(
+        'school_generator.'
+        'school_data_generator.GroupGenerator.generate_random_groups_name',
+        return_value=test_data['groups']
+    )
+    @mock.patch(
+        'school_generator.'
+        'school_data_generator.CoursesGenerator.generate_random_courses',
+        return_value=test_data['courses']
+    )
+    @mock.patch(
+        'school_generator.'
+        'school_data_generator.AssignStudentCourse.assign_student_to_course',
+        return_value=test_data['students_courses']
+    )
+    @mock.patch(
+        'school_generator.'
+        'school_data_generator.AssignStudentGroup.assign_student_to_group',
+        return_value=test_data['students_group']
+    )
+    def test_bulk_init_gives_same_data_as_init_db(self, *mocks):
+        expected_tables = self.dump_tables()
+
+        for use_copy in (True, False):
+            DropSchoolDb(engine=test_engine).drop_tables()
+
+            report = InitSchoolDb(engine=test_engine).bulk_init_db(
+                chunk_size=3, use_copy=use_copy
+            )
+
+            with self.subTest(use_copy=use_copy):
+                self.assertEqual(self.dump_tables(), expected_tables)
+                self.assertEqual(report.tables['student'].rows, 10)
+                self.assertEqual(report.tables['course_student'].rows, 21)
+
+                # Explicit IDs must not break the id sequence.
+                with test_engine.begin() as connection:
+                    new_id = connection.execute(
+                        SchoolBase.metadata.tables['student'].insert().values(
+                            first_name='Test', last_name='Test', group_id=1
+                        )
+                    ).inserted_primary_key[0]
+
+                self.assertEqual(new_id, 11)
+
+
+class TestLRUTTLCacheBackend(unittest.TestCase):
+    def setUp(self) -> None:
+        self.now = 0.0
+        self.backend = LRUTTLCacheBackend(
+            max_size=2, ttl=10, clock=lambda: self.now
+        )
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.backend.set('a', {'id': 1})
+        self.backend.set('b', {'id': 2})
+
+        self.backend.get('a')
+        self.backend.set('c', {'id': 3})
+
+        self.assertEqual(self.backend.get('a'), {'id': 1})
+        self.assertIsNone(self.backend.get('b'))
+        self.assertEqual(self.backend.get('c'), {'id': 3})
+        self.assertEqual(self.backend.evictions, 1)
+
+    def test_expired_entry_is_evicted(self):
+        self.backend.set('a', {'id': 1})
+
+        self.now = 9.9
+        self.assertEqual(self.backend.get('a'), {'id': 1})
+
+        self.now = 10
+        self.assertIsNone(self.backend.get('a'))
+        self.assertEqual(self.backend.evictions, 1)
+
+
+class TestEntityCache(InitTestDbForTests):
+    def setUp(self, students=None, groups=None, courses=None,
+              students_courses=None, students_group=None) -> None:
+        super().setUp()
+
+        self.cache = EntityCache(LRUTTLCacheBackend())
+
+        self.student_interface = StudentInterface(
+            engine=test_engine, cache=self.cache
+        )
+        self.group_interface = GroupInterface(
+            engine=test_engine, cache=self.cache
+        )
+        self.course_interface = CourseInterface(
+            engine=test_engine, cache=self.cache
+        )
+
+    def test_getters_read_through_cache(self):
+        getters = {
+            self.student_interface.get_student_by_id:
+                'Student id: 5 - Evelyn White, Group id: 2',
+            self.group_interface.get_group_by_id:
+                "Group id: 5, name: 'CX-73'",
+            self.course_interface.get_course_by_id:
+                "Subject id: 5, name: 'German', "
+                "description: 'Test description for German'"
+        }
+
+        for getter, expected_repr in getters.items():
+            first, second = getter(5), getter(5)
+
+            with self.subTest():
+                self.assertEqual(str(first), expected_repr)
+                self.assertEqual(str(second), expected_repr)
+                self.assertIsNot(first, second)
+
+        self.assertEqual(
+            self.cache.stats(),
+            {'hits': 3, 'misses': 3, 'evictions': 0, 'invalidations': 0}
+        )
+
+    def test_not_existing_entity_is_not_cached(self):
+        self.assertIsNone(self.student_interface.get_student_by_id(11))
+
+        self.student_interface.add_new_student(11, 1, 'Larry', 'Bottom')
+
+        self.assertEqual(
+            str(self.student_interface.get_student_by_id(11)),
+            'Student id: 11 - Larry Bottom, Group id: 1'
+        )
+
+    def test_writes_evict_student(self):
+        writes = [
+            lambda: self.student_interface.add_student_to_course(1, 'German'),
+            lambda: self.student_interface.remove_student_from_course(
+                1, 'German'
+            ),
+            lambda: self.student_interface.delete_student_by_id(1)
+        ]
+
+        for write in writes:
+            self.student_interface.get_student_by_id(1)
+            write()
+
+            with self.subTest():
+                self.assertIsNone(
+                    self.cache._backend.get(EntityCache.make_key(Student, 1))
+                )
+
+        self.assertIsNone(self.student_interface.get_student_by_id(1))
+        # Deleting evicts the group of the student as well.
+        self.assertEqual(self.cache.stats()['invalidations'], 4)
+
+    def test_entities_of_older_versions_are_loaded_again(self):
+        self.student_interface.get_student_by_id(5)
+
+        # Written through an interface without this cache.
+        StudentInterface(engine=test_engine).delete_student_by_id(5)
+
+        self.assertIsNone(self.student_interface.get_student_by_id(5))
+        self.assertEqual(self.cache.stats()['misses'], 2)
+
+
+class TestReadReplicaRouting(unittest.TestCase):
+    """SQLite files stand in for the primary and two replicas.
+
+    Replicas are not replicated here, every database gets its own
+    group name to show where a read was served from.
+
+    """
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+        self.engines = {}
+        for name in ('primary', 'replica_1', 'replica_2'):
+            engine = create_db_engine(EngineSettings(
+                f'sqlite:///{os.path.join(self.tmp_dir.name, name)}.db'
+            ))
+
+            SchoolBase.metadata.create_all(engine)
+
+            with engine.begin() as connection:
+                connection.execute(
+                    SchoolBase.metadata.tables['group'].insert().values(
+                        id=1, name=name
+                    )
+                )
+
+            self.engines[name] = engine
+
+        self.replicas = [self.engines['replica_1'], self.engines['replica_2']]
+
+    def tearDown(self) -> None:
+        for engine in self.engines.values():
+            engine.dispose()
+
+        self.tmp_dir.cleanup()
+
+    def make_interface(self, interface_class, **kwargs):
+        return interface_class(
+            engine=self.engines['primary'], replica_engines=self.replicas,
+            **kwargs
+        )
+
+    def test_reads_go_to_replicas_round_robin(self):
+        group_interface = self.make_interface(GroupInterface)
+
+        names = [
+            group_interface.get_group_by_id(1).name for _ in range(4)
+        ]
+
+        self.assertEqual(
+            names, ['replica_1', 'replica_2', 'replica_1', 'replica_2']
+        )
+
+    def test_reads_go_to_least_busy_replica(self):
+        group_interface = self.make_interface(
+            GroupInterface, replica_selection='least_connections'
+        )
+
+        with self.engines['replica_1'].connect():
+            names = {
+                group_interface.get_group_by_id(1).name for _ in range(3)
+            }
+
+        self.assertEqual(names, {'replica_2'})
+
+    def test_writes_go_to_primary(self):
+        student_interface = self.make_interface(StudentInterface)
+
+        student_interface.add_new_student(1, 1, 'Larry', 'Bottom')
+
+        self.assertIsNone(student_interface.get_student_by_id(1))
+
+        with primary_reads():
+            self.assertEqual(
+                str(student_interface.get_student_by_id(1)),
+                'Student id: 1 - Larry Bottom, Group id: 1'
+            )
+
+    def test_read_your_writes(self):
+        student_interface = self.make_interface(StudentInterface)
+
+        with read_your_writes():
+            self.assertIsNone(student_interface.get_student_by_id(1))
+
+            student_interface.add_new_student(1, 1, 'Larry', 'Bottom')
+
+            self.assertIsNotNone(student_interface.get_student_by_id(1))
+
+        self.assertIsNone(student_interface.get_student_by_id(1))
+
+    def test_single_source_reads_stay_on_one_replica(self):
+        group_interface = self.make_interface(GroupInterface)
+
+        with single_source_reads():
+            names = [
+                group_interface.get_group_by_id(1).name for _ in range(3)
+            ]
+
+        self.assertEqual(names, ['replica_1'] * 3)
+        self.assertEqual(group_interface.get_group_by_id(1).name, 'replica_2')
+
+    def test_cached_entity_is_read_with_versions_of_its_replica(self):
+        group_interface = self.make_interface(
+            GroupInterface, cache=EntityCache(LRUTTLCacheBackend())
+        )
+
+        checkouts = Counter()
+        for name, engine in self.engines.items():
+            event.listen(
+                engine, 'checkout',
+                lambda *args, name=name: checkouts.update((name,))
+            )
+
+        self.assertEqual(group_interface.get_group_by_id(1).name, 'replica_1')
+        # The versions, then the group, from the same replica.
+        self.assertEqual(checkouts, {'replica_1': 2})
+
+    def test_without_replicas_reads_go_to_primary(self):
+        group_interface = GroupInterface(engine=self.engines['primary'])
+
+        self.assertEqual(group_interface.get_group_by_id(1).name, 'primary')
+
+
 if __name__ == '__main__':
     unittest.main()
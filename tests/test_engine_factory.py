@@ -0,0 +1,114 @@
+import os
+import unittest
+from unittest import mock
+
+from sqlalchemy import literal, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import NullPool
+
+from engine_factory import EngineSettings, InstrumentedQueuePool
+from engine_factory import create_db_engine, pool_metrics
+from engine_factory import statement_cache_metrics
+
+from tests.test_db_settings.settings import TEST_DB_URL
+
+
+class TestEngineSettings(unittest.TestCase):
+    @mock.patch.dict(os.environ, {
+        'SCHOOL_DB_URL': 'sqlite://',
+        'SCHOOL_DB_POOL_SIZE': '20',
+        'SCHOOL_DB_MAX_OVERFLOW': '0',
+        'SCHOOL_DB_POOL_PRE_PING': 'true',
+        'SCHOOL_DB_POOL_RECYCLE': '300',
+        'SCHOOL_DB_STATEMENT_TIMEOUT_MS': '1500',
+        'SCHOOL_DB_EXTERNAL_POOLER': '1'
+    })
+    def test_settings_from_env(self):
+        settings = EngineSettings.from_env()
+
+        self.assertEqual(settings.url, 'sqlite://')
+        self.assertEqual(settings.pool_size, 20)
+        self.assertEqual(settings.max_overflow, 0)
+        self.assertTrue(settings.pool_pre_ping)
+        self.assertEqual(settings.pool_recycle, 300)
+        self.assertEqual(settings.statement_timeout_ms, 1500)
+        self.assertTrue(settings.external_pooler)
+
+    def test_default_settings(self):
+        with mock.patch.dict(os.environ, clear=True):
+            settings = EngineSettings.from_env()
+
+        self.assertEqual(settings.pool_size, 5)
+        self.assertEqual(settings.query_cache_size, 500)
+        self.assertIsNone(settings.statement_timeout_ms)
+        self.assertFalse(settings.external_pooler)
+
+
+class TestCreateDbEngine(unittest.TestCase):
+    def test_queue_pool_metrics(self):
+        engine = create_db_engine(
+            EngineSettings(TEST_DB_URL, pool_size=2, max_overflow=2)
+        )
+
+        self.assertIsInstance(engine.pool, InstrumentedQueuePool)
+
+        with engine.connect():
+            metrics = pool_metrics(engine)
+
+            self.assertEqual(metrics['checked_out'], 1)
+            self.assertEqual(metrics['utilization'], 0.25)
+
+        metrics = pool_metrics(engine)
+
+        self.assertEqual(metrics['checked_out'], 0)
+        self.assertEqual(metrics['checkouts'], 1)
+        self.assertGreaterEqual(metrics['max_wait_ms'], 0)
+
+        engine.dispose()
+
+    def test_external_pooler_mode(self):
+        engine = create_db_engine(
+            EngineSettings(TEST_DB_URL, external_pooler=True)
+        )
+
+        self.assertIsInstance(engine.pool, NullPool)
+        self.assertEqual(pool_metrics(engine)['pool'], 'NullPool')
+
+    def test_statement_timeout(self):
+        engine = create_db_engine(
+            EngineSettings(TEST_DB_URL, statement_timeout_ms=50)
+        )
+
+        with engine.connect() as connection:
+            with self.assertRaises(OperationalError):
+                connection.execute(text('SELECT pg_sleep(1)'))
+
+        engine.dispose()
+
+    def test_statement_cache_metrics(self):
+        engine = create_db_engine(
+            EngineSettings('sqlite://', query_cache_size=50)
+        )
+        statement = select(literal(1))
+
+        with engine.connect() as connection:
+            for _ in range(3):
+                connection.execute(statement)
+
+            connection.exec_driver_sql('SELECT 2')
+
+        metrics = statement_cache_metrics(engine)
+
+        self.assertEqual(metrics['capacity'], 50)
+        self.assertEqual(metrics['size'], 1)
+        self.assertEqual(
+            (metrics['hits'], metrics['misses'], metrics['uncached']),
+            (2, 1, 1)
+        )
+        self.assertEqual(metrics['hit_rate'], 0.6667)
+
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import json
+import unittest
+from unittest import mock
+
+import fast_json
+
+from models.dto import StudentRow
+
+
+class TestFastJson(unittest.TestCase):
+    rows = [
+        StudentRow(1, 'Benjamin', 'Miller', 1),
+        StudentRow(2, 'Zoë', 'Müller', None)
+    ]
+
+    expected = {'students': [
+        {'student_id': 1, 'first_name': 'Benjamin', 'last_name': 'Miller',
+         'group_id': 1},
+        {'student_id': 2, 'first_name': 'Zoë', 'last_name': 'Müller',
+         'group_id': None}
+    ]}
+
+    def test_rows_as_dicts(self):
+        self.assertEqual(
+            {'students': fast_json.rows_as_dicts(
+                fast_json.STUDENT_KEYS, self.rows
+            )}, self.expected
+        )
+
+    def test_dumps_with_and_without_orjson(self):
+        payload = {'students': fast_json.rows_as_dicts(
+            fast_json.STUDENT_KEYS, self.rows
+        )}
+
+        encoded = fast_json.dumps(payload)
+
+        with mock.patch.object(fast_json, 'orjson', new=None):
+            encoded_with_stdlib = fast_json.dumps(payload)
+
+        self.assertEqual(json.loads(encoded), self.expected)
+        self.assertEqual(encoded, encoded_with_stdlib)
@@ -0,0 +1,116 @@
+import unittest
+
+from benchmarks import load_suite
+from benchmarks.load_suite import Record, SchoolFacts
+
+
+def make_facts() -> SchoolFacts:
+    return SchoolFacts(
+        range(1, 11), range(1, 11), range(1, 201), ['Art', 'Natural history']
+    )
+
+
+def make_stats(**changes) -> dict:
+    stats = {
+        'requests': 100, 'errors': 0, 'requests_per_second': 100.0,
+        'p50_ms': 10.0, 'p95_ms': 20.0, 'p99_ms': 40.0,
+        'queries_per_request': 2.0
+    }
+    stats.update(changes)
+
+    return stats
+
+
+def make_results(total: dict, **scenarios) -> dict:
+    return {'meta': {}, 'total': total, 'scenarios': scenarios}
+
+
+class TestLoadSuite(unittest.TestCase):
+    def test_every_route_has_a_scenario(self):
+        self.assertEqual(load_suite.uncovered_routes(load_suite.app), [])
+
+    def test_plan_is_the_same_for_the_same_seed(self):
+        plan = load_suite.build_plan(make_facts(), 500, seed=3)
+
+        self.assertEqual(plan, load_suite.build_plan(make_facts(), 500, 3))
+        self.assertNotEqual(
+            plan, load_suite.build_plan(make_facts(), 500, seed=4)
+        )
+
+    def test_plan_weights(self):
+        plan = load_suite.build_plan(
+            make_facts(), 300, seed=1,
+            weights={scenario.name: 0 for scenario in load_suite.SCENARIOS
+                     if scenario.method != 'GET'}
+        )
+
+        self.assertTrue(all(request.method == 'GET' for request in plan))
+        self.assertNotIn(' ', ''.join(request.path for request in plan))
+
+        with self.assertRaises(ValueError):
+            load_suite.build_plan(make_facts(), 10, 1, weights={
+                scenario.name: 0 for scenario in load_suite.SCENARIOS
+            })
+
+    def test_created_students_are_new(self):
+        plan = load_suite.build_plan(
+            make_facts(), 50, seed=1, weights={'api_create_student': 1},
+            scenarios=[
+                scenario for scenario in load_suite.SCENARIOS
+                if scenario.name == 'api_create_student'
+            ]
+        )
+
+        self.assertEqual(plan[0].path, '/api/v1/students/201/')
+        self.assertEqual(len({request.path for request in plan}), 50)
+
+    def test_read_queries(self):
+        self.assertEqual(load_suite.read_queries(
+            'db;dur=1.52;desc="3 queries", db-slowest;dur=0.80'
+        ), 3)
+        self.assertIsNone(load_suite.read_queries(None))
+
+    def test_summarize(self):
+        records = [
+            Record('api_group', index / 1000, 200, 1)
+            for index in range(1, 100)
+        ] + [Record('api_group', 1.0, 500, None)]
+
+        stats = load_suite.summarize(records, seconds=2.0)
+
+        self.assertEqual(stats, {
+            'requests': 100, 'errors': 1, 'requests_per_second': 50.0,
+            'statuses': {'200': 99, '500': 1},
+            'p50_ms': 50.0, 'p95_ms': 95.0, 'p99_ms': 99.0,
+            'queries_per_request': 1.0
+        })
+
+    def test_compare_results(self):
+        baseline = make_results(
+            make_stats(), api_group=make_stats(), api_student=make_stats()
+        )
+        current = make_results(
+            make_stats(requests_per_second=80.0),
+            api_group=make_stats(p95_ms=30.0, requests_per_second=1.0),
+            api_student=make_stats(queries_per_request=3.0, p50_ms=10.5),
+            api_course=make_stats(p99_ms=1000.0)
+        )
+
+        regressions = load_suite.compare_results(baseline, current)
+
+        self.assertEqual(
+            [str(regression) for regression in regressions], [
+                'total: requests_per_second 100.0 -> 80.0',
+                'api_group: p95_ms 20.0 -> 30.0',
+                'api_student: queries_per_request 2.0 -> 3.0'
+            ]
+        )
+
+    def test_same_results_have_no_regressions(self):
+        results = make_results(make_stats(), api_group=make_stats())
+
+        self.assertEqual(load_suite.compare_results(results, results), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import os
+import unittest
+import warnings
+
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+
+from sqlalchemy import func, inspect, select, text
+from sqlalchemy.exc import SAWarning
+
+from models.manage_school_db import DropSchoolDb
+from models.models import SchoolBase, course_student
+
+from tests.test_db_settings.settings import test_engine
+
+
+ALEMBIC_INI = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'alembic.ini'
+)
+
+
+class TestMigrations(unittest.TestCase):
+    def setUp(self) -> None:
+        self.drop_everything()
+
+        self.connection = test_engine.connect()
+
+        self.config = Config(ALEMBIC_INI)
+        self.config.attributes['connection'] = self.connection
+
+    def tearDown(self) -> None:
+        self.connection.close()
+
+        self.drop_everything()
+
+    @staticmethod
+    def drop_everything() -> None:
+        DropSchoolDb(engine=test_engine).drop_tables()
+
+        with test_engine.begin() as connection:
+            connection.execute(text('DROP TABLE IF EXISTS alembic_version'))
+
+    def test_migrations_give_the_schema_of_the_models(self):
+        command.upgrade(self.config, 'head')
+
+        with warnings.catch_warnings():
+            # The name search indexes, made by DDL on PostgreSQL only.
+            warnings.filterwarnings(
+                'ignore', 'Skipped unsupported reflection of expression',
+                SAWarning
+            )
+
+            differences = compare_metadata(
+                MigrationContext.configure(self.connection),
+                SchoolBase.metadata
+            )
+
+        self.assertEqual(differences, [])
+
+    def test_search_indexes_of_the_models(self):
+        command.upgrade(self.config, 'head')
+
+        migrated = self.connection.execute(text(
+            "SELECT indexname, indexdef FROM pg_indexes "
+            "WHERE indexname LIKE 'ix_student_search_%' ORDER BY indexname"
+        )).all()
+
+        self.drop_everything()
+        SchoolBase.metadata.create_all(self.connection)
+
+        created = self.connection.execute(text(
+            "SELECT indexname, indexdef FROM pg_indexes "
+            "WHERE indexname LIKE 'ix_student_search_%' ORDER BY indexname"
+        )).all()
+
+        self.assertEqual(len(migrated), 2)
+        self.assertEqual(migrated, created)
+
+    def test_downgrade_to_base(self):
+        command.upgrade(self.config, 'head')
+        command.downgrade(self.config, 'base')
+
+        self.assertEqual(
+            inspect(self.connection).get_table_names(), ['alembic_version']
+        )
+
+    def test_duplicated_enrollments_are_removed(self):
+        command.upgrade(self.config, '0002')
+
+        self.connection.execute(text(
+            'INSERT INTO "group" (id, name) VALUES (1, \'SD-58\')'
+        ))
+        self.connection.execute(text(
+            'INSERT INTO course (id, name) VALUES (1, \'Art\'), (2, \'Math\')'
+        ))
+        self.connection.execute(text(
+            'INSERT INTO student (id, group_id, first_name, last_name) '
+            'VALUES (1, 1, \'Mia\', \'Wilson\')'
+        ))
+        self.connection.execute(text(
+            'INSERT INTO course_student (course_id, student_id) '
+            'VALUES (1, 1), (1, 1), (2, 1), (NULL, 1)'
+        ))
+
+        command.upgrade(self.config, 'head')
+
+        self.assertEqual(
+            sorted(self.connection.execute(select(course_student)).all()),
+            [(1, 1), (2, 1)]
+        )
+
+    def test_group_students_counts_are_filled(self):
+        command.upgrade(self.config, '0001')
+
+        self.connection.execute(text(
+            'INSERT INTO "group" (id, name) VALUES (1, \'SD-58\'), '
+            '(2, \'TU-69\')'
+        ))
+        self.connection.execute(text(
+            'INSERT INTO student (id, group_id, first_name, last_name) '
+            'VALUES (1, 1, \'Mia\', \'Wilson\'), (2, 1, \'Ava\', \'Jones\')'
+        ))
+
+        command.upgrade(self.config, 'head')
+
+        self.assertEqual(
+            self.connection.execute(text(
+                'SELECT id, students_count FROM "group" ORDER BY id'
+            )).all(),
+            [(1, 2), (2, 0)]
+        )
+        self.assertEqual(
+            self.connection.execute(
+                select(func.count()).select_from(course_student)
+            ).scalar(), 0
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+from unittest import mock
+
+import api
+
+from query_metrics import QueryBudgetExceeded
+
+from tests.base_db_class_for_tests import InitTestDbForTests
+
+from tests.test_db_settings.settings import test_engine
+
+
+@mock.patch.object(
+    api.IndStudent.student_interface, '_engine', new=test_engine
+)
+class TestQueryMetrics(InitTestDbForTests):
+    def setUp(self, students=None, groups=None, courses=None,
+              students_courses=None, students_group=None) -> None:
+        super().setUp()
+
+        api.app.config['TESTING'] = True
+
+        self.app = api.app.test_client()
+
+    def tearDown(self) -> None:
+        api.app.config['QUERY_BUDGET'] = None
+        api.app.config['QUERY_BUDGETS'] = {}
+        api.app.config['QUERY_BUDGET_ENFORCE'] = False
+
+        super().tearDown()
+
+    def test_server_timing_header(self):
+        response = self.app.get('/api/v1/students/3/?show_courses=true')
+
+        server_timing = response.headers['Server-Timing']
+
+        self.assertRegex(
+            server_timing,
+            r'^db;dur=\d+\.\d{2};desc="3 queries", '
+            r'db-slowest;dur=\d+\.\d{2}, db-cache;desc="\d cached"$'
+        )
+
+    def test_repeated_request_takes_statements_from_the_cache(self):
+        self.app.get('/api/v1/students/3/?show_courses=true')
+
+        response = self.app.get('/api/v1/students/3/?show_courses=true')
+
+        self.assertIn(
+            'db-cache;desc="3 cached"', response.headers['Server-Timing']
+        )
+
+    def test_structured_log(self):
+        with self.assertLogs('query_metrics', level='INFO') as logs:
+            self.app.get('/api/v1/students/3/')
+
+        self.assertIn('"endpoint": "indstudent"', logs.output[0])
+        self.assertIn('"queries": 2', logs.output[0])
+
+    def test_query_budget_is_enforced(self):
+        api.app.config['QUERY_BUDGETS'] = {'indstudent': 2}
+        api.app.config['QUERY_BUDGET_ENFORCE'] = True
+
+        self.assertEqual(self.app.get('/api/v1/students/3/').status_code, 200)
+
+        with self.assertRaises(QueryBudgetExceeded):
+            self.app.get('/api/v1/students/3/?show_courses=true')
+
+    def test_exceeded_budget_is_only_logged_by_default(self):
+        api.app.config['QUERY_BUDGET'] = 0
+
+        with self.assertLogs('query_metrics', level='WARNING') as logs:
+            response = self.app.get('/api/v1/students/3/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('"query_budget": 0', logs.output[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
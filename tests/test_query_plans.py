@@ -0,0 +1,226 @@
+import json
+import unittest
+
+from sqlalchemy import event, select, text
+
+from models.bulk_operations import bulk_write_rows
+from models.manage_school_db import DropSchoolDb
+from models.manage_school_db import StudentInterface, GroupInterface
+from models.models import SchoolBase, Course, Group, Student, course_student
+
+from tests.test_db_settings.settings import test_engine
+
+
+GROUPS = 5_000
+STUDENTS = 100_000
+COURSES = 40
+COURSES_PER_STUDENT = 3
+# Groups with greater ids get no students.
+EMPTY_GROUPS = 10
+
+
+class StatementRecorder:
+    """Records statements (with their parameters) sent through the engine."""
+
+    def __init__(self, engine):
+        self._engine = engine
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context,
+                executemany):
+        self.statements.append((statement, parameters))
+
+    def __enter__(self):
+        event.listen(self._engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        event.remove(self._engine, 'before_cursor_execute', self._record)
+
+
+def iter_plan_nodes(plan: dict):
+    yield plan
+
+    for child in plan.get('Plans', ()):
+        yield from iter_plan_nodes(child)
+
+
+@unittest.skipUnless(
+    test_engine.dialect.name == 'postgresql',
+    'Query plans are checked on PostgreSQL only'
+)
+class TestQueryPlans(unittest.TestCase):
+    """Statements of the interfaces use the indexes of the schema
+    on a db big enough for the planner to prefer them.
+
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        DropSchoolDb(engine=test_engine).drop_tables()
+        SchoolBase.metadata.create_all(test_engine)
+
+        with test_engine.begin() as connection:
+            bulk_write_rows(
+                connection, Group.__table__, ('id', 'name'),
+                ((id_, f'G{id_:04}') for id_ in range(1, GROUPS + 1))
+            )
+            bulk_write_rows(
+                connection, Course.__table__, ('id', 'name'),
+                ((id_, f'Course {id_}') for id_ in range(1, COURSES + 1))
+            )
+            bulk_write_rows(
+                connection, Student.__table__,
+                ('id', 'group_id', 'first_name', 'last_name'),
+                (
+                    (id_, 1 + id_ % (GROUPS - EMPTY_GROUPS),
+                     f'First{id_ % 997}', f'Last{id_}')
+                    for id_ in range(1, STUDENTS + 1)
+                )
+            )
+            bulk_write_rows(
+                connection, course_student, ('course_id', 'student_id'),
+                (
+                    (1 + (id_ * 7 + shift) % COURSES, id_)
+                    for id_ in range(1, STUDENTS + 1)
+                    for shift in range(COURSES_PER_STUDENT)
+                )
+            )
+
+        GroupInterface(engine=test_engine).rebuild_students_counts()
+
+        with test_engine.connect() as connection:
+            connection.execution_options(
+                isolation_level='AUTOCOMMIT'
+            ).execute(text('ANALYZE'))
+
+        cls.student_interface = StudentInterface(engine=test_engine)
+        cls.group_interface = GroupInterface(engine=test_engine)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        DropSchoolDb(engine=test_engine).drop_tables()
+
+    @staticmethod
+    def explain(statement: str, parameters) -> dict:
+        with test_engine.connect() as connection:
+            plan = connection.exec_driver_sql(
+                f'EXPLAIN (FORMAT JSON) {statement}', parameters
+            ).scalar()
+
+        # psycopg2 parses json columns, other drivers may not.
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+
+        return plan[0]['Plan']
+
+    def used_indexes(self, statement: str, parameters) -> set:
+        return {
+            node['Index Name']
+            for node in iter_plan_nodes(self.explain(statement, parameters))
+            if 'Index Name' in node
+        }
+
+    def assertUsesIndex(self, index_name: str, call) -> None:
+        """Some statement issued by ``call`` uses ``index_name``."""
+
+        with StatementRecorder(test_engine) as recorder:
+            call()
+
+        used = set()
+        for statement, parameters in recorder.statements:
+            used |= self.used_indexes(statement, parameters)
+
+        self.assertIn(index_name, used)
+
+    def test_students_of_course(self):
+        self.assertUsesIndex(
+            'course_student_pkey',
+            lambda: self.student_interface.get_student_rows_related_to_course(
+                3
+            )
+        )
+
+    def test_page_of_course_roster_by_name(self):
+        self.assertUsesIndex(
+            'course_student_pkey',
+            lambda: (
+                self.student_interface.get_student_rows_related_to_course_name(
+                    'Course 3', limit=50, after=40_000
+                )
+            )
+        )
+
+    def test_count_of_course_students(self):
+        self.assertUsesIndex(
+            'course_student_pkey',
+            lambda: self.student_interface.count_students_related_to_course(3)
+        )
+
+    def test_courses_of_student(self):
+        self.assertUsesIndex(
+            'ix_course_student_student_id_course_id',
+            lambda: self.student_interface.get_student_details(12_345)
+        )
+
+    def test_selectin_loaded_courses(self):
+        self.assertUsesIndex(
+            'ix_course_student_student_id_course_id',
+            lambda: self.student_interface.get_student_with_full_info(12_345)
+        )
+
+    def test_student_profile(self):
+        self.assertUsesIndex(
+            'ix_course_student_student_id_course_id',
+            lambda: self.student_interface.get_student_profile(12_345)
+        )
+
+    def test_students_of_group(self):
+        self.assertUsesIndex(
+            'ix_student_group_id',
+            lambda: self.student_interface.get_student_rows_related_to_group(
+                42
+            )
+        )
+
+    def test_group_roster(self):
+        self.assertUsesIndex(
+            'ix_student_group_id',
+            lambda: self.group_interface.get_group_roster(42, limit=20)
+        )
+
+    def test_student_by_name(self):
+        student = Student.__table__
+
+        statement = select(student.c.id).where(
+            student.c.last_name == 'Last12345',
+            student.c.first_name == 'First379'
+        ).compile(test_engine)
+
+        self.assertIn(
+            'ix_student_last_name_first_name',
+            self.used_indexes(str(statement), statement.params)
+        )
+
+    def test_search_by_first_and_last_name(self):
+        for index_name in ('ix_student_search_first_last',
+                           'ix_student_search_last_first'):
+            with self.subTest(index_name=index_name):
+                self.assertUsesIndex(
+                    index_name,
+                    lambda: self.student_interface.search_students('la', 10)
+                )
+
+    def test_groups_with_less_students(self):
+        groups = self.group_interface.get_group_with_less_students_count(5)
+
+        self.assertEqual(len(groups), EMPTY_GROUPS)
+
+        self.assertUsesIndex(
+            'ix_group_students_count',
+            lambda: self.group_interface.get_group_with_less_students_count(5)
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+
+from models.field_selection import FieldSelection
+
+from sparse_fields import COURSE_FIELDS, STUDENT_FIELDS
+from sparse_fields import InvalidFieldsError
+
+
+class TestResourceFields(unittest.TestCase):
+    def test_without_fields_nothing_is_requested(self):
+        self.assertIsNone(STUDENT_FIELDS.parse({}))
+        self.assertIsNone(STUDENT_FIELDS.parse({'limit': '10'}))
+
+    def test_keys_keep_the_order_of_the_resource(self):
+        requested = STUDENT_FIELDS.parse(
+            {'fields': 'last_name, student_id,last_name'}
+        )
+
+        self.assertEqual(requested.keys, ('student_id', 'last_name'))
+        self.assertEqual(requested.columns, ('id', 'last_name'))
+        self.assertEqual(requested.includes, ())
+
+    def test_selection_of_includes(self):
+        requested = STUDENT_FIELDS.parse({
+            'fields': 'first_name', 'include': 'courses,group',
+            'fields[courses]': 'course_name'
+        })
+
+        self.assertEqual(requested.selection, FieldSelection(
+            ('first_name',), (
+                ('group', FieldSelection(('id', 'name'))),
+                ('courses', FieldSelection(('name',)))
+            )
+        ))
+
+    def test_include_without_fields_has_all_keys(self):
+        requested = STUDENT_FIELDS.parse({'include': 'group'})
+
+        self.assertEqual(requested.keys, tuple(STUDENT_FIELDS.keys))
+
+    def test_invalid_fields(self):
+        args_and_messages = [
+            ({'fields': 'student_id,age'},
+             'Unknown student fields (age)! Available: '
+             'student_id, first_name, last_name, group_id'),
+            ({'fields': ' , '}, 'fields must not be empty!'),
+            ({'include': 'group,teachers'},
+             'Unknown includes of student (teachers)! '
+             'Available: group, courses'),
+            ({'fields[group]': 'group_name'},
+             'Fields of group are given but not included!'),
+            ({'include': 'courses', 'fields[courses]': 'description'},
+             'Unknown course fields (description)! Available: '
+             'course_id, course_name, course_description'),
+            ({'include': 'courses', 'fields[courses]': ''},
+             'fields[courses] must not be empty!')
+        ]
+
+        for args, message in args_and_messages:
+            with self.subTest(args=args):
+                with self.assertRaises(InvalidFieldsError) as context:
+                    STUDENT_FIELDS.parse(args)
+
+                self.assertEqual(str(context.exception), message)
+
+    def test_course_has_no_includes(self):
+        with self.assertRaisesRegex(InvalidFieldsError, 'Available: none'):
+            COURSE_FIELDS.parse({'include': 'students'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+
+from models import statements
+from models.field_selection import FieldSelection
+from models.models import Course, Group, Student
+
+
+class TestStatements(unittest.TestCase):
+    def test_statements_are_built_once(self):
+        self.assertIs(
+            statements.select_student_with_full_info(Student),
+            statements.select_student_with_full_info(Student)
+        )
+        self.assertIs(
+            statements.select_students_of_course(
+                Student, FieldSelection(('id', 'last_name'))
+            ),
+            statements.select_students_of_course(
+                Student, FieldSelection(('id', 'last_name'))
+            )
+        )
+        self.assertIs(
+            statements.select_rows_page(Group, ('id', 'name'), True),
+            statements.select_rows_page(Group, ('id', 'name'), True)
+        )
+
+    def test_values_are_bound_at_execution(self):
+        query = statements.select_student_profile(Student, Group, Course)
+
+        self.assertEqual(set(query.compile().params), {'student_id'})
+        self.assertEqual(
+            set(statements.select_rows_page(
+                Student, ('id',), True
+            ).compile().params),
+            {'limit', 'after'}
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
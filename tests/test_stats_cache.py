@@ -0,0 +1,111 @@
+import threading
+import time
+import unittest
+from datetime import datetime, timezone
+
+from models.table_versions import TableState
+
+from stats_cache import StatsCache
+
+
+class FakeInterface:
+    """Table versions of a ``SchoolDb``, bumped by hand."""
+
+    def __init__(self):
+        self.versions = {'course': 1, 'course_student': 1}
+
+    def get_table_states(self, table_names):
+        return {
+            table_name: TableState(
+                self.versions[table_name], datetime.now(timezone.utc)
+            )
+            for table_name in table_names if table_name in self.versions
+        }
+
+
+class TestStatsCache(unittest.TestCase):
+    tables = ('course', 'course_student')
+
+    def setUp(self) -> None:
+        self.interface = FakeInterface()
+        self.cache = StatsCache(self.interface)
+
+        self.computed = 0
+
+    def compute(self):
+        self.computed += 1
+        return [self.computed]
+
+    def get(self, parameters: dict = None):
+        return self.cache.get_or_compute(
+            'enrollments', parameters, self.tables, self.compute
+        )
+
+    def test_result_is_computed_once_per_versions(self):
+        self.assertEqual(self.get().value, [1])
+        self.assertEqual(self.get().value, [1])
+
+        self.interface.versions['course_student'] += 1
+
+        self.assertEqual(self.get().value, [2])
+        self.assertEqual(
+            self.cache.stats(),
+            {'hits': 1, 'misses': 2, 'stale_hits': 0, 'refreshes': 0,
+             'evictions': 0}
+        )
+
+    def test_parameters_are_part_of_the_key(self):
+        self.assertEqual(self.get({'students_count': 1}).value, [1])
+        self.assertEqual(self.get({'students_count': 2}).value, [2])
+        self.assertEqual(self.get({'students_count': 1}).value, [1])
+
+    def test_missing_versions_count_as_zero(self):
+        del self.interface.versions['course']
+
+        self.get()
+
+        self.interface.versions['course'] = 1
+
+        self.assertEqual(self.get().value, [2])
+
+    def test_background_refresh_serves_the_outdated_result(self):
+        self.cache.background_refresh = True
+        self.get()
+
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_compute():
+            started.set()
+            release.wait(5)
+            return ['refreshed']
+
+        self.interface.versions['course'] += 1
+
+        for _ in range(3):
+            result = self.cache.get_or_compute(
+                'enrollments', None, self.tables, slow_compute
+            )
+
+            self.assertEqual(result.value, [1])
+            self.assertTrue(result.stale)
+
+        self.assertTrue(started.wait(5))
+        release.set()
+
+        for _ in range(50):
+            if self.cache.refreshes:
+                break
+            time.sleep(0.1)
+
+        # A single refresh ran for the three outdated reads.
+        self.assertEqual(self.cache.refreshes, 1)
+
+        result = self.get()
+
+        self.assertEqual(result.value, ['refreshed'])
+        self.assertFalse(result.stale)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+
+from models.dto import StudentMatch, StudentRow
+from models.student_search import StudentNameIndex, escape_like
+from models.student_search import normalize_query, rank_matches
+
+
+STUDENTS = [
+    StudentRow(1, 'Mia', 'Wilson', 1),
+    StudentRow(2, 'Wilson', 'Mia', 2),
+    StudentRow(3, 'Mia', 'Williams', 1),
+    StudentRow(4, 'Ava', 'Miller', None),
+    StudentRow(5, 'Mia', 'Wilson', 3),
+    StudentRow(6, 'Liam', 'Smith', 2)
+]
+
+
+class TestStudentNameIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        self.index = StudentNameIndex(STUDENTS)
+
+    def search(self, query: str, limit: int = 10) -> list:
+        return [
+            (match.id, match.matched_name)
+            for match in self.index.search(normalize_query(query), limit)
+        ]
+
+    def test_full_name(self):
+        self.assertEqual(self.search('Mia Wilson'), [
+            (1, 'mia wilson'), (2, 'mia wilson'), (5, 'mia wilson')
+        ])
+
+    def test_prefix_of_both_orders(self):
+        self.assertEqual(self.search('wil'), [
+            (3, 'williams mia'), (1, 'wilson mia'),
+            (2, 'wilson mia'), (5, 'wilson mia')
+        ])
+
+    def test_every_student_once(self):
+        self.assertEqual(self.search('mi'), [
+            (3, 'mia williams'), (1, 'mia wilson'), (2, 'mia wilson'),
+            (5, 'mia wilson'), (4, 'miller ava')
+        ])
+
+    def test_limit(self):
+        self.assertEqual(
+            self.search('  MIA   wil ', limit=2),
+            [(3, 'mia williams'), (1, 'mia wilson')]
+        )
+
+    def test_no_matches(self):
+        self.assertEqual(self.search('zoe'), [])
+        self.assertEqual(self.search('smithe'), [])
+
+    def test_matches_are_student_rows(self):
+        self.assertEqual(
+            self.index.search('liam', 1),
+            [StudentMatch(6, 'Liam', 'Smith', 2, 'liam smith')]
+        )
+
+
+class TestRankMatches(unittest.TestCase):
+    def test_rank_matches_of_both_keys(self):
+        rows = [
+            (1, 'Mia', 'Wilson', 1, 'mia wilson'),
+            (3, 'Mia', 'Williams', 1, 'mia williams'),
+            (3, 'Mia', 'Williams', 1, 'williams mia'),
+            (2, 'Wilson', 'Mia', 2, 'mia wilson')
+        ]
+
+        self.assertEqual(
+            [match.id for match in rank_matches(rows, 10)], [3, 1, 2]
+        )
+        self.assertEqual(
+            [match.id for match in rank_matches(rows, 2)], [3, 1]
+        )
+
+    def test_same_ranking_as_the_index(self):
+        index = StudentNameIndex(STUDENTS)
+        rows = [
+            (*student, key)
+            for student in STUDENTS
+            for key in (
+                f'{student.first_name} {student.last_name}'.lower(),
+                f'{student.last_name} {student.first_name}'.lower()
+            )
+            if key.startswith('mi')
+        ]
+
+        self.assertEqual(rank_matches(rows, 4), index.search('mi', 4))
+
+
+class TestQueryHelpers(unittest.TestCase):
+    def test_normalize_query(self):
+        self.assertEqual(normalize_query('  Mia \t WILSON '), 'mia wilson')
+        self.assertEqual(normalize_query('   '), '')
+
+    def test_escape_like(self):
+        self.assertEqual(escape_like('50%_a\\b'), '50\\%\\_a\\\\b')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,189 @@
+import csv
+import os
+import tempfile
+import unittest
+from collections import Counter
+
+from sqlalchemy import func, select
+
+from models.manage_school_db import DropSchoolDb, GroupInterface
+from models.models import Course, Group, Student, course_student
+from models.table_versions import SELECT_TABLE_STATES, read_table_states
+
+from school_generator.synthetic_school import SyntheticSchool
+from school_generator.synthetic_school import write_csv_files, write_to_db
+
+from tests.test_db_settings.settings import test_engine, test_engine_settings
+
+
+def all_rows(school: SyntheticSchool):
+    return (
+        school.group_rows(), school.course_rows(),
+        [row for block in school.blocks for row in school.student_rows(block)],
+        [row for block in school.blocks
+         for row in school.course_student_rows(block)]
+    )
+
+
+def read_csv_file(path: str) -> list:
+    with open(path, newline='', encoding='utf-8') as file:
+        return list(csv.reader(file))
+
+
+class TestSyntheticSchool(unittest.TestCase):
+    def setUp(self) -> None:
+        self.school = SyntheticSchool(
+            seed=7, groups=300, students=5_000, courses=50,
+            min_courses=1, max_courses=4, block_size=1_000
+        )
+
+    def test_same_seed_gives_same_school(self):
+        same_school = SyntheticSchool(
+            seed=7, groups=300, students=5_000, courses=50,
+            min_courses=1, max_courses=4, block_size=1_000
+        )
+        other_school = SyntheticSchool(
+            seed=8, groups=300, students=5_000, courses=50,
+            min_courses=1, max_courses=4, block_size=1_000
+        )
+
+        self.assertEqual(all_rows(self.school), all_rows(same_school))
+        self.assertNotEqual(all_rows(self.school), all_rows(other_school))
+
+    def test_unique_ids_and_names(self):
+        groups, courses, students, _ = all_rows(self.school)
+
+        self.assertEqual([row[0] for row in groups], list(range(1, 301)))
+        self.assertEqual(len({row[1] for row in groups}), 300)
+        self.assertRegex(groups[0][1], r'^[A-Z]{2}-\d{2}$')
+
+        self.assertEqual([row[0] for row in courses], list(range(1, 51)))
+        self.assertEqual(len({row[1] for row in courses}), 50)
+
+        self.assertEqual([row[0] for row in students], list(range(1, 5_001)))
+
+    def test_students_belong_to_existing_groups(self):
+        groups, _, students, _ = all_rows(self.school)
+
+        self.assertTrue(all(1 <= row[1] <= 300 for row in students))
+        self.assertEqual(
+            {id_: count for id_, _, count in groups if count},
+            dict(Counter(row[1] for row in students))
+        )
+
+    def test_students_have_distinct_courses(self):
+        _, _, _, enrollments = all_rows(self.school)
+
+        self.assertEqual(len(enrollments), len(set(enrollments)))
+        self.assertTrue(all(1 <= course <= 50 for course, _ in enrollments))
+
+        courses_count = Counter(student for _, student in enrollments)
+
+        self.assertEqual(set(courses_count.values()), {1, 2, 3, 4})
+        self.assertEqual(len(courses_count), 5_000)
+
+    def test_all_courses_of_the_school(self):
+        school = SyntheticSchool(
+            seed=1, groups=10, students=200, courses=5,
+            min_courses=5, max_courses=5, block_size=64
+        )
+
+        _, _, _, enrollments = all_rows(school)
+
+        self.assertEqual(
+            sorted(enrollments),
+            [(course, student) for course in range(1, 6)
+             for student in range(1, 201)]
+        )
+
+    def test_invalid_sizes(self):
+        with self.assertRaises(ValueError):
+            SyntheticSchool(seed=1, groups=100_000)
+
+        with self.assertRaises(ValueError):
+            SyntheticSchool(seed=1, courses=2, max_courses=3)
+
+    def test_csv_files_do_not_depend_on_workers(self):
+        with tempfile.TemporaryDirectory() as directory:
+            write_csv_files(self.school, os.path.join(directory, 'one'))
+            report = write_csv_files(
+                self.school, os.path.join(directory, 'many'), workers=2
+            )
+
+            self.assertEqual(
+                sorted(os.listdir(os.path.join(directory, 'one'))),
+                sorted(os.listdir(os.path.join(directory, 'many')))
+            )
+
+            for file_name in os.listdir(os.path.join(directory, 'one')):
+                self.assertEqual(
+                    read_csv_file(os.path.join(directory, 'one', file_name)),
+                    read_csv_file(os.path.join(directory, 'many', file_name)),
+                    file_name
+                )
+
+            students = read_csv_file(
+                os.path.join(directory, 'one', 'student.00004.csv')
+            )
+
+        self.assertEqual(
+            students[0], ['id', 'group_id', 'first_name', 'last_name']
+        )
+        self.assertEqual(students[1][0], '4001')
+        self.assertEqual(report.tables['student'].rows, 5_000)
+
+
+class TestWriteSyntheticSchoolToDb(unittest.TestCase):
+    def setUp(self) -> None:
+        DropSchoolDb(engine=test_engine).drop_tables()
+
+    def tearDown(self) -> None:
+        DropSchoolDb(engine=test_engine).drop_tables()
+
+    def test_write_to_db(self):
+        school = SyntheticSchool(
+            seed=3, groups=100, students=3_000, courses=30,
+            block_size=500
+        )
+
+        report = write_to_db(school, test_engine_settings, workers=2)
+
+        _, _, students, enrollments = all_rows(school)
+
+        self.assertEqual(report.tables['student'].rows, 3_000)
+        self.assertEqual(
+            report.tables['course_student'].rows, len(enrollments)
+        )
+
+        with test_engine.connect() as connection:
+            def count(table):
+                return connection.execute(
+                    select(func.count()).select_from(table)
+                ).scalar()
+
+            self.assertEqual(count(Group.__table__), 100)
+            self.assertEqual(count(Course.__table__), 30)
+            self.assertEqual(count(Student.__table__), 3_000)
+            self.assertEqual(count(course_student), len(enrollments))
+
+            self.assertEqual(
+                connection.execute(
+                    select(Student.__table__).order_by(Student.id)
+                ).all(), students
+            )
+
+            self.assertEqual(
+                set(read_table_states(connection.execute(
+                    SELECT_TABLE_STATES, {'table_names': [
+                        'group', 'course', 'student', 'course_student'
+                    ]}
+                ))), {'group', 'course', 'student', 'course_student'}
+            )
+
+        self.assertEqual(
+            GroupInterface(engine=test_engine).check_students_counts(), []
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+from unittest import mock
+
+import views
+
+from tests.base_db_class_for_tests import InitTestDbForTests
+
+from tests.test_db_settings.settings import test_engine
+
+
+# Any page has to be rendered with at most this many SQL statements,
+# one of them reads the table versions for the ETag.
+MAX_QUERIES_PER_VIEW = 3
+
+
+@mock.patch.object(views.student_interface, '_engine', new=test_engine)
+@mock.patch.object(views.group_interface, '_engine', new=test_engine)
+@mock.patch.object(views.course_interface, '_engine', new=test_engine)
+class TestViews(InitTestDbForTests):
+    def setUp(self, students=None, groups=None, courses=None,
+              students_courses=None, students_group=None) -> None:
+        super().setUp()
+
+        views.app.config['TESTING'] = True
+
+        self.app = views.app.test_client()
+
+    def test_pages_stay_within_query_budget(self):
+        urls = [
+            '/', '/groups/', '/groups/2', '/groups/2/students',
+            '/students/', '/students/3', '/courses/', '/courses/2',
+            '/courses/2/students'
+        ]
+
+        for url in urls:
+            with self.subTest(url=url):
+                with self.assertMaxQueries(MAX_QUERIES_PER_VIEW):
+                    response = self.app.get(url)
+
+                self.assertEqual(response.status_code, 200)
+
+    def test_not_existing_pages(self):
+        urls = [
+            '/groups/15', '/groups/15/students', '/students/15',
+            '/courses/15', '/courses/15/students'
+        ]
+
+        for url in urls:
+            with self.subTest(url=url):
+                with self.assertMaxQueries(MAX_QUERIES_PER_VIEW):
+                    response = self.app.get(url)
+
+                self.assertEqual(response.status_code, 404)
+
+    def test_show_students(self):
+        page = self.app.get('/students/').get_data(as_text=True)
+
+        self.assertIn('Student id: 1 - Benjamin Miller, Group id: 1', page)
+        self.assertIn('Student id: 10 - Lucas Jones, Group id: 5', page)
+
+    def test_show_student(self):
+        page = self.app.get('/students/3').get_data(as_text=True)
+
+        self.assertIn('Mia Wilson', page)
+        self.assertIn('Student group: SD-58', page)
+
+        for course in ('Geography', 'Writing', 'German'):
+            with self.subTest():
+                self.assertIn(f'Course: {course}', page)
+
+    def test_show_students_related_to_course(self):
+        page = self.app.get('/courses/1/students').get_data(as_text=True)
+
+        for student_id in (1, 2, 3, 8):
+            with self.subTest():
+                self.assertIn(f'Student id: {student_id} -', page)
+
+        self.assertNotIn('Student id: 4 -', page)
+
+    @mock.patch.object(views, 'ROSTER_PAGE_SIZE', 3)
+    def test_students_related_to_course_are_paged(self):
+        page = self.app.get('/courses/2/students').get_data(as_text=True)
+
+        self.assertIn('Student id: 5 -', page)
+        self.assertNotIn('Student id: 9 -', page)
+        self.assertIn('/courses/2/students?after=5', page)
+
+        page = self.app.get(
+            '/courses/2/students?after=5'
+        ).get_data(as_text=True)
+
+        self.assertIn('Student id: 10 -', page)
+        self.assertNotIn('Next page', page)
+
+    @mock.patch.object(views, 'ROSTER_PAGE_SIZE', 2)
+    def test_students_related_to_group_are_paged(self):
+        page = self.app.get('/groups/1/students').get_data(as_text=True)
+
+        self.assertIn('Student id: 2 -', page)
+        self.assertNotIn('Student id: 3 -', page)
+        self.assertIn('/groups/1/students?after=2', page)
+
+    def test_not_modified_page(self):
+        response = self.app.get('/students/3')
+
+        with self.assertMaxQueries(1):
+            cached_response = self.app.get('/students/3', headers={
+                'If-None-Match': response.headers['ETag']
+            })
+
+        self.assertEqual(cached_response.status_code, 304)
+
+
+if __name__ == '__main__':
+    unittest.main()
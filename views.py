@@ -1,15 +1,20 @@
-from flask import render_template, abort
+from flask import render_template, abort, request, url_for
 
-from app import app
+from app import app, entity_cache
+
+from http_cache import conditional_get
 
 from models.manage_school_db import CourseInterface
 from models.manage_school_db import StudentInterface
 from models.manage_school_db import GroupInterface
 
 
-student_interface = StudentInterface()
-group_interface = GroupInterface()
-course_interface = CourseInterface()
+student_interface = StudentInterface(cache=entity_cache)
+group_interface = GroupInterface(cache=entity_cache)
+course_interface = CourseInterface(cache=entity_cache)
+
+# Students of a course are shown page by page.
+ROSTER_PAGE_SIZE = 100
 
 
 @app.route('/')
@@ -18,14 +23,16 @@ def index():
 
 
 @app.route('/groups/')
+@conditional_get(group_interface, ('group',))
 def show_groups():
-    if not (groups := group_interface.get_all_groups()):
+    if not (groups := group_interface.get_group_rows()):
         abort(404)
 
     return render_template('groups.html', groups=groups)
 
 
 @app.route('/groups/<int:group_id>')
+@conditional_get(group_interface, ('group',))
 def show_group(group_id: int):
     if not (group := group_interface.get_group_by_id(group_id)):
         abort(404)
@@ -34,42 +41,64 @@ def show_group(group_id: int):
 
 
 @app.route('/groups/<int:group_id>/students')
+@conditional_get(group_interface, ('group', 'student'))
 def show_students_related_to_group(group_id):
-    students = student_interface.get_students_related_to_group(group_id)
+    after = request.args.get('after', type=int)
 
-    if not students:
+    # One extra row tells whether there is a next page.
+    roster = group_interface.get_group_roster(
+        group_id, limit=ROSTER_PAGE_SIZE + 1, after=after
+    )
+
+    if not roster or not roster.students:
         abort(404)
 
-    return render_template('students.html', students=students)
+    students = roster.students
+    next_url = None
+
+    if len(students) > ROSTER_PAGE_SIZE:
+        students = students[:ROSTER_PAGE_SIZE]
+        next_url = url_for(
+            'show_students_related_to_group', group_id=group_id,
+            after=roster.student_ids[ROSTER_PAGE_SIZE - 1]
+        )
+
+    return render_template(
+        'students.html', students=students, next_url=next_url
+    )
 
 
 @app.route('/students/')
+@conditional_get(student_interface, ('student',))
 def show_students():
-    if not (students := student_interface.get_all_students()):
+    if not (students := student_interface.get_student_rows()):
         abort(404)
 
     return render_template('students.html', students=students)
 
 
 @app.route('/students/<int:student_id>')
+@conditional_get(
+    student_interface, ('student', 'group', 'course_student', 'course')
+)
 def show_student(student_id: int):
-    if not (
-            student := student_interface.get_student_with_full_info(student_id)
-    ):
+    if not (student := student_interface.get_student_details(student_id)):
         abort(404)
 
     return render_template('student_detail.html', student=student)
 
 
 @app.route('/courses/')
+@conditional_get(course_interface, ('course',))
 def show_courses():
-    if not (courses := course_interface.get_all_courses()):
+    if not (courses := course_interface.get_course_rows()):
         abort(404)
 
     return render_template('courses.html', courses=courses)
 
 
 @app.route('/courses/<int:course_id>')
+@conditional_get(course_interface, ('course',))
 def show_course(course_id: int):
     if not (course := course_interface.get_course_by_id(course_id)):
         abort(404)
@@ -78,13 +107,28 @@ def show_course(course_id: int):
 
 
 @app.route('/courses/<int:course_id>/students')
+@conditional_get(student_interface, ('student', 'course_student'))
 def show_students_related_to_course(course_id):
-    if not (course := course_interface.get_course_by_id(course_id)):
-        abort(404)
+    after = request.args.get('after', type=int)
 
-    students = student_interface.get_students_related_to_course(course.name)
+    # One extra row tells whether there is a next page.
+    students = student_interface.get_student_rows_related_to_course(
+        course_id, limit=ROSTER_PAGE_SIZE + 1, after=after
+    )
 
+    # An unknown course has no students, so it is a 404 as well.
     if not students:
         abort(404)
 
-    return render_template('students.html', students=students)
+    next_url = None
+
+    if len(students) > ROSTER_PAGE_SIZE:
+        students = students[:ROSTER_PAGE_SIZE]
+        next_url = url_for(
+            'show_students_related_to_course', course_id=course_id,
+            after=students[-1].id
+        )
+
+    return render_template(
+        'students.html', students=students, next_url=next_url
+    )